@@ -3,3 +3,16 @@ from django.apps import AppConfig
 class CompetenciesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "competencies"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from competencies.catalog import invalidate_catalog
+        from competencies.models import Competency, CompetencyLevel, LevelIndicator, RoleCompetencyRequirement
+        from competencies.signals import catalog_changed
+
+        # Los perfiles de rol también: los fragmentos cacheados con la versión del catálogo los muestran.
+        for model in (Competency, CompetencyLevel, LevelIndicator, RoleCompetencyRequirement):
+            post_save.connect(invalidate_catalog, sender=model, dispatch_uid=f"catalog_cache_{model.__name__}_save")
+            post_delete.connect(invalidate_catalog, sender=model, dispatch_uid=f"catalog_cache_{model.__name__}_delete")
+        catalog_changed.connect(invalidate_catalog, dispatch_uid="catalog_cache_bulk")
@@ -0,0 +1,52 @@
+"""
+Catálogo de competencias (niveles y comportamientos) cacheado como un único bloque.
+Se invalida con cualquier cambio en Competency/CompetencyLevel/LevelIndicator/RoleCompetencyRequirement
+y con `catalog_changed` (importaciones masivas, que no disparan post_save).
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from competencies.models import CompetencyLevel
+from talentmap import cache as app_cache
+
+# Dentro de bulk_catalog_change() los post_save/post_delete del catálogo no invalidan.
+_bulk_change = ContextVar("catalog_bulk_change", default=False)
+
+
+def _build_catalog():
+    catalog = {}
+    for lvl in CompetencyLevel.objects.prefetch_related("indicators").order_by("competency_id", "level"):
+        catalog.setdefault(lvl.competency_id, []).append(lvl)
+    return catalog
+
+
+def get_catalog():
+    """{competency_id: [CompetencyLevel ordenados, con indicadores precargados]}."""
+    return app_cache.get_or_build(app_cache.CATALOG_NAMESPACE, ["levels"], _build_catalog)
+
+
+def competency_levels(competency_id, max_level=None, catalog=None):
+    """Niveles de una competencia (hasta max_level) con `indicators.all()` sin consultas."""
+    levels = (catalog if catalog is not None else get_catalog()).get(competency_id, [])
+    if max_level is None:
+        return list(levels)
+    return [lvl for lvl in levels if lvl.level <= max_level]
+
+
+@contextmanager
+def bulk_catalog_change():
+    """
+    Escrituras masivas del catálogo sin una invalidación por fila: quien abre el bloque envía
+    `catalog_changed` una sola vez al terminar.
+    """
+    token = _bulk_change.set(True)
+    try:
+        yield
+    finally:
+        _bulk_change.reset(token)
+
+
+def invalidate_catalog(**kwargs):
+    if _bulk_change.get():
+        return
+    app_cache.invalidate(app_cache.CATALOG_NAMESPACE)
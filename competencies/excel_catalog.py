@@ -0,0 +1,368 @@
+import tempfile
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+
+from competencies.catalog import bulk_catalog_change
+from competencies.models import Competency, CompetencyLevel, LevelIndicator
+from competencies.signals import catalog_changed
+from evaluations.models import EvaluationCycle, QualitativeIndicatorAssessment, QualitativeIndicatorSelfAssessment
+from people.services.import_jobs import enqueue_recompute_job
+from talentmap import excel
+
+# id_comportamiento (opcional) identifica un comportamiento existente: solo con él se puede renombrar.
+CATALOG_HEADERS = ["competencia", "descripcion", "nivel", "titulo_nivel", "comportamiento", "id_comportamiento"]
+
+# Filas leídas por consulta al exportar.
+CATALOG_CHUNK_SIZE = 2000
+
+
+@dataclass
+class CatalogImportResult:
+    competencies_created: int = 0
+    competencies_updated: int = 0
+    levels_created: int = 0
+    levels_updated: int = 0
+    levels_deleted: int = 0
+    indicators_created: int = 0
+    indicators_updated: int = 0
+    indicators_deleted: int = 0
+    recompute_job_ids: list[int] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def structure_changed(self):
+        """Niveles o comportamientos añadidos/eliminados: cambian los scores cualitativos."""
+        return any((self.levels_created, self.levels_deleted, self.indicators_created, self.indicators_deleted))
+
+    @property
+    def changed(self):
+        return any(
+            (
+                self.competencies_created,
+                self.competencies_updated,
+                self.levels_created,
+                self.levels_updated,
+                self.levels_deleted,
+                self.indicators_created,
+                self.indicators_updated,
+                self.indicators_deleted,
+            )
+        )
+
+
+def build_catalog_xlsx():
+    """
+    Exporta el catálogo (una fila por comportamiento) en un workbook write-only
+    volcado a un fichero temporal. Niveles sin comportamientos y competencias sin
+    niveles también tienen su fila, así que exportar y reimportar no cambia nada.
+    """
+    wb = excel.Workbook(write_only=True)
+    ws = wb.create_sheet(title="Catalogo")
+
+    header = []
+    for value in CATALOG_HEADERS:
+        cell = excel.WriteOnlyCell(ws, value=value)
+        cell.font = excel.Font(bold=True)
+        header.append(cell)
+    ws.append(header)
+
+    rows = Competency.objects.order_by("name", "levels__level", "levels__indicators__id").values_list(
+        "name", "description", "levels__level", "levels__title", "levels__indicators__text", "levels__indicators__id"
+    )
+    last_comp = last_level = None
+    for name, description, level, title, text, indicator_id in rows.iterator(chunk_size=CATALOG_CHUNK_SIZE):
+        # Descripción y título solo en la primera fila de cada competencia/nivel.
+        ws.append(
+            [
+                name,
+                description if name != last_comp else None,
+                level,
+                title if (name, level) != last_level else None,
+                text,
+                indicator_id,
+            ]
+        )
+        last_comp, last_level = name, (name, level)
+
+    tmp = tempfile.TemporaryFile()
+    wb.save(tmp)
+    tmp.seek(0)
+    return tmp
+
+
+def _cell(row, i):
+    if i < 0 or i >= len(row) or row[i] is None:
+        return ""
+    return str(row[i]).strip()
+
+
+def normalize_behavior(text):
+    """Clave de comparación de un comportamiento: sin diferencias de espacios ni mayúsculas."""
+    return " ".join(text.split()).casefold()
+
+
+def parse_catalog_workbook(file_obj):
+    """
+    Lee el workbook y devuelve (catalog, errors) sin escribir en BD.
+    catalog: {competencia: {"description": str|None, "levels": {n: {"title": str|None, "indicators": [(id|None, texto)]}}}}
+    Sin columna descripcion/titulo_nivel se conservan los valores actuales (None).
+    Los comportamientos repetidos en un nivel (mismo texto normalizado) se leen una vez.
+    """
+    wb = excel.load_workbook(file_obj, read_only=True, data_only=True)
+    rows = wb.active.iter_rows(values_only=True)
+    header = next(rows, None)
+    if not header:
+        return {}, ["El archivo está vacío."]
+    header = [str(c).strip().lower() if c else "" for c in header]
+    if "competencia" not in header:
+        return {}, ["Falta la columna 'competencia' en el archivo."]
+    idx = {name: header.index(name) if name in header else -1 for name in CATALOG_HEADERS}
+
+    catalog = {}
+    errors = []
+    seen_ids = set()
+    for row_num, row in enumerate(rows, start=2):
+        if not row or not any(v not in (None, "") for v in row):
+            continue
+        name = _cell(row, idx["competencia"])
+        if not name:
+            errors.append(f"Fila {row_num}: la competencia es obligatoria.")
+            continue
+        if len(name) > 160:
+            errors.append(f"Fila {row_num}: el nombre de la competencia supera 160 caracteres.")
+            continue
+
+        comp = catalog.setdefault(name, {"description": None if idx["descripcion"] < 0 else "", "levels": {}})
+        description = _cell(row, idx["descripcion"])
+        if description and not comp["description"]:
+            comp["description"] = description
+
+        raw_level = _cell(row, idx["nivel"])
+        text = _cell(row, idx["comportamiento"])
+        if not raw_level:
+            if text:
+                errors.append(f"Fila {row_num}: indica el nivel del comportamiento.")
+            continue
+        try:
+            level = int(float(raw_level.replace(",", ".")))
+        except ValueError:
+            level = 0
+        if level < 1:
+            errors.append(f"Fila {row_num}: nivel inválido '{raw_level}'.")
+            continue
+
+        lvl = comp["levels"].setdefault(level, {"title": None if idx["titulo_nivel"] < 0 else "", "indicators": []})
+        title = _cell(row, idx["titulo_nivel"])
+        if title and not lvl["title"]:
+            if len(title) > 160:
+                errors.append(f"Fila {row_num}: el título del nivel supera 160 caracteres.")
+                continue
+            lvl["title"] = title
+        raw_id = _cell(row, idx["id_comportamiento"])
+        if raw_id and not text:
+            errors.append(f"Fila {row_num}: el comportamiento con id {raw_id} no tiene texto.")
+            continue
+        if text:
+            if len(text) > 240:
+                errors.append(f"Fila {row_num}: el comportamiento supera 240 caracteres.")
+                continue
+            indicator_id = None
+            if raw_id:
+                try:
+                    indicator_id = int(float(raw_id))
+                except ValueError:
+                    errors.append(f"Fila {row_num}: id de comportamiento inválido '{raw_id}'.")
+                    continue
+                if indicator_id in seen_ids:
+                    errors.append(f"Fila {row_num}: el id de comportamiento {indicator_id} está repetido.")
+                    continue
+                seen_ids.add(indicator_id)
+            key = normalize_behavior(text)
+            if indicator_id is not None or all(normalize_behavior(t) != key for _, t in lvl["indicators"]):
+                lvl["indicators"].append((indicator_id, text))
+
+    return catalog, errors
+
+
+def _rated_indicator_ids(indicator_ids):
+    """Ids de indicator_ids con valoraciones (del responsable o autoevaluaciones) en algún ciclo."""
+    if not indicator_ids:
+        return set()
+    rated = set(
+        QualitativeIndicatorAssessment.objects.filter(indicator_id__in=indicator_ids).values_list("indicator_id", flat=True)
+    )
+    rated.update(
+        QualitativeIndicatorSelfAssessment.objects.filter(indicator_id__in=indicator_ids).values_list(
+            "indicator_id", flat=True
+        )
+    )
+    return rated
+
+
+def _match_indicators(rows, existing, where, errors):
+    """
+    Empareja los comportamientos del fichero [(id|None, texto)] con los actuales de un nivel.
+    Con id, el comportamiento existente conserva id y valoraciones y toma el texto del fichero
+    (renombrado explícito); sin id, solo por texto normalizado. Un actual sin pareja se elimina.
+    Devuelve (textos nuevos, [(indicador, texto nuevo)], indicadores sobrantes).
+    """
+    by_id = {ind.id: ind for ind in existing}
+    by_key = {normalize_behavior(ind.text): ind for ind in existing}
+    matched = {}
+    for indicator_id, text in rows:
+        if indicator_id is not None:
+            if indicator_id not in by_id:
+                errors.append(f"{where}: el comportamiento con id {indicator_id} no pertenece a este nivel.")
+            else:
+                matched[indicator_id] = text
+    new_texts = []
+    for indicator_id, text in rows:
+        if indicator_id is not None:
+            continue
+        ind = by_key.get(normalize_behavior(text))
+        if ind is None or ind.id in matched:
+            new_texts.append(text)
+        else:
+            # Misma clave normalizada: se conserva el texto guardado.
+            matched[ind.id] = ind.text
+    renamed = [(by_id[pk], text) for pk, text in matched.items() if by_id[pk].text != text]
+    surplus = [ind for ind in existing if ind.id not in matched]
+    return new_texts, renamed, surplus
+
+
+@transaction.atomic
+def _apply_catalog(catalog, result):
+    current = {c.name: c for c in Competency.objects.filter(name__in=catalog).prefetch_related("levels__indicators")}
+
+    # 1) Plan sobre lo que ya existe, sin escribir.
+    levels_to_update = []
+    level_ids_to_delete = []
+    indicators_to_update = []
+    indicators_to_delete = []
+    # (competencia, nivel actual o None, n, datos del fichero, textos nuevos)
+    pending_levels = []
+    errors = []
+    for name, data in catalog.items():
+        comp = current.get(name)
+        existing = {lvl.level: lvl for lvl in comp.levels.all()} if comp is not None else {}
+        for n, lvl in existing.items():
+            if n not in data["levels"]:
+                level_ids_to_delete.append(lvl.id)
+                indicators_to_delete.extend(lvl.indicators.all())
+        for n, lvl_data in data["levels"].items():
+            lvl = existing.get(n)
+            if lvl is None:
+                for indicator_id, _ in lvl_data["indicators"]:
+                    if indicator_id is not None:
+                        errors.append(
+                            f"{name}, nivel {n}: el comportamiento con id {indicator_id} no pertenece a este nivel."
+                        )
+                pending_levels.append((name, None, n, lvl_data, [text for _, text in lvl_data["indicators"]]))
+                continue
+            if lvl_data["title"] is not None and lvl.title != lvl_data["title"]:
+                lvl.title = lvl_data["title"]
+                levels_to_update.append(lvl)
+            new_texts, renamed, surplus = _match_indicators(
+                lvl_data["indicators"], list(lvl.indicators.all()), f"{name}, nivel {n}", errors
+            )
+            for ind, text in renamed:
+                ind.text = text
+                indicators_to_update.append(ind)
+            indicators_to_delete.extend(surplus)
+            pending_levels.append((name, lvl, n, lvl_data, new_texts))
+
+    # Borrar un comportamiento valorado borraría en cascada sus valoraciones: se rechaza el fichero.
+    rated = _rated_indicator_ids([ind.id for ind in indicators_to_delete])
+    for ind in indicators_to_delete:
+        if ind.id in rated:
+            lvl = ind.level
+            errors.append(
+                f"{lvl.competency.name}, nivel {lvl.level}: el comportamiento '{ind.text}' tiene "
+                f"valoraciones y no se puede eliminar."
+            )
+    if errors:
+        result.errors = errors
+        return
+
+    # 2) Escrituras.
+    new_comps = []
+    comps_to_update = []
+    for name, data in catalog.items():
+        comp = current.get(name)
+        if comp is None:
+            comp = current[name] = Competency(name=name, description=data["description"] or "")
+            new_comps.append(comp)
+        elif data["description"] is not None and comp.description != data["description"]:
+            comp.description = data["description"]
+            comps_to_update.append(comp)
+    Competency.objects.bulk_create(new_comps, batch_size=1000)
+    Competency.objects.bulk_update(comps_to_update, ["description"], batch_size=1000)
+
+    new_levels = []
+    new_indicators = []
+    for name, lvl, n, lvl_data, new_texts in pending_levels:
+        if lvl is None:
+            lvl = CompetencyLevel(competency=current[name], level=n, title=lvl_data["title"] or "")
+            new_levels.append(lvl)
+        new_indicators.extend(LevelIndicator(level=lvl, text=text) for text in new_texts)
+    CompetencyLevel.objects.bulk_create(new_levels, batch_size=1000)
+    CompetencyLevel.objects.bulk_update(levels_to_update, ["title"], batch_size=1000)
+    LevelIndicator.objects.bulk_create(new_indicators, batch_size=1000)
+    LevelIndicator.objects.bulk_update(indicators_to_update, ["text"], batch_size=1000)
+
+    # Sin valoraciones que borrar en cascada; el catálogo se invalida una vez, tras el commit.
+    with bulk_catalog_change():
+        if indicators_to_delete:
+            LevelIndicator.objects.filter(id__in=[ind.id for ind in indicators_to_delete]).delete()
+        if level_ids_to_delete:
+            CompetencyLevel.objects.filter(id__in=level_ids_to_delete).delete()
+
+    result.competencies_created = len(new_comps)
+    result.competencies_updated = len(comps_to_update)
+    result.levels_created = len(new_levels)
+    result.levels_updated = len(levels_to_update)
+    result.levels_deleted = len(level_ids_to_delete)
+    result.indicators_created = len(new_indicators)
+    result.indicators_updated = len(indicators_to_update)
+    result.indicators_deleted = len(indicators_to_delete)
+
+    if result.changed:
+        transaction.on_commit(lambda: catalog_changed.send(sender=Competency))
+
+
+def _queue_open_cycle_recomputes(created_by):
+    """
+    Encola (ImportJob) el recálculo de los ciclos abiertos con scores: el score cualitativo
+    depende de cuántos comportamientos tiene cada nivel. Los cerrados se quedan como estaban.
+    Devuelve los ids de los jobs.
+    """
+    cycles = EvaluationCycle.objects.filter(
+        end_date__gte=timezone.localdate(), snapshot__isnull=True, employee_scores__isnull=False
+    ).distinct()
+    return [enqueue_recompute_job(cycle_id=cycle.pk, created_by=created_by).pk for cycle in cycles]
+
+
+def import_competency_catalog(file_obj, *, created_by) -> CatalogImportResult:
+    """
+    Sincroniza el catálogo con el fichero (idempotente: reimportar el mismo fichero no cambia nada).
+    - Para cada competencia del fichero, sus niveles y comportamientos pasan a ser exactamente los del fichero.
+    - Las competencias que no aparecen se conservan (pueden estar en perfiles de rol).
+    - Los comportamientos se emparejan por texto normalizado; para renombrar uno (conservando id
+      y valoraciones) el fichero indica su id_comportamiento, como en la exportación. Un comportamiento
+      actual sin pareja se elimina; si tiene valoraciones (o su nivel desaparece), se rechaza el fichero.
+    - Todo o nada: con errores no se escribe; los cambios van en una transacción y
+      `catalog_changed` se envía una sola vez tras el commit.
+    - Si cambian niveles o comportamientos, se encola el recálculo de los ciclos abiertos con
+      scores (IMPORT_JOBS_BACKEND), fuera de la petición.
+    """
+    result = CatalogImportResult()
+    catalog, errors = parse_catalog_workbook(file_obj)
+    if errors:
+        result.errors = errors
+        return result
+    _apply_catalog(catalog, result)
+    if not result.errors and result.structure_changed:
+        result.recompute_job_ids = _queue_open_cycle_recomputes(created_by)
+    return result
@@ -1,19 +1,20 @@
 import io
 
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Alignment, Font, PatternFill
-from openpyxl.utils import get_column_letter
+from django.db import transaction
 
 from competencies.models import Competency, RoleCompetencyRequirement
+from competencies.signals import catalog_changed
 from people.models import Role
+from talentmap import excel
 
-HEADER_FILL = PatternFill(start_color="DCE6F1", end_color="DCE6F1", fill_type="solid")
+HEADER_FILL_COLOR = "DCE6F1"
 
 
 def build_role_profile_template():
-    wb = Workbook()
+    wb = excel.Workbook()
     ws = wb.active
     ws.title = "PerfilIdeal"
+    header_fill = excel.PatternFill(start_color=HEADER_FILL_COLOR, end_color=HEADER_FILL_COLOR, fill_type="solid")
 
     roles = list(Role.objects.select_related("department").order_by("department__name", "name"))
     competencies = list(Competency.objects.order_by("name"))
@@ -23,18 +24,18 @@ def build_role_profile_template():
     }
 
     ws.cell(row=1, column=1, value="Competencia")
-    ws.cell(row=1, column=1).font = Font(bold=True)
-    ws.cell(row=1, column=1).fill = HEADER_FILL
+    ws.cell(row=1, column=1).font = excel.Font(bold=True)
+    ws.cell(row=1, column=1).fill = header_fill
 
     for idx, role in enumerate(roles, start=2):
         ws.cell(row=1, column=idx, value=role.name)
-        ws.cell(row=1, column=idx).font = Font(bold=True)
-        ws.cell(row=1, column=idx).fill = HEADER_FILL
+        ws.cell(row=1, column=idx).font = excel.Font(bold=True)
+        ws.cell(row=1, column=idx).fill = header_fill
         ws.cell(row=2, column=idx, value=f"{role.department.name}")
-        ws.cell(row=2, column=idx).alignment = Alignment(horizontal="center")
+        ws.cell(row=2, column=idx).alignment = excel.Alignment(horizontal="center")
 
     ws.cell(row=2, column=1, value="Nivel requerido (1=Básico, 2=Avanzado, 3=Experto)")
-    ws.cell(row=2, column=1).font = Font(italic=True, color="666666")
+    ws.cell(row=2, column=1).font = excel.Font(italic=True, color="666666")
 
     for row_idx, competency in enumerate(competencies, start=3):
         ws.cell(row=row_idx, column=1, value=competency.name)
@@ -46,7 +47,7 @@ def build_role_profile_template():
     ws.freeze_panes = "B3"
     ws.column_dimensions["A"].width = 42
     for col in range(2, len(roles) + 2):
-        ws.column_dimensions[get_column_letter(col)].width = 20
+        ws.column_dimensions[excel.get_column_letter(col)].width = 20
 
     buf = io.BytesIO()
     wb.save(buf)
@@ -54,13 +55,17 @@ def build_role_profile_template():
     return buf
 
 
-def import_role_profile_template(file_obj):
-    wb = load_workbook(file_obj, data_only=True)
+def parse_role_profile_template(file_obj):
+    """
+    Lee la plantilla y devuelve (cells, errors) sin escribir en BD.
+    cells: [(competency, role, level), ...] listas para aplicar.
+    """
+    wb = excel.load_workbook(file_obj, data_only=True)
     ws = wb.active
 
     header = [str(c.value).strip() if c.value is not None else "" for c in ws[1]]
     if not header or header[0].lower() != "competencia":
-        return 0, ["La primera columna debe ser 'Competencia'."]
+        return [], ["La primera columna debe ser 'Competencia'."]
 
     role_by_name = {r.name: r for r in Role.objects.all()}
     roles = []
@@ -76,10 +81,10 @@ def import_role_profile_template(file_obj):
         roles.append((col_idx, role))
 
     if errors:
-        return 0, errors
+        return [], errors
 
     competency_by_name = {c.name: c for c in Competency.objects.all()}
-    upserts = 0
+    cells = []
 
     for row_idx in range(3, ws.max_row + 1):
         comp_name = ws.cell(row=row_idx, column=1).value
@@ -104,11 +109,84 @@ def import_role_profile_template(file_obj):
                 errors.append(f"Nivel inválido en {comp_name} / {role.name}: {level}.")
                 continue
 
-            RoleCompetencyRequirement.objects.update_or_create(
-                role=role,
-                competency=competency,
-                defaults={"required_level": level, "weight": 1},
+            cells.append((competency, role, level))
+
+    return cells, errors
+
+
+def plan_role_profile_cells(cells):
+    """
+    Dry-run: compara las celdas con los requisitos actuales (precargados en una consulta).
+    Devuelve {"changes": [...], "unchanged": n}; cada cambio es un dict serializable.
+    """
+    role_ids = {role.id for _, role, _ in cells}
+    current = {
+        (r.role_id, r.competency_id): r
+        for r in RoleCompetencyRequirement.objects.filter(role_id__in=role_ids)
+    }
+
+    changes = []
+    unchanged = 0
+    for competency, role, level in cells:
+        req = current.get((role.id, competency.id))
+        if req and int(req.required_level) == level and req.weight == 1:
+            unchanged += 1
+            continue
+        changes.append(
+            {
+                "role_id": role.id,
+                "role": role.name,
+                "competency_id": competency.id,
+                "competency": competency.name,
+                "old_level": int(req.required_level) if req else None,
+                "new_level": level,
+            }
+        )
+    return {"changes": changes, "unchanged": unchanged}
+
+
+def apply_role_profile_changes(changes):
+    """Aplica cambios de plan_role_profile_cells con bulk_create/bulk_update. Devuelve nº aplicados."""
+    if not changes:
+        return 0
+
+    existing = {
+        (r.role_id, r.competency_id): r
+        for r in RoleCompetencyRequirement.objects.filter(role_id__in={c["role_id"] for c in changes})
+    }
+    to_create = []
+    to_update = []
+    for change in changes:
+        req = existing.get((change["role_id"], change["competency_id"]))
+        if req:
+            req.required_level = change["new_level"]
+            req.weight = 1
+            to_update.append(req)
+        else:
+            to_create.append(
+                RoleCompetencyRequirement(
+                    role_id=change["role_id"],
+                    competency_id=change["competency_id"],
+                    required_level=change["new_level"],
+                    weight=1,
+                )
             )
-            upserts += 1
 
+    RoleCompetencyRequirement.objects.bulk_create(to_create)
+    RoleCompetencyRequirement.objects.bulk_update(to_update, ["required_level", "weight"])
+    transaction.on_commit(lambda: catalog_changed.send(sender=RoleCompetencyRequirement))
+    return len(to_create) + len(to_update)
+
+
+def import_role_profile_template(file_obj, dry_run=False):
+    """
+    Importa la plantilla. Con dry_run=True no escribe nada y devuelve (plan, errors)
+    en lugar de (upserts, errors).
+    """
+    cells, errors = parse_role_profile_template(file_obj)
+    plan = plan_role_profile_cells(cells)
+    if dry_run:
+        return plan, errors
+    with transaction.atomic():
+        upserts = apply_role_profile_changes(plan["changes"])
     return upserts, errors
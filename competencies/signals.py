@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Se envía una vez tras el commit de una importación masiva del catálogo
+# (bulk_create/bulk_update no disparan post_save por fila).
+catalog_changed = Signal()
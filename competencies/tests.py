@@ -1,15 +1,23 @@
 import io
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
-from openpyxl import load_workbook
+from openpyxl import Workbook, load_workbook
 
-from competencies.models import Competency, RoleCompetencyRequirement
-from people.models import Department, Role
+from competencies.excel_catalog import import_competency_catalog
+from competencies.models import Competency, CompetencyLevel, LevelIndicator, RoleCompetencyRequirement
+from evaluations.models import EmployeeCycleScore, EvaluationCycle, QualitativeIndicatorAssessment
+from people.models import Department, Employee, ImportJob, ImportJobKind, ImportJobStatus, Role
+from talentmap import cache as app_cache
 
 
+@override_settings(IMPORT_JOBS_BACKEND="inline")
 class RoleProfileConfigTests(TestCase):
     def setUp(self):
         self.dept = Department.objects.create(name="IT")
@@ -42,7 +50,7 @@ class RoleProfileConfigTests(TestCase):
         req = RoleCompetencyRequirement.objects.get(role=self.role, competency=self.comp)
         self.assertEqual(req.required_level, 2)
 
-    def test_import_role_profile_excel(self):
+    def _filled_template(self, level):
         self.client.force_login(self.hr)
         template_resp = self.client.get(reverse("download_role_profile_template"))
 
@@ -63,24 +71,215 @@ class RoleProfileConfigTests(TestCase):
                 break
         self.assertIsNotNone(role_col)
 
-        ws.cell(row=target_row, column=role_col, value=3)
+        ws.cell(row=target_row, column=role_col, value=level)
 
         out = io.BytesIO()
         wb.save(out)
-        out.seek(0)
+        return SimpleUploadedFile(
+            "perfil.xlsx",
+            out.getvalue(),
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
 
+    def test_import_role_profile_excel(self):
+        self.client.force_login(self.hr)
         response = self.client.post(
             reverse("role_profile_config"),
-            {
-                "import_profile": "1",
-                "excel_file": SimpleUploadedFile(
-                    "perfil.xlsx",
-                    out.getvalue(),
-                    content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                ),
-            },
+            {"import_profile": "1", "excel_file": self._filled_template(3)},
             follow=True,
         )
         self.assertEqual(response.status_code, 200)
         req = RoleCompetencyRequirement.objects.get(role=self.role, competency=self.comp)
         self.assertEqual(req.required_level, 3)
+
+    def test_import_dry_run_previews_changes_and_confirm_applies_them(self):
+        RoleCompetencyRequirement.objects.create(role=self.role, competency=self.comp, required_level=1, weight=1)
+        self.client.force_login(self.hr)
+
+        response = self.client.post(
+            reverse("role_profile_config"),
+            {"import_profile": "1", "dry_run": "1", "excel_file": self._filled_template(2)},
+            follow=True,
+        )
+        self.assertContains(response, "1 cambios")
+        preview = ImportJob.objects.get(status=ImportJobStatus.PREVIEW)
+        self.assertEqual(preview.plan["changes"][0]["old_level"], 1)
+        self.assertEqual(preview.plan["changes"][0]["new_level"], 2)
+        self.assertEqual(RoleCompetencyRequirement.objects.get(role=self.role).required_level, 1)
+
+        self.client.post(reverse("confirm_import", args=[preview.id]))
+        self.assertEqual(RoleCompetencyRequirement.objects.get(role=self.role).required_level, 2)
+
+
+
+class CompetencyCatalogTests(TestCase):
+    def setUp(self):
+        self.hr = User.objects.create_superuser("hr", "hr@test.com", "pass")
+        self.comp = Competency.objects.create(name="Liderazgo", description="Guía al equipo")
+        self.l1 = CompetencyLevel.objects.create(competency=self.comp, level=1, title="Básico")
+        self.keep = LevelIndicator.objects.create(level=self.l1, text="Da feedback")
+        LevelIndicator.objects.create(level=self.l1, text="Obsoleto")
+        CompetencyLevel.objects.create(competency=self.comp, level=3, title="Experto")
+
+    def _export(self):
+        self.client.force_login(self.hr)
+        response = self.client.get(reverse("export_competency_catalog"))
+        self.assertEqual(response.status_code, 200)
+        return io.BytesIO(b"".join(response.streaming_content))
+
+    def _upload(self, rows):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["competencia", "descripcion", "nivel", "titulo_nivel", "comportamiento", "id_comportamiento"])
+        for row in rows:
+            ws.append(row)
+        buf = io.BytesIO()
+        wb.save(buf)
+        return SimpleUploadedFile("catalogo.xlsx", buf.getvalue())
+
+    def test_export_then_import_is_a_no_op(self):
+        exported = self._export()
+        result = import_competency_catalog(exported, created_by=self.hr)
+        self.assertEqual(result.errors, [])
+        self.assertFalse(result.changed)
+
+    def test_import_diffs_against_current_catalog(self):
+        with patch("competencies.excel_catalog.catalog_changed.send") as send:
+            with self.captureOnCommitCallbacks(execute=True):
+                result = import_competency_catalog(
+                    self._upload([
+                        ["Liderazgo", "Guía al equipo", 1, "Inicial", "Da feedback"],
+                        ["Liderazgo", None, 2, "Avanzado", "Delega"],
+                        ["Comunicación", "Nueva", 1, None, "Escucha"],
+                    ]),
+                    created_by=self.hr,
+                )
+
+        self.assertEqual(result.errors, [])
+        self.assertEqual((result.competencies_created, result.competencies_updated), (1, 0))
+        self.assertEqual((result.levels_created, result.levels_updated, result.levels_deleted), (2, 1, 1))
+        self.assertEqual((result.indicators_created, result.indicators_deleted), (2, 1))
+        self.assertEqual(send.call_count, 1)
+        self.assertTrue(LevelIndicator.objects.filter(pk=self.keep.pk).exists())
+        self.assertEqual(
+            list(CompetencyLevel.objects.filter(competency=self.comp).values_list("level", "title")),
+            [(1, "Inicial"), (2, "Avanzado")],
+        )
+
+    def _rated(self, indicator):
+        dept = Department.objects.create(name="IT")
+        employee = Employee.objects.create(
+            user=User.objects.create_user("ana"), department=dept, role=Role.objects.create(name="Dev", department=dept)
+        )
+        cycle = EvaluationCycle.objects.create(name="FY", start_date=date(2026, 1, 1), end_date=date(2099, 12, 31))
+        QualitativeIndicatorAssessment.objects.create(
+            employee=employee, cycle=cycle, indicator=indicator, rating=4, assessed_by=self.hr
+        )
+        return employee, cycle
+
+    def test_behavior_renamed_by_id_keeps_its_ratings(self):
+        obsolete = LevelIndicator.objects.get(text="Obsoleto")
+        self._rated(obsolete)
+
+        result = import_competency_catalog(
+            self._upload([
+                ["Liderazgo", "Guía al equipo", 1, "Básico", "  da   FEEDBACK "],
+                ["Liderazgo", None, 1, None, "Pide feedback", obsolete.id],
+                ["Liderazgo", None, 3, "Experto", None],
+            ]),
+            created_by=self.hr,
+        )
+
+        self.assertEqual(result.errors, [])
+        self.assertEqual((result.indicators_created, result.indicators_updated, result.indicators_deleted), (0, 1, 0))
+        obsolete.refresh_from_db()
+        self.assertEqual(obsolete.text, "Pide feedback")
+        self.assertTrue(QualitativeIndicatorAssessment.objects.filter(indicator=obsolete).exists())
+        self.assertTrue(LevelIndicator.objects.filter(pk=self.keep.pk).exists())
+        self.assertEqual(result.recompute_job_ids, [])
+
+    def test_replacing_a_rated_behavior_without_id_is_a_removal(self):
+        # Borrar B y añadir D en la misma hoja no traspasa las valoraciones de B a D.
+        self._rated(LevelIndicator.objects.get(text="Obsoleto"))
+
+        result = import_competency_catalog(
+            self._upload([
+                ["Liderazgo", None, 1, None, "Da feedback"],
+                ["Liderazgo", None, 1, None, "Delega"],
+                ["Liderazgo", None, 3, None, None],
+            ]),
+            created_by=self.hr,
+        )
+
+        self.assertEqual(
+            result.errors,
+            ["Liderazgo, nivel 1: el comportamiento 'Obsoleto' tiene valoraciones y no se puede eliminar."],
+        )
+        self.assertFalse(LevelIndicator.objects.filter(text="Delega").exists())
+
+    def test_id_from_another_level_rejects_the_file(self):
+        result = import_competency_catalog(
+            self._upload([["Liderazgo", None, 3, None, "Experto", self.keep.id]]), created_by=self.hr
+        )
+
+        self.assertEqual(
+            result.errors, [f"Liderazgo, nivel 3: el comportamiento con id {self.keep.id} no pertenece a este nivel."]
+        )
+        self.assertEqual(LevelIndicator.objects.count(), 2)
+
+    def test_deleting_rated_behaviors_rejects_the_file(self):
+        self._rated(LevelIndicator.objects.get(text="Obsoleto"))
+
+        result = import_competency_catalog(self._upload([["Liderazgo", None, 3, None, "Nuevo"]]), created_by=self.hr)
+
+        self.assertEqual(
+            result.errors,
+            ["Liderazgo, nivel 1: el comportamiento 'Obsoleto' tiene valoraciones y no se puede eliminar."],
+        )
+        self.assertFalse(result.changed)
+        self.assertEqual(QualitativeIndicatorAssessment.objects.count(), 1)
+        self.assertEqual(LevelIndicator.objects.count(), 2)
+
+    @override_settings(IMPORT_JOBS_BACKEND="worker")
+    def test_structural_change_invalidates_once_and_queues_open_cycle_recomputes(self):
+        employee, cycle = self._rated(self.keep)
+        closed = EvaluationCycle.objects.create(name="FY2020", start_date=date(2020, 1, 1), end_date=date(2020, 12, 31))
+        for scored in (cycle, closed):
+            EmployeeCycleScore.objects.create(
+                employee=employee, cycle=scored, qualitative_score=Decimal("0"), quantitative_score=Decimal("0")
+            )
+        upload = self._upload([["Liderazgo", None, 1, None, "Da feedback"]])
+
+        with patch("competencies.catalog.app_cache.invalidate", wraps=app_cache.invalidate) as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                result = import_competency_catalog(upload, created_by=self.hr)
+
+        self.assertEqual((result.levels_deleted, result.indicators_deleted), (1, 1))
+        catalog_calls = [c for c in invalidate.call_args_list if c.args == (app_cache.CATALOG_NAMESPACE,)]
+        self.assertEqual(len(catalog_calls), 1)
+        # Solo el ciclo abierto, y fuera de la petición: aún sin recalcular.
+        job = ImportJob.objects.get(pk__in=result.recompute_job_ids)
+        self.assertEqual(
+            (job.kind, job.status, job.plan), (ImportJobKind.RECOMPUTE_SCORES, ImportJobStatus.PENDING, {"cycle_id": cycle.pk})
+        )
+        self.assertIsNone(EmployeeCycleScore.objects.get(cycle=cycle).competencies_above)
+
+        call_command("process_import_jobs", stdout=io.StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJobStatus.DONE)
+        self.assertIsNotNone(EmployeeCycleScore.objects.get(cycle=cycle).competencies_above)
+        self.assertIsNone(EmployeeCycleScore.objects.get(cycle=closed).competencies_above)
+
+    def test_invalid_row_rejects_whole_file(self):
+        self.client.force_login(self.hr)
+        response = self.client.post(
+            reverse("role_profile_config"),
+            {
+                "import_catalog": "1",
+                "excel_file": self._upload([["Nueva", None, 1, None, "A"], ["Nueva", None, "x", None, "B"]]),
+            },
+            follow=True,
+        )
+        self.assertContains(response, "Fila 3: nivel inválido")
+        self.assertFalse(Competency.objects.filter(name="Nueva").exists())
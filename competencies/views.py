@@ -1,12 +1,20 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 
+from competencies.excel_catalog import build_catalog_xlsx, import_competency_catalog
 from competencies.excel_profiles import build_role_profile_template, import_role_profile_template
 from competencies.models import Competency, RoleCompetencyRequirement
-from people.models import Role
+from people.models import ImportJobKind, Role
 from people.services.access import is_hr
+from people.services.import_jobs import (
+    create_import_preview,
+    enqueue_import_job,
+    requested_import_job,
+    requested_import_preview,
+)
 
 
 @login_required
@@ -55,18 +63,53 @@ def role_profile_config(request):
             messages.success(request, f"Perfil ideal actualizado para {selected_role.name}. ({saved} filas)")
             return redirect(f"{request.path}?role={selected_role.id}")
 
-        if "import_profile" in request.POST:
+        if "import_catalog" in request.POST:
             if "excel_file" not in request.FILES:
                 messages.error(request, "Selecciona un archivo Excel para importar.")
                 return redirect("role_profile_config")
 
-            upserts, errors = import_role_profile_template(request.FILES["excel_file"])
-            for e in errors:
+            result = import_competency_catalog(request.FILES["excel_file"], created_by=request.user)
+            for e in result.errors:
                 messages.error(request, e)
-            if upserts:
-                messages.success(request, f"Importación completada. Celdas aplicadas: {upserts}.")
+            if result.errors:
+                messages.warning(request, "No se ha importado el catálogo. Corrige los errores y vuelve a subir el archivo.")
+            elif not result.changed:
+                messages.info(request, "El catálogo ya estaba actualizado.")
+            else:
+                messages.success(
+                    request,
+                    f"Catálogo actualizado: competencias {result.competencies_created} nuevas / "
+                    f"{result.competencies_updated} editadas; niveles {result.levels_created} nuevos / "
+                    f"{result.levels_updated} editados / {result.levels_deleted} eliminados; comportamientos "
+                    f"{result.indicators_created} nuevos / {result.indicators_updated} editados / "
+                    f"{result.indicators_deleted} eliminados.",
+                )
+                if result.recompute_job_ids:
+                    messages.info(
+                        request,
+                        f"Recálculo de scores en cola para {len(result.recompute_job_ids)} ciclo(s) abierto(s).",
+                    )
             return redirect("role_profile_config")
 
+        if "import_profile" in request.POST:
+            if "excel_file" not in request.FILES:
+                messages.error(request, "Selecciona un archivo Excel para importar.")
+                return redirect("role_profile_config")
+
+            upload = request.FILES["excel_file"]
+            if request.POST.get("dry_run"):
+                plan, errors = import_role_profile_template(upload, dry_run=True)
+                preview = create_import_preview(
+                    kind=ImportJobKind.ROLE_PROFILE,
+                    upload=upload,
+                    plan={**plan, "errors": errors},
+                    created_by=request.user,
+                )
+                return redirect(f"{reverse('role_profile_config')}?preview={preview.id}")
+
+            job = enqueue_import_job(kind=ImportJobKind.ROLE_PROFILE, upload=upload, created_by=request.user)
+            return redirect(f"{reverse('role_profile_config')}?job={job.id}")
+
     return render(
         request,
         "competencies/role_profile_config.html",
@@ -75,6 +118,8 @@ def role_profile_config(request):
             "competencies": competencies,
             "selected_role": selected_role,
             "req_map": req_map,
+            "import_job": requested_import_job(request, ImportJobKind.ROLE_PROFILE),
+            "import_preview": requested_import_preview(request, ImportJobKind.ROLE_PROFILE),
         },
     )
 
@@ -91,3 +136,16 @@ def download_role_profile_template(request):
     )
     response["Content-Disposition"] = 'attachment; filename="perfil_ideal_roles.xlsx"'
     return response
+
+
+@login_required
+def export_competency_catalog(request):
+    if not is_hr(request.user):
+        return render(request, "evaluations/forbidden.html", status=403)
+
+    return FileResponse(
+        build_catalog_xlsx(),
+        as_attachment=True,
+        filename="catalogo_competencias.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
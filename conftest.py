@@ -1,3 +1,3 @@
 import os
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "talentmap.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "talentmap.settings.test")
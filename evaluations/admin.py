@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import (
+    CycleSnapshot,
     EmployeeCycleScore,
     EvaluationCycle,
     TalentMapSettings,
@@ -37,6 +38,19 @@ class EmployeeCycleScoreAdmin(admin.ModelAdmin):
     list_filter = ("cycle", "box_code")
 
 
+@admin.register(CycleSnapshot)
+class CycleSnapshotAdmin(admin.ModelAdmin):
+    # Solo consulta: se generan con `manage.py finalize_cycles`.
+    list_display = ("cycle", "employee_count", "format_version", "created_at")
+    exclude = ("data",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(QualitativeIndicatorSelfAssessment)
 class QualitativeIndicatorSelfAssessmentAdmin(admin.ModelAdmin):
     list_display = ("employee", "cycle", "indicator", "rating", "updated_at")
@@ -45,7 +59,7 @@ class QualitativeIndicatorSelfAssessmentAdmin(admin.ModelAdmin):
 
 @admin.register(TalentMapSettings)
 class TalentMapSettingsAdmin(admin.ModelAdmin):
-    list_display = ("id", "qualitative_axis_method", "top_min_above", "middle_max_below", "updated_at")
+    list_display = ("id", "qualitative_axis_method", "top_min_above", "middle_max_below", "tercile_cohort", "updated_at")
 
     def has_add_permission(self, request):
         # Singleton (id=1)
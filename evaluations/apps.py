@@ -3,3 +3,21 @@ from django.apps import AppConfig
 class EvaluationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "evaluations"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from evaluations.models import (
+            EmployeeCycleScore,
+            QualitativeIndicatorAssessment,
+            QualitativeIndicatorSelfAssessment,
+        )
+        from evaluations.services.fragments import invalidate_assessment
+        from evaluations.services.scoring import invalidate_cycle_score
+
+        for model in (QualitativeIndicatorAssessment, QualitativeIndicatorSelfAssessment):
+            post_save.connect(invalidate_assessment, sender=model, dispatch_uid=f"ratings_cache_{model.__name__}_save")
+            post_delete.connect(invalidate_assessment, sender=model, dispatch_uid=f"ratings_cache_{model.__name__}_delete")
+
+        post_save.connect(invalidate_cycle_score, sender=EmployeeCycleScore, dispatch_uid="scores_cache_save")
+        post_delete.connect(invalidate_cycle_score, sender=EmployeeCycleScore, dispatch_uid="scores_cache_delete")
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from evaluations.models import EvaluationCycle
+from evaluations.services.snapshots import finalize_cycle
+
+
+class Command(BaseCommand):
+    help = "Congela en un snapshot los ciclos cerrados (por defecto, todos los que aún no lo tienen)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("cycle_ids", nargs="*", type=int, help="Ciclos concretos (deben estar cerrados).")
+        parser.add_argument("--force", action="store_true", help="Vuelve a generar snapshots ya existentes.")
+
+    def handle(self, *args, **opts):
+        if opts["cycle_ids"]:
+            cycles = EvaluationCycle.objects.filter(id__in=opts["cycle_ids"])
+        else:
+            cycles = EvaluationCycle.objects.filter(end_date__lt=timezone.localdate())
+            if not opts["force"]:
+                cycles = cycles.filter(snapshot__isnull=True)
+
+        for cycle in cycles.order_by("end_date"):
+            try:
+                snapshot = finalize_cycle(cycle, force=opts["force"])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            if snapshot is None:
+                self.stdout.write(f"{cycle.name}: ya estaba congelado")
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS(f"OK: {cycle.name} congelado ({snapshot.employee_count} empleados)")
+                )
@@ -12,5 +12,7 @@ class Command(BaseCommand):
     def handle(self, *args, **opts):
         cycle = EvaluationCycle.objects.get(id=opts["cycle_id"])
         employees = Employee.objects.filter(active=True).select_related("role", "department", "user")
-        recompute_cycle_scores(cycle, employees)
+        if not recompute_cycle_scores(cycle, employees):
+            self.stdout.write(self.style.WARNING(f"{cycle.name} está congelado: sus scores no se recalculan."))
+            return
         self.stdout.write(self.style.SUCCESS(f"OK: scores recalculados para {cycle.name}"))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("competencies", "0001_initial"),
+        ("evaluations", "0004_talentmapsettings"),
+        ("people", "0008_hot_filter_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="qualitativeindicatorassessment",
+            index=models.Index(
+                fields=["employee", "cycle", "indicator", "rating"],
+                name="eval_qual_emp_cyc_ind_rt_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("competencies", "0001_initial"),
+        ("evaluations", "0005_hot_filter_indexes"),
+        ("people", "0008_hot_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CycleSnapshot",
+            fields=[
+                (
+                    "cycle",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="snapshot",
+                        serialize=False,
+                        to="evaluations.evaluationcycle",
+                    ),
+                ),
+                ("format_version", models.PositiveSmallIntegerField(default=1)),
+                ("data", models.BinaryField()),
+                ("employee_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SnapshotCompetencyLevel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("required_level", models.PositiveSmallIntegerField()),
+                ("achieved_level", models.PositiveSmallIntegerField()),
+                (
+                    "competency",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshot_levels",
+                        to="competencies.competency",
+                    ),
+                ),
+                (
+                    "cycle",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshot_levels",
+                        to="evaluations.evaluationcycle",
+                    ),
+                ),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshot_levels",
+                        to="people.employee",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["cycle", "competency", "achieved_level"],
+                        name="evaluations_cycle_i_a82a5a_idx",
+                    )
+                ],
+                "unique_together": {("cycle", "employee", "competency")},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evaluations", "0006_cycle_snapshots"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="employeecyclescore",
+            name="competencies_above",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="employeecyclescore",
+            name="competencies_below",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
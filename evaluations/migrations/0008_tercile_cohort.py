@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evaluations", "0007_score_profile_counts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="talentmapsettings",
+            name="tercile_cohort",
+            field=models.CharField(
+                choices=[
+                    ("COMPANY", "Toda la empresa"),
+                    ("DEPARTMENT", "Por departamento"),
+                    ("ROLE", "Por rol"),
+                ],
+                default="COMPANY",
+                max_length=20,
+            ),
+        ),
+    ]
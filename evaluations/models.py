@@ -1,9 +1,11 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 
 from people.models import Employee
-from competencies.models import LevelIndicator
+from talentmap import cache as app_cache
+from competencies.models import Competency, LevelIndicator
 
 
 class EvaluationCycle(models.Model):
@@ -17,6 +19,16 @@ class EvaluationCycle(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    @property
+    def is_closed(self) -> bool:
+        """Cerrado = terminó antes de hoy: solo consulta."""
+        return self.end_date < timezone.localdate()
+
+    @property
+    def is_frozen(self) -> bool:
+        """Congelado = tiene CycleSnapshot (finalize_cycles): su 9-box ya no se recalcula."""
+        return CycleSnapshot.objects.filter(cycle_id=self.pk).exists()
+
 
 class QuantitativeGoal(models.Model):
     """
@@ -78,7 +90,11 @@ class QualitativeIndicatorAssessment(models.Model):
 
     class Meta:
         unique_together = [("employee", "cycle", "indicator")]
-        indexes = [models.Index(fields=["employee", "cycle"])]
+        indexes = [
+            models.Index(fields=["employee", "cycle"]),
+            # Cubre el conteo de ratings aprobados por nivel sin leer la tabla.
+            models.Index(fields=["employee", "cycle", "indicator", "rating"], name="eval_qual_emp_cyc_ind_rt_idx"),
+        ]
 
     def clean(self):
         if self.rating < 1 or self.rating > 4:
@@ -105,6 +121,12 @@ class EmployeeCycleScore(models.Model):
     box_code = models.CharField(max_length=32, default="")
     box_label = models.CharField(max_length=64, default="")
 
+    # Competencias por encima/debajo del perfil ideal del rol en el último recálculo: permiten
+    # reasignar el tercil cualitativo tras un cambio de configuración sin volver a las valoraciones.
+    # Null = aún no calculadas (scores anteriores a estos campos).
+    competencies_above = models.PositiveSmallIntegerField(null=True, blank=True)
+    competencies_below = models.PositiveSmallIntegerField(null=True, blank=True)
+
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -119,6 +141,37 @@ class EmployeeCycleScore(models.Model):
         return f"{self.employee} · {remember_cycle(self.cycle)}"
 
 
+class CycleSnapshot(models.Model):
+    """
+    Foto inmutable de un ciclo cerrado (evaluations/services/snapshots.py): empleados, scores y
+    boxes en un único blob comprimido. Los niveles por competencia van en SnapshotCompetencyLevel.
+    """
+    cycle = models.OneToOneField(EvaluationCycle, on_delete=models.CASCADE, primary_key=True, related_name="snapshot")
+    format_version = models.PositiveSmallIntegerField(default=1)
+    data = models.BinaryField()
+    employee_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"Snapshot · {self.cycle_id}"
+
+
+class SnapshotCompetencyLevel(models.Model):
+    """Nivel alcanzado por competencia de cada empleado al congelar un ciclo cerrado."""
+    cycle = models.ForeignKey(EvaluationCycle, on_delete=models.CASCADE, related_name="snapshot_levels")
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="snapshot_levels")
+    competency = models.ForeignKey(Competency, on_delete=models.CASCADE, related_name="snapshot_levels")
+    required_level = models.PositiveSmallIntegerField()
+    achieved_level = models.PositiveSmallIntegerField()
+
+    class Meta:
+        unique_together = [("cycle", "employee", "competency")]
+        indexes = [models.Index(fields=["cycle", "competency", "achieved_level"])]
+
+    def __str__(self) -> str:
+        return f"{self.employee_id} · {self.competency_id} = {self.achieved_level}"
+
+
 def remember_cycle(cycle: EvaluationCycle) -> str:
     # helper pequeño para evitar __str__ muy largo si lo editas a menudo
     return cycle.name
@@ -146,10 +199,16 @@ class QualitativeAxisMethod(models.TextChoices):
     GAUSSIAN = "GAUSSIAN", "Campana de Gauss (por score cualitativo)"
 
 
+class TercileCohort(models.TextChoices):
+    COMPANY = "COMPANY", "Toda la empresa"
+    DEPARTMENT = "DEPARTMENT", "Por departamento"
+    ROLE = "ROLE", "Por rol"
+
+
 class TalentMapSettings(models.Model):
     """
-    Configuración global del 9-Box.
-    Por ahora solo afecta al eje cualitativo.
+    Configuración global del 9-Box: método del eje cualitativo y cohorte de los terciles
+    (empleados con los que se compara a cada uno en el ranking y la campana).
     """
     qualitative_axis_method = models.CharField(
         max_length=20,
@@ -158,12 +217,27 @@ class TalentMapSettings(models.Model):
     )
     top_min_above = models.PositiveSmallIntegerField(default=1)
     middle_max_below = models.PositiveSmallIntegerField(default=3)
+    tercile_cohort = models.CharField(
+        max_length=20,
+        choices=TercileCohort.choices,
+        default=TercileCohort.COMPANY,
+    )
     updated_at = models.DateTimeField(auto_now=True)
 
     @classmethod
     def get_solo(cls):
-        obj, _ = cls.objects.get_or_create(pk=1)
-        return obj
+        return app_cache.get_or_build(
+            app_cache.SETTINGS_NAMESPACE, ["talentmap"], lambda: cls.objects.get_or_create(pk=1)[0]
+        )
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        app_cache.invalidate(app_cache.SETTINGS_NAMESPACE)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        app_cache.invalidate(app_cache.SETTINGS_NAMESPACE)
+        return result
 
     def __str__(self):
         return "Talent Map Settings"
@@ -0,0 +1,110 @@
+import csv
+import tempfile
+
+from evaluations.models import EmployeeCycleScore
+from evaluations.services.view_models import display_name
+from talentmap import excel
+
+# Filas leídas por consulta; mantiene la memoria constante aunque el ciclo tenga decenas de miles.
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_HEADERS = [
+    "nombre",
+    "email",
+    "departamento",
+    "rol",
+    "manager",
+    "cualitativo",
+    "cuantitativo",
+    "tercil_cualitativo",
+    "tercil_cuantitativo",
+    "box_code",
+    "box",
+]
+
+_FIELDS = (
+    "employee__user__username",
+    "employee__user__first_name",
+    "employee__user__last_name",
+    "employee__user__email",
+    "employee__department__name",
+    "employee__role__name",
+    "employee__manager__user__username",
+    "employee__manager__user__first_name",
+    "employee__manager__user__last_name",
+    "qualitative_score",
+    "quantitative_score",
+    "qual_tercile",
+    "quant_tercile",
+    "box_code",
+    "box_label",
+)
+
+
+def iter_score_rows(cycle, employees_qs):
+    """
+    Filas planas del 9-box de un ciclo (una consulta con joins, leída por bloques).
+    employees_qs: empleados ya filtrados (activos, departamento, rol).
+    """
+    qs = (
+        EmployeeCycleScore.objects.filter(cycle=cycle, employee__in=employees_qs)
+        .order_by("employee__department__name", "employee__role__name", "employee__user__last_name", "employee_id")
+        .values_list(*_FIELDS)
+    )
+    for (
+        username, first_name, last_name, email, dept, role,
+        mgr_username, mgr_first, mgr_last,
+        ql, qt, qual_t, quant_t, box_code, box_label,
+    ) in qs.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [
+            display_name(username, first_name, last_name),
+            email or "",
+            dept,
+            role,
+            display_name(mgr_username, mgr_first, mgr_last) if mgr_username else "",
+            ql,
+            qt,
+            qual_t,
+            quant_t,
+            box_code,
+            box_label,
+        ]
+
+
+class _Echo:
+    """Pseudo-buffer para csv.writer: devuelve cada línea en lugar de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+def iter_scores_csv(cycle, employees_qs):
+    writer = csv.writer(_Echo())
+    # BOM para que Excel detecte UTF-8 (acentos en nombres).
+    yield "\ufeff" + writer.writerow(EXPORT_HEADERS)
+    for row in iter_score_rows(cycle, employees_qs):
+        yield writer.writerow(row)
+
+
+def build_scores_xlsx(cycle, employees_qs):
+    """
+    Workbook en modo write-only volcado a un fichero temporal (memoria constante).
+    Devuelve el fichero posicionado al inicio; se borra al cerrarse.
+    """
+    wb = excel.Workbook(write_only=True)
+    ws = wb.create_sheet(title="9-Box")
+
+    header = []
+    for value in EXPORT_HEADERS:
+        cell = excel.WriteOnlyCell(ws, value=value)
+        cell.font = excel.Font(bold=True)
+        header.append(cell)
+    ws.append(header)
+
+    for row in iter_score_rows(cycle, employees_qs):
+        ws.append(row)
+
+    tmp = tempfile.TemporaryFile()
+    wb.save(tmp)
+    tmp.seek(0)
+    return tmp
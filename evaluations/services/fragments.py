@@ -0,0 +1,53 @@
+"""
+Versiones para la caché de fragmentos de plantilla (`{% cache %}`).
+
+Las claves de los fragmentos incluyen estas versiones: cuando cambia el catálogo, las valoraciones
+de un empleado en un ciclo o los scores del 9-box, sube la versión correspondiente y solo esos
+fragmentos se vuelven a renderizar (los de otros empleados y ciclos siguen en caché).
+
+Las versiones viven en la caché: con una caché por proceso (locmem) cada worker solo vería sus
+propias invalidaciones, así que los fragmentos solo se cachean con CACHE_IS_SHARED.
+"""
+from django.conf import settings
+
+from talentmap import cache as app_cache
+
+FRAGMENT_TIMEOUT = app_cache.DEFAULT_TIMEOUT
+
+
+def fragment_timeout():
+    """Timeout para `{% cache %}`: 0 (se renderiza siempre) si la caché no es compartida."""
+    return FRAGMENT_TIMEOUT if settings.CACHE_IS_SHARED else 0
+
+
+def _ratings_namespace(cycle_id, employee_id=None):
+    namespace = f"{app_cache.RATINGS_NAMESPACE}:{cycle_id}"
+    return namespace if employee_id is None else f"{namespace}:{employee_id}"
+
+
+def ratings_version(cycle_id, employee_id) -> str:
+    """Versión de las valoraciones (oficiales y autoevaluación) de un empleado en un ciclo."""
+    return (
+        f"{app_cache.namespace_version(_ratings_namespace(cycle_id))}"
+        f".{app_cache.namespace_version(_ratings_namespace(cycle_id, employee_id))}"
+    )
+
+
+def invalidate_ratings(cycle_id, employee_id=None):
+    """Sin employee_id invalida el ciclo entero (importaciones masivas: una sola operación)."""
+    app_cache.invalidate(_ratings_namespace(cycle_id, employee_id))
+
+
+def invalidate_assessment(sender, instance, **kwargs):
+    invalidate_ratings(instance.cycle_id, instance.employee_id)
+
+
+def fragment_versions(cycle, employee=None):
+    """Versiones para las claves de `{% cache %}` de una página (`versions.catalog`, `versions.ratings`, ...)."""
+    versions = {
+        "catalog": app_cache.namespace_version(app_cache.CATALOG_NAMESPACE),
+        "nine_box": app_cache.namespace_version(app_cache.NINE_BOX_NAMESPACE),
+    }
+    if employee is not None:
+        versions["ratings"] = ratings_version(cycle.pk, employee.pk)
+    return versions
@@ -0,0 +1,382 @@
+import io
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from competencies.models import Competency, RoleCompetencyRequirement
+from evaluations.models import BehaviorRating, QualitativeIndicatorAssessment, QuantitativeGoal
+from evaluations.services.fragments import invalidate_ratings
+from evaluations.services.scoring import lock_new_ratings
+from people.models import Employee
+from talentmap import excel
+
+GOAL_HEADERS = ["email", "titulo", "descripcion", "peso", "completado"]
+RATING_HEADERS = ["email", "competencia", "nivel", "comportamiento", "valoracion"]
+
+
+@dataclass
+class BulkImportResult:
+    created: int = 0
+    updated: int = 0
+    employees: int = 0
+    errors: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self):
+        return self.created + self.updated
+
+
+def _header_index(header, required, optional=()):
+    idx = {}
+    for name in required:
+        if name not in header:
+            return None, f"Falta la columna '{name}' en el archivo."
+        idx[name] = header.index(name)
+    for name in optional:
+        idx[name] = header.index(name) if name in header else -1
+    return idx, None
+
+
+def _read_rows(file_obj):
+    wb = excel.load_workbook(file_obj, read_only=True, data_only=True)
+    rows = wb.active.iter_rows(values_only=True)
+    header = next(rows, None)
+    if not header:
+        return [], []
+    return [str(c).strip().lower() if c else "" for c in header], rows
+
+
+def _cell(row, i):
+    if i < 0 or i >= len(row) or row[i] is None:
+        return ""
+    return str(row[i]).strip()
+
+
+def _percent(raw):
+    try:
+        value = Decimal(str(raw).replace(",", "."))
+    except (InvalidOperation, ValueError):
+        return None
+    if value < 0 or value > 100:
+        return None
+    return value.quantize(Decimal("0.01"))
+
+
+def _employees_by_email(emails):
+    return {
+        e.email_lower: e
+        for e in Employee.objects.filter(active=True)
+        .annotate(email_lower=Lower("user__email"))
+        .filter(email_lower__in=emails)
+    }
+
+
+def build_goals_template(cycle):
+    """Plantilla de metas con las metas actuales del ciclo (sirve para editar y reimportar)."""
+    wb = excel.Workbook()
+    ws = wb.active
+    ws.title = "Metas"
+    ws.append(GOAL_HEADERS)
+    for col in range(1, len(GOAL_HEADERS) + 1):
+        ws.cell(row=1, column=col).font = excel.Font(bold=True)
+        ws.column_dimensions[excel.get_column_letter(col)].width = 24
+
+    goals = (
+        QuantitativeGoal.objects.filter(cycle=cycle, employee__active=True)
+        .order_by("employee__user__email", "id")
+        .values_list("employee__user__email", "title", "description", "weight_percent", "completion_percent")
+    )
+    for email, title, description, weight, completion in goals.iterator():
+        ws.append([email, title, description, weight, completion])
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+    return buf
+
+
+def import_goals(file_obj, *, cycle, created_by) -> BulkImportResult:
+    """
+    Importa metas cuantitativas (email, titulo, peso, completado) para un ciclo.
+    - Una meta existente con el mismo título se actualiza; si no, se crea. Las no incluidas se conservan.
+    - Los pesos finales de cada empleado deben sumar 100 (validado en memoria).
+    - Todo o nada: con cualquier error no se escribe ninguna fila.
+    No recalcula scores; el llamador hace un único recálculo al final.
+    """
+    result = BulkImportResult()
+    header, rows = _read_rows(file_obj)
+    if not header:
+        result.errors.append("El archivo está vacío.")
+        return result
+    idx, error = _header_index(header, ["email", "titulo", "peso", "completado"], optional=["descripcion"])
+    if error:
+        result.errors.append(error)
+        return result
+
+    parsed = []
+    for row_num, row in enumerate(rows, start=2):
+        if not row or not any(v not in (None, "") for v in row):
+            continue
+        email = _cell(row, idx["email"]).lower()
+        title = _cell(row, idx["titulo"])
+        weight = _percent(_cell(row, idx["peso"]))
+        completion = _percent(_cell(row, idx["completado"]) or 0)
+        if not email or not title:
+            result.errors.append(f"Fila {row_num}: email y titulo son obligatorios.")
+            continue
+        if weight is None or completion is None:
+            result.errors.append(f"Fila {row_num}: peso y completado deben estar entre 0 y 100.")
+            continue
+        # Sin columna descripcion se conserva la descripción existente.
+        description = _cell(row, idx["descripcion"]) if idx["descripcion"] >= 0 else None
+        parsed.append((row_num, email, title[:200], description, weight, completion))
+
+    employees = _employees_by_email({p[1] for p in parsed})
+    existing = {}
+    for goal in QuantitativeGoal.objects.filter(cycle=cycle, employee__in=employees.values()):
+        existing.setdefault(goal.employee_id, {})[goal.title] = goal
+
+    # Estado final por empleado: {employee_id: {title: (weight, completion, description, row_num)}}
+    final = {}
+    for row_num, email, title, description, weight, completion in parsed:
+        emp = employees.get(email)
+        if not emp:
+            result.errors.append(f"Fila {row_num}: '{email}' no coincide con ningún empleado activo.")
+            continue
+        goals = final.setdefault(emp.id, {})
+        if title in goals:
+            result.errors.append(f"Fila {row_num}: la meta '{title}' de {email} está duplicada en el archivo.")
+            continue
+        goals[title] = (weight, completion, description, row_num)
+
+    emails_by_id = {e.id: email for email, e in employees.items()}
+    for emp_id, goals in final.items():
+        total = sum(w for w, _, _, _ in goals.values())
+        total += sum(g.weight_percent for t, g in existing.get(emp_id, {}).items() if t not in goals)
+        if total.quantize(Decimal("0.01")) != Decimal("100.00"):
+            result.errors.append(
+                f"{emails_by_id[emp_id]}: los pesos deben sumar exactamente 100% (suman {total.normalize():f}%)."
+            )
+
+    if result.errors:
+        return result
+
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    for emp_id, goals in final.items():
+        current = existing.get(emp_id, {})
+        for title, (weight, completion, description, _) in goals.items():
+            goal = current.get(title)
+            if goal is None:
+                to_create.append(
+                    QuantitativeGoal(
+                        employee_id=emp_id,
+                        cycle=cycle,
+                        title=title,
+                        description=description or "",
+                        weight_percent=weight,
+                        completion_percent=completion,
+                        created_by=created_by,
+                    )
+                )
+                continue
+            if description is None:
+                description = goal.description
+            if (goal.weight_percent, goal.completion_percent, goal.description) == (weight, completion, description):
+                continue
+            goal.weight_percent = weight
+            goal.completion_percent = completion
+            goal.description = description
+            goal.updated_at = now
+            to_update.append(goal)
+
+    with transaction.atomic():
+        QuantitativeGoal.objects.bulk_create(to_create, batch_size=1000)
+        QuantitativeGoal.objects.bulk_update(
+            to_update, ["weight_percent", "completion_percent", "description", "updated_at"], batch_size=1000
+        )
+
+    result.created = len(to_create)
+    result.updated = len(to_update)
+    result.employees = len(final)
+    return result
+
+
+def _rating(raw):
+    """Valoración 1..4 o su etiqueta (Nunca, Casi nunca, ...)."""
+    value = str(raw).strip().lower()
+    for choice, label in BehaviorRating.choices:
+        if value in (str(choice), label.lower()):
+            return choice
+    try:
+        number = int(Decimal(value.replace(",", ".")))
+    except (InvalidOperation, ValueError):
+        return None
+    return number if number in BehaviorRating.values else None
+
+
+def build_ratings_template(cycle):
+    """Plantilla de valoraciones con los comportamientos ya valorados en el ciclo."""
+    wb = excel.Workbook()
+    ws = wb.active
+    ws.title = "Valoraciones"
+    ws.append(RATING_HEADERS)
+    for col in range(1, len(RATING_HEADERS) + 1):
+        ws.cell(row=1, column=col).font = excel.Font(bold=True)
+        ws.column_dimensions[excel.get_column_letter(col)].width = 28
+
+    ratings = (
+        QualitativeIndicatorAssessment.objects.filter(cycle=cycle, employee__active=True)
+        .order_by("employee__user__email", "indicator__level__competency__name", "indicator__level__level", "indicator_id")
+        .values_list(
+            "employee__user__email",
+            "indicator__level__competency__name",
+            "indicator__level__level",
+            "indicator__text",
+            "rating",
+        )
+    )
+    for row in ratings.iterator():
+        ws.append(list(row))
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+    return buf
+
+
+def import_ratings(file_obj, *, cycle, assessed_by) -> BulkImportResult:
+    """
+    Importa valoraciones cualitativas oficiales (email, competencia, nivel, comportamiento, valoracion).
+    - Catálogo, empleados, requisitos de rol y valoraciones existentes se precargan (una consulta cada uno).
+    - El desbloqueo secuencial de niveles se aplica en memoria con el mismo criterio que el formulario:
+      las filas de niveles bloqueados o por encima del requerido se omiten con aviso.
+    - Todo o nada ante errores de formato/catálogo. No recalcula scores; lo hace el llamador.
+    """
+    result = BulkImportResult()
+    header, rows = _read_rows(file_obj)
+    if not header:
+        result.errors.append("El archivo está vacío.")
+        return result
+    idx, error = _header_index(header, RATING_HEADERS)
+    if error:
+        result.errors.append(error)
+        return result
+
+    # Catálogo: {nombre_competencia: competency} y {(competency_id, nivel, texto): indicador}
+    competencies = {}
+    indicators = {}
+    for comp in Competency.objects.prefetch_related("levels__indicators"):
+        competencies[comp.name.strip().lower()] = comp
+        for lvl in comp.levels.all():
+            for ind in lvl.indicators.all():
+                indicators.setdefault((comp.id, lvl.level, ind.text.strip().lower()), ind)
+
+    parsed = []
+    for row_num, row in enumerate(rows, start=2):
+        if not row or not any(v not in (None, "") for v in row):
+            continue
+        email = _cell(row, idx["email"]).lower()
+        comp = competencies.get(_cell(row, idx["competencia"]).lower())
+        text = _cell(row, idx["comportamiento"]).lower()
+        rating = _rating(_cell(row, idx["valoracion"]))
+        try:
+            level = int(Decimal(_cell(row, idx["nivel"]).replace(",", ".")))
+        except (InvalidOperation, ValueError):
+            level = None
+
+        if not email or not text:
+            result.errors.append(f"Fila {row_num}: email y comportamiento son obligatorios.")
+            continue
+        if comp is None:
+            result.errors.append(f"Fila {row_num}: la competencia '{_cell(row, idx['competencia'])}' no existe.")
+            continue
+        ind = indicators.get((comp.id, level, text))
+        if ind is None:
+            result.errors.append(
+                f"Fila {row_num}: el comportamiento no existe en el nivel {_cell(row, idx['nivel'])} de {comp.name}."
+            )
+            continue
+        if rating is None:
+            result.errors.append(f"Fila {row_num}: la valoración debe ser 1-4 o Nunca/Casi nunca/Casi siempre/Siempre.")
+            continue
+        parsed.append((row_num, email, comp, ind, rating))
+
+    employees = _employees_by_email({p[1] for p in parsed})
+    requirements = {
+        (role_id, comp_id): int(level)
+        for role_id, comp_id, level in RoleCompetencyRequirement.objects.filter(
+            role_id__in={e.role_id for e in employees.values()}
+        ).values_list("role_id", "competency_id", "required_level")
+    }
+    existing = {}
+    for emp_id, ind_id, rating in QualitativeIndicatorAssessment.objects.filter(
+        cycle=cycle, employee__in=employees.values()
+    ).values_list("employee_id", "indicator_id", "rating"):
+        existing.setdefault(emp_id, {})[ind_id] = int(rating)
+
+    # {(employee, competency): {indicator_id: (rating, row_num)}}
+    batches = {}
+    for row_num, email, comp, ind, rating in parsed:
+        emp = employees.get(email)
+        if not emp:
+            result.errors.append(f"Fila {row_num}: '{email}' no coincide con ningún empleado activo.")
+            continue
+        batch = batches.setdefault((emp, comp), {})
+        if ind.id in batch:
+            result.errors.append(f"Fila {row_num}: el comportamiento está duplicado para {email}.")
+            continue
+        batch[ind.id] = (rating, row_num)
+
+    if result.errors:
+        return result
+
+    emails_by_id = {e.id: email for email, e in employees.items()}
+    to_write = []
+    created = 0
+    for (emp, comp), batch in batches.items():
+        required_level = requirements.get((emp.role_id, comp.id), 1)
+        levels = [lvl for lvl in comp.levels.all() if lvl.level <= required_level]
+        rating_map = existing.get(emp.id, {})
+        accepted, skipped = lock_new_ratings(
+            levels, rating_map, {ind_id: r for ind_id, (r, _) in batch.items()}, required_level
+        )
+        for ind_id in skipped:
+            result.warnings.append(
+                f"Fila {batch[ind_id][1]}: nivel bloqueado o por encima del requerido para "
+                f"{emails_by_id[emp.id]} en {comp.name}; se omite."
+            )
+        changed = [ind_id for ind_id, r in accepted.items() if rating_map.get(ind_id) != r]
+        created += sum(1 for ind_id in changed if ind_id not in rating_map)
+        to_write.extend(
+            QualitativeIndicatorAssessment(
+                employee=emp,
+                cycle=cycle,
+                indicator_id=ind_id,
+                rating=accepted[ind_id],
+                assessed_by=assessed_by,
+            )
+            for ind_id in changed
+        )
+
+    with transaction.atomic():
+        # assessed_at es auto_now: bulk_create lo rellena también en las filas actualizadas.
+        QualitativeIndicatorAssessment.objects.bulk_create(
+            to_write,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["employee", "cycle", "indicator"],
+            update_fields=["rating", "assessed_by", "assessed_at"],
+        )
+        # bulk_create no dispara post_save: una invalidación para todo el ciclo.
+        invalidate_ratings(cycle.pk)
+
+    result.created = created
+    result.updated = len(to_write) - created
+    result.employees = len({emp.id for emp, _ in batches})
+    return result
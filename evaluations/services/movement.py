@@ -0,0 +1,164 @@
+"""
+Movimientos de talento entre dos ciclos: matriz 9×9 (box de origen × box de destino) y detalle
+de las personas de cada transición.
+
+La matriz sale de un único agregado sobre EmployeeCycleScore unido consigo mismo por empleado
+(solo cuentan quienes tienen score en ambos ciclos) y se cachea por la versión de scores de cada
+ciclo: recalcular un ciclo no invalida las matrices entre otros ciclos.
+"""
+from django.db.models import Count
+
+from evaluations.models import EmployeeCycleScore
+from evaluations.services.scoring import BOXES, score_version
+from evaluations.services.view_models import display_name
+from talentmap import cache as app_cache
+
+# Filas y columnas de la matriz: de Estrellas a En riesgo, como BOXES.
+BOX_ORDER = list(BOXES)
+BOX_BY_CODE = {code: key for key, (code, _) in BOXES.items()}
+
+# Relación de la fila de origen en el self-join (employee -> cycle_scores del ciclo anterior).
+_FROM = "employee__cycle_scores__"
+
+
+def _transitions(from_cycle, to_cycle, dept_id=None, role_id=None, **box_filters):
+    # Un solo filter(): las condiciones sobre employee__cycle_scores comparten el mismo join.
+    filters = {
+        "cycle": to_cycle,
+        "employee__active": True,
+        f"{_FROM}cycle": from_cycle,
+        **box_filters,
+    }
+    if dept_id:
+        filters["employee__department_id"] = dept_id
+    if role_id:
+        filters["employee__role_id"] = role_id
+    return EmployeeCycleScore.objects.filter(**filters)
+
+
+def _trend(from_box, to_box):
+    if from_box == to_box:
+        return "stayed"
+    delta = sum(to_box) - sum(from_box)
+    if delta > 0:
+        return "improved"
+    if delta < 0:
+        return "declined"
+    return "lateral"
+
+
+def movement_matrix(from_cycle, to_cycle, dept_id=None, role_id=None):
+    """
+    Matriz de movimientos de los empleados activos (con los filtros del 9-box):
+
+        {"rows": [{"code", "label", "cells": [{"code", "n", "trend"}], "total"}],
+         "columns": [{"code", "label", "total"}], "total", "stayed", "improved", "declined", "lateral"}
+
+    Una consulta; cacheada por (versión de scores de cada ciclo, organigrama, filtros).
+    """
+
+    def build():
+        counts = {
+            ((fq, fqt), (tq, tqt)): n
+            for fq, fqt, tq, tqt, n in _transitions(from_cycle, to_cycle, dept_id, role_id)
+            .order_by()
+            .values(f"{_FROM}qual_tercile", f"{_FROM}quant_tercile", "qual_tercile", "quant_tercile")
+            .annotate(n=Count("id"))
+            .values_list(f"{_FROM}qual_tercile", f"{_FROM}quant_tercile", "qual_tercile", "quant_tercile", "n")
+        }
+        summary = {"total": 0, "stayed": 0, "improved": 0, "declined": 0, "lateral": 0}
+        col_totals = dict.fromkeys(BOX_ORDER, 0)
+        rows = []
+        for from_box in BOX_ORDER:
+            cells = []
+            for to_box in BOX_ORDER:
+                n = counts.get((from_box, to_box), 0)
+                trend = _trend(from_box, to_box)
+                cells.append({"code": BOXES[to_box][0], "n": n, "trend": trend})
+                col_totals[to_box] += n
+                summary[trend] += n
+                summary["total"] += n
+            code, label = BOXES[from_box]
+            rows.append({"code": code, "label": label, "cells": cells, "total": sum(c["n"] for c in cells)})
+        columns = [{"code": BOXES[box][0], "label": BOXES[box][1], "total": col_totals[box]} for box in BOX_ORDER]
+        return {"rows": rows, "columns": columns, **summary}
+
+    return app_cache.get_or_build(
+        app_cache.MOVEMENT_NAMESPACE,
+        [
+            "matrix",
+            from_cycle.pk,
+            score_version(from_cycle.pk),
+            to_cycle.pk,
+            score_version(to_cycle.pk),
+            # Activo, departamento y rol son datos actuales del empleado.
+            app_cache.namespace_version(app_cache.ORG_NAMESPACE),
+            dept_id or "",
+            role_id or "",
+        ],
+        build,
+    )
+
+
+class MovementRow:
+    """Empleado de una transición: scores y box en el ciclo de origen y en el de destino."""
+
+    __slots__ = (
+        "employee_id",
+        "name",
+        "department",
+        "role",
+        "from_qualitative_score",
+        "from_quantitative_score",
+        "from_box_label",
+        "to_qualitative_score",
+        "to_quantitative_score",
+        "to_box_label",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+
+def movement_rows(from_cycle, to_cycle, from_code, to_code, dept_id=None, role_id=None):
+    """Personas que pasaron del box `from_code` al box `to_code` (códigos de BOXES), por nombre."""
+    (fq, fqt), (tq, tqt) = BOX_BY_CODE[from_code], BOX_BY_CODE[to_code]
+    qs = _transitions(
+        from_cycle,
+        to_cycle,
+        dept_id,
+        role_id,
+        **{f"{_FROM}qual_tercile": fq, f"{_FROM}quant_tercile": fqt, "qual_tercile": tq, "quant_tercile": tqt},
+    ).order_by("employee__user__first_name", "employee__user__last_name", "employee__user__username")
+    return [
+        MovementRow(
+            employee_id=employee_id,
+            name=display_name(username, first_name, last_name),
+            department=dept,
+            role=role,
+            from_qualitative_score=from_ql,
+            from_quantitative_score=from_qt,
+            from_box_label=from_label,
+            to_qualitative_score=to_ql,
+            to_quantitative_score=to_qt,
+            to_box_label=to_label,
+        )
+        for (
+            employee_id, username, first_name, last_name, dept, role,
+            from_ql, from_qt, from_label, to_ql, to_qt, to_label,
+        ) in qs.values_list(
+            "employee_id",
+            "employee__user__username",
+            "employee__user__first_name",
+            "employee__user__last_name",
+            "employee__department__name",
+            "employee__role__name",
+            f"{_FROM}qualitative_score",
+            f"{_FROM}quantitative_score",
+            f"{_FROM}box_label",
+            "qualitative_score",
+            "quantitative_score",
+            "box_label",
+        )
+    ]
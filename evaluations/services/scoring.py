@@ -1,5 +1,8 @@
 from decimal import Decimal
-from statistics import mean, pstdev
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
 
 from competencies.models import Competency, RoleCompetencyRequirement
 from evaluations.models import (
@@ -7,8 +10,16 @@ from evaluations.models import (
     QualitativeAxisMethod,
     QualitativeIndicatorAssessment,
     TalentMapSettings,
+    TercileCohort,
     QuantitativeGoal,
 )
+from evaluations.services import terciles
+from talentmap import cache as app_cache
+
+# Filas de EmployeeCycleScore escritas por transacción en el recálculo.
+SCORE_WRITE_CHUNK = 500
+# Empleados calculados entre cada aviso de progreso (recompute_cycle_scores(progress=...)).
+SCORE_PROGRESS_EVERY = 200
 
 # Para subir de nivel, el comportamiento debe estar en Casi siempre (3) o Siempre (4)
 PASS_RATING = 3
@@ -25,6 +36,9 @@ BOXES = {
     (1, 1): ("RISK", "En riesgo"),
 }
 
+# BOXES por índice (qual_tercile - 1) * 3 + (quant_tercile - 1), como terciles.box_indexes.
+BOX_TABLE = tuple(BOXES[(qual_t, quant_t)] for qual_t in (1, 2, 3) for quant_t in (1, 2, 3))
+
 
 def compute_quantitative_score(employee, cycle) -> Decimal:
     """
@@ -67,24 +81,104 @@ def _achieved_level_for_competency(employee, cycle, competency: Competency) -> i
     return achieved
 
 
+def qual_progress(levels, rating_map, required_level):
+    """
+    Devuelve (achieved_level, unlocked_max_level, missing_level)
+    - achieved_level: último nivel completado (con indicadores).
+    - unlocked_max_level: primer nivel NO completado (editable) o nivel con config incompleta.
+    - missing_level: número de nivel sin indicadores (si existe).
+    """
+    achieved = 0
+    unlocked = 1
+    missing_level = None
+
+    for lvl in levels:
+        inds = list(lvl.indicators.all())
+        if not inds:
+            missing_level = lvl.level
+            unlocked = lvl.level
+            break
+
+        passed = sum(1 for ind in inds if rating_map.get(ind.id, 1) >= PASS_RATING)
+        if passed == len(inds):
+            achieved = lvl.level
+            unlocked = min(lvl.level + 1, required_level)
+        else:
+            unlocked = lvl.level
+            break
+
+    unlocked = max(1, min(unlocked, required_level))
+    return achieved, unlocked, missing_level
+
+
+def lock_new_ratings(levels, rating_map, new_ratings, required_level):
+    """
+    Aplica el desbloqueo secuencial a un lote de ratings nuevos, igual que el formulario:
+    un nivel solo admite ratings si los anteriores quedan superados tras aplicar el lote
+    (no obliga a guardar entre niveles).
+    - levels: niveles <= requerido con indicadores precargados, ordenados.
+    - rating_map / new_ratings: {indicator_id: rating}.
+    Devuelve (accepted, skipped) como {indicator_id: rating}.
+    """
+    _, unlocked_max, _ = qual_progress(levels, rating_map, required_level)
+    merged = dict(rating_map)
+    accepted = {}
+
+    for lvl in levels:
+        if lvl.level > unlocked_max:
+            continue
+
+        inds = list(lvl.indicators.all())
+        for ind in inds:
+            if ind.id in new_ratings:
+                accepted[ind.id] = new_ratings[ind.id]
+                merged[ind.id] = new_ratings[ind.id]
+
+        # Recalcula desbloqueo dentro del mismo lote.
+        if inds:
+            passed = sum(1 for ind in inds if merged.get(ind.id, 1) >= PASS_RATING)
+            if passed == len(inds):
+                unlocked_max = min(lvl.level + 1, required_level)
+            else:
+                break
+
+    skipped = {ind_id: r for ind_id, r in new_ratings.items() if ind_id not in accepted}
+    return accepted, skipped
+
+
 def compute_qualitative_score(employee, cycle) -> Decimal:
     """
     CUALITATIVO = compara nivel alcanzado vs nivel requerido por rol para cada competencia.
     Score por competencia: min(achieved/required, 1) * 100
     Agrega ponderado por weight.
     """
+    score, _, _ = _qualitative_breakdown(employee, cycle)
+    return score
+
+
+def _qualitative_breakdown(employee, cycle):
+    """
+    (score cualitativo, competencias por encima del perfil, competencias por debajo), con un
+    único cálculo del nivel alcanzado por competencia.
+    """
     role = employee.role
-    reqs = RoleCompetencyRequirement.objects.filter(role=role).select_related("competency")
-    if not reqs.exists():
-        return Decimal("0")
+    reqs = list(RoleCompetencyRequirement.objects.filter(role=role).select_related("competency"))
+    if not reqs:
+        return Decimal("0"), 0, 0
 
     weighted_sum = Decimal("0")
     weight_total = Decimal("0")
+    above = 0
+    below = 0
 
     for req in reqs:
-        required = max(1, int(req.required_level))
         achieved = _achieved_level_for_competency(employee, cycle, req.competency)
+        if achieved > int(req.required_level):
+            above += 1
+        elif achieved < int(req.required_level):
+            below += 1
 
+        required = max(1, int(req.required_level))
         ratio = Decimal(min(achieved / required, 1))
         score = ratio * Decimal("100")
 
@@ -93,31 +187,10 @@ def compute_qualitative_score(employee, cycle) -> Decimal:
         weight_total += w
 
     if weight_total == 0:
-        return Decimal("0")
+        return Decimal("0"), above, below
 
     total = weighted_sum / weight_total
-    return max(Decimal("0"), min(Decimal("100"), total))
-
-
-def assign_tercile_by_rank(sorted_pairs):
-    """
-    sorted_pairs: [(obj, value), ...] ordenado ascendente por value.
-    Devuelve {obj: tercile} con tercile 1..3 garantizando ~1/3 en cada tercil.
-    """
-    n = len(sorted_pairs)
-    if n == 0:
-        return {}
-
-    third = max(1, n // 3)
-    result = {}
-    for i, (obj, _) in enumerate(sorted_pairs):
-        if i < third:
-            result[obj] = 1
-        elif i < 2 * third:
-            result[obj] = 2
-        else:
-            result[obj] = 3
-    return result
+    return max(Decimal("0"), min(Decimal("100"), total)), above, below
 
 
 def terciles_for_scores(scores):
@@ -132,108 +205,213 @@ def terciles_for_scores(scores):
     return grid
 
 
-def _counts_against_role_profile(employee, cycle):
-    above = 0
-    below = 0
-
-    reqs = RoleCompetencyRequirement.objects.filter(role=employee.role).select_related("competency")
-    for req in reqs:
-        achieved = _achieved_level_for_competency(employee, cycle, req.competency)
-        required = int(req.required_level)
-        if achieved > required:
-            above += 1
-        elif achieved < required:
-            below += 1
-
-    return above, below
-
-
-def _qual_tercile_by_profile_rules(employee, cycle, cfg: TalentMapSettings):
-    above, below = _counts_against_role_profile(employee, cycle)
-    delta = above - below
-
-    # Tercio superior: 0 por debajo y >= mínimo por encima.
-    if below == 0 and above >= int(cfg.top_min_above):
-        return 3
-
-    # Tercio bajo: demasiadas por debajo o balance negativo.
-    if below > int(cfg.middle_max_below) or delta < 0:
-        return 1
+def nine_box_counts(cycle, dept_id=None, role_id=None):
+    """
+    {box_code: empleados} de los activos del ciclo con los filtros del 9-box.
+    Cacheado; se invalida al escribir scores y al cambiar empleados.
+    """
 
-    # Tercio intermedio: balance >= 0 con alguna por debajo, o balance exacto.
-    if delta == 0 or (delta > 0 and below > 0):
-        return 2
+    def build():
+        qs = EmployeeCycleScore.objects.filter(cycle=cycle, employee__active=True)
+        if dept_id:
+            qs = qs.filter(employee__department_id=dept_id)
+        if role_id:
+            qs = qs.filter(employee__role_id=role_id)
+        return dict(qs.order_by().values("box_code").annotate(n=Count("id")).values_list("box_code", "n"))
 
-    return 1
+    return app_cache.get_or_build(
+        app_cache.NINE_BOX_NAMESPACE, ["counts", cycle.pk, dept_id or "", role_id or ""], build
+    )
 
 
-def _qual_tercile_by_gaussian(results):
+def cohort_terciles(cfg, employee_ids, departments, roles, qualitative, quantitative, above, below):
     """
-    Divide por campana usando cortes de terciles para normal:
-    z ≈ -0.4307 y z ≈ +0.4307.
+    Terciles de cada posición según cfg (TalentMapSettings, guardada o no), en una pasada
+    agrupada por la cohorte de cfg.tercile_cohort (toda la empresa, departamento o rol):
+    - cualitativo: campana de Gauss sobre los scores (cortes z ≈ ∓0.4307) o reglas del perfil
+      sobre las competencias por encima/debajo;
+    - cuantitativo: ranking por score; a igualdad, por id de empleado.
+    Listas alineadas. Devuelve (qual_terciles, quant_terciles), o None si el método es por
+    tercios y a alguna posición le faltan los conteos.
     """
-    if not results:
-        return {}
-
-    values = [float(r[1]) for r in results]
-    if len(values) < 2:
-        return {r[0]: 2 for r in results}
-
-    sigma = pstdev(values)
-    if sigma == 0:
-        return {r[0]: 2 for r in results}
-
-    mu = mean(values)
-    low_cut = mu + (-0.4307 * sigma)
-    high_cut = mu + (0.4307 * sigma)
+    if cfg.tercile_cohort == TercileCohort.DEPARTMENT:
+        groups = departments
+    elif cfg.tercile_cohort == TercileCohort.ROLE:
+        groups = roles
+    else:
+        groups = None
 
-    out = {}
-    for emp, ql, _ in results:
-        val = float(ql)
-        if val <= low_cut:
-            out[emp] = 1
-        elif val >= high_cut:
-            out[emp] = 3
-        else:
-            out[emp] = 2
-    return out
+    if cfg.qualitative_axis_method == QualitativeAxisMethod.GAUSSIAN:
+        qual_ts = terciles.gaussian_terciles(qualitative, groups)
+    elif None in above or None in below:
+        return None
+    else:
+        qual_ts = terciles.profile_terciles(above, below, cfg.top_min_above, cfg.middle_max_below)
+    return qual_ts, terciles.rank_terciles(employee_ids, quantitative, groups)
 
 
-def recompute_cycle_scores(cycle, employees_qs):
+def recompute_cycle_scores(cycle, employees_qs, progress=None):
     """
     Calcula scores para employees_qs y persiste el 9-box.
     - Eje cualitativo: configurable (tercios por reglas o campana de Gauss).
     - Eje cuantitativo: terciles por ranking.
+    Los terciles se calculan dentro de la cohorte configurada (empresa, departamento o rol).
+    Los ciclos congelados (con CycleSnapshot) no se recalculan: devuelve False sin escribir.
+    Un ciclo cerrado pero aún sin snapshot sí se recalcula.
+    progress(n), si se indica, se llama cada SCORE_PROGRESS_EVERY empleados calculados (jobs en cola).
     """
+    if cycle.is_frozen:
+        return False
     cfg = TalentMapSettings.get_solo()
-    results = []
+    employees, qls, qts, aboves, belows = [], [], [], [], []
     for emp in employees_qs:
-        ql = compute_qualitative_score(emp, cycle)
-        qt = compute_quantitative_score(emp, cycle)
-        results.append((emp, ql, qt))
+        ql, above, below = _qualitative_breakdown(emp, cycle)
+        employees.append(emp)
+        qls.append(ql)
+        qts.append(compute_quantitative_score(emp, cycle))
+        aboves.append(above)
+        belows.append(below)
+        if progress is not None and len(employees) % SCORE_PROGRESS_EVERY == 0:
+            progress(len(employees))
+
+    # Etapa de cohorte sobre listas paralelas.
+    qual_ts, quant_ts = cohort_terciles(
+        cfg,
+        [emp.id for emp in employees],
+        [emp.department_id for emp in employees],
+        [emp.role_id for emp in employees],
+        qls,
+        qts,
+        aboves,
+        belows,
+    )
+    box_indexes = terciles.box_indexes(qual_ts, quant_ts)
+
+    rows = []
+    for emp, ql, qt, above, below, qual_t, quant_t, box in zip(
+        employees, qls, qts, aboves, belows, qual_ts, quant_ts, box_indexes
+    ):
+        code, label = BOX_TABLE[box]
+        rows.append(
+            EmployeeCycleScore(
+                employee=emp,
+                cycle=cycle,
+                qualitative_score=ql,
+                quantitative_score=qt,
+                qual_tercile=qual_t,
+                quant_tercile=quant_t,
+                box_code=code,
+                box_label=label,
+                competencies_above=above,
+                competencies_below=below,
+            )
+        )
+    write_cycle_scores(rows)
+    return True
 
-    qt_sorted = sorted(results, key=lambda r: (float(r[2]), r[0].id))
 
-    if cfg.qualitative_axis_method == QualitativeAxisMethod.GAUSSIAN:
-        qual_tercile_map = _qual_tercile_by_gaussian(results)
-    else:
-        qual_tercile_map = {emp: _qual_tercile_by_profile_rules(emp, cycle, cfg) for emp, _, _ in results}
-    quant_tercile_map = assign_tercile_by_rank([(r[0], r[2]) for r in qt_sorted])
+def write_cycle_scores(rows):
+    """
+    Upsert de EmployeeCycleScore en transacciones cortas de SCORE_WRITE_CHUNK filas.
+    Todo el cálculo (lecturas) ocurre antes, fuera de transacción; así el lock de escritura
+    (BEGIN IMMEDIATE en el perfil SQLite) se mantiene solo lo imprescindible.
+    """
+    for start in range(0, len(rows), SCORE_WRITE_CHUNK):
+        with transaction.atomic():
+            EmployeeCycleScore.objects.bulk_create(
+                rows[start:start + SCORE_WRITE_CHUNK],
+                update_conflicts=True,
+                unique_fields=["employee", "cycle"],
+                update_fields=[
+                    "qualitative_score",
+                    "quantitative_score",
+                    "qual_tercile",
+                    "quant_tercile",
+                    "box_code",
+                    "box_label",
+                    "competencies_above",
+                    "competencies_below",
+                    "updated_at",
+                ],
+            )
+    _invalidate_scores({row.cycle_id for row in rows})
+
+
+# Columnas de los scores guardados que necesita cohort_terciles, en su orden.
+COHORT_FIELDS = (
+    "employee_id",
+    "employee__department_id",
+    "employee__role_id",
+    "qualitative_score",
+    "quantitative_score",
+    "competencies_above",
+    "competencies_below",
+)
 
-    for emp, ql, qt in results:
-        qual_t = qual_tercile_map.get(emp, 1)
-        quant_t = quant_tercile_map.get(emp, 1)
-        code, label = BOXES[(qual_t, quant_t)]
 
-        EmployeeCycleScore.objects.update_or_create(
-            employee=emp,
-            cycle=cycle,
-            defaults={
-                "qualitative_score": ql,
-                "quantitative_score": qt,
-                "qual_tercile": qual_t,
-                "quant_tercile": quant_t,
-                "box_code": code,
-                "box_label": label,
-            },
+def reassign_terciles(cycle, employees_qs):
+    """
+    Tras un cambio de TalentMapSettings: reasigna los terciles (y el box) de los scores guardados
+    de employees_qs, sin volver a valoraciones ni metas: los scores no dependen de la
+    configuración. Todas las cohortes salen de la misma pasada y solo se escriben las filas que
+    cambian de box.
+
+    Devuelve cuántos empleados cambian de box, o None si hay que recalcular entero
+    (algún empleado sin score o sin competencias por encima/debajo guardadas). Un ciclo
+    congelado devuelve 0 sin escribir.
+    """
+    if cycle.is_frozen:
+        return 0
+    cfg = TalentMapSettings.get_solo()
+    scores = list(
+        EmployeeCycleScore.objects.filter(cycle=cycle, employee__in=employees_qs).values_list(
+            "id", "qual_tercile", "quant_tercile", *COHORT_FIELDS
         )
+    )
+    if len(scores) != employees_qs.count():
+        return None
+    if not scores:
+        return 0
+
+    score_ids, qual_before, quant_before, *columns = zip(*scores)
+    assigned = cohort_terciles(cfg, *columns)
+    if assigned is None:
+        return None
+
+    # Un UPDATE por box de destino (como mucho 9) con los ids que se mueven a él.
+    moved = {}
+    for score_id, old_qual, old_quant, new_qual, new_quant in zip(score_ids, qual_before, quant_before, *assigned):
+        if (new_qual, new_quant) != (old_qual, old_quant):
+            moved.setdefault((new_qual, new_quant), []).append(score_id)
+
+    now = timezone.now()
+    for (qual_t, quant_t), ids in moved.items():
+        code, label = BOXES[(qual_t, quant_t)]
+        for start in range(0, len(ids), SCORE_WRITE_CHUNK):
+            with transaction.atomic():
+                EmployeeCycleScore.objects.filter(id__in=ids[start:start + SCORE_WRITE_CHUNK]).update(
+                    qual_tercile=qual_t, quant_tercile=quant_t, box_code=code, box_label=label, updated_at=now
+                )
+    if moved:
+        _invalidate_scores({cycle.pk})
+    return sum(len(ids) for ids in moved.values())
+
+
+def _invalidate_scores(cycle_ids):
+    app_cache.invalidate(app_cache.NINE_BOX_NAMESPACE)
+    for cycle_id in cycle_ids:
+        app_cache.invalidate(_scores_namespace(cycle_id))
+
+
+def _scores_namespace(cycle_id):
+    return f"{app_cache.SCORES_NAMESPACE}:{cycle_id}"
+
+
+def score_version(cycle_id) -> int:
+    """Versión de los EmployeeCycleScore de un ciclo: sube solo cuando se escriben scores de ese ciclo."""
+    return app_cache.namespace_version(_scores_namespace(cycle_id))
+
+
+def invalidate_cycle_score(sender, instance, **kwargs):
+    # Ediciones sueltas (admin, tests); el recálculo usa bulk_create e invalida en write_cycle_scores.
+    _invalidate_scores({instance.cycle_id})
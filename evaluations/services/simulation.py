@@ -0,0 +1,161 @@
+"""
+Simulación del 9-box con otras configuraciones (eje cualitativo y cohorte de los terciles),
+sin guardar nada.
+
+Carga una vez en memoria los scores del ciclo (con las competencias por encima/debajo del perfil
+del último recálculo) y evalúa varias configuraciones candidatas sobre ellos. Para cada una
+devuelve los empleados por box y quién cambiaría de box respecto al 9-box actual.
+
+Los terciles se calculan sobre todos los empleados cargados, como al guardar la configuración
+(el ranking y la campana dependen de todos los scores de cada cohorte); los filtros de
+departamento y rol solo acotan lo que se informa.
+"""
+from evaluations.models import EmployeeCycleScore, QualitativeAxisMethod, TalentMapSettings, TercileCohort
+from evaluations.services.scoring import BOXES, COHORT_FIELDS, cohort_terciles
+from evaluations.services.view_models import display_name
+
+# Configuraciones por simulación: cada una recorre toda la cohorte.
+MAX_CANDIDATES = 10
+
+
+class SimulationError(ValueError):
+    """Configuración candidata inválida o cohorte sin los datos necesarios."""
+
+
+def candidate_config(data, base):
+    """
+    TalentMapSettings sin guardar a partir de un dict (claves como en el formulario del 9-box);
+    lo que falte se toma de `base`. Mismas reglas que el formulario.
+    """
+    if not isinstance(data, dict):
+        raise SimulationError("Cada configuración debe ser un objeto.")
+    method = data.get("qualitative_axis_method", base.qualitative_axis_method)
+    if method not in QualitativeAxisMethod.values:
+        raise SimulationError(f"Método de eje cualitativo desconocido: {method!r}.")
+    cohort = data.get("tercile_cohort", base.tercile_cohort)
+    if cohort not in TercileCohort.values:
+        raise SimulationError(f"Cohorte de terciles desconocida: {cohort!r}.")
+    try:
+        top_min_above = max(1, int(data.get("top_min_above", base.top_min_above)))
+        middle_max_below = max(0, int(data.get("middle_max_below", base.middle_max_below)))
+    except (TypeError, ValueError):
+        raise SimulationError("top_min_above y middle_max_below deben ser enteros.")
+    return TalentMapSettings(
+        qualitative_axis_method=method,
+        top_min_above=top_min_above,
+        middle_max_below=middle_max_below,
+        tercile_cohort=cohort,
+    )
+
+
+def config_as_dict(cfg):
+    return {
+        "qualitative_axis_method": cfg.qualitative_axis_method,
+        "top_min_above": cfg.top_min_above,
+        "middle_max_below": cfg.middle_max_below,
+        "tercile_cohort": cfg.tercile_cohort,
+    }
+
+
+class ScoreCohort:
+    """Scores guardados de un ciclo y una cohorte, en memoria."""
+
+    __slots__ = ("employee_ids", "names", "scope", "columns", "box_codes")
+
+    def __init__(self, rows):
+        self.employee_ids = []
+        self.names = {}
+        self.scope = {}
+        self.box_codes = {}
+        # Columnas de COHORT_FIELDS, alineadas con employee_ids, para cohort_terciles.
+        self.columns = [[] for _ in COHORT_FIELDS]
+        for username, first_name, last_name, qual_t, quant_t, *fields in rows:
+            employee_id, dept_id, role_id = fields[:3]
+            self.employee_ids.append(employee_id)
+            self.names[employee_id] = display_name(username, first_name, last_name)
+            self.scope[employee_id] = (dept_id, role_id)
+            self.box_codes[employee_id] = BOXES[(qual_t, quant_t)][0]
+            for column, value in zip(self.columns, fields):
+                column.append(value)
+
+    def reported_ids(self, dept_id=None, role_id=None):
+        """Empleados que entran en el informe con los filtros del 9-box."""
+        try:
+            dept_id = int(dept_id) if dept_id else None
+            role_id = int(role_id) if role_id else None
+        except (TypeError, ValueError):
+            raise SimulationError("department y role deben ser ids.")
+        return [
+            employee_id
+            for employee_id in self.employee_ids
+            if (dept_id is None or self.scope[employee_id][0] == dept_id)
+            and (role_id is None or self.scope[employee_id][1] == role_id)
+        ]
+
+    def current_counts(self, employee_ids):
+        counts = dict.fromkeys((code for code, _ in BOXES.values()), 0)
+        for employee_id in employee_ids:
+            counts[self.box_codes[employee_id]] += 1
+        return counts
+
+    def evaluate(self, cfg, employee_ids):
+        """
+        Terciles de todos los empleados cargados con cfg; informa de employee_ids:
+        {"config", "counts": {box_code: n}, "moved", "moves": [{"employee_id", "name", "from", "to"}]}.
+        """
+        assigned = cohort_terciles(cfg, *self.columns)
+        if assigned is None:
+            raise SimulationError(
+                "Faltan las competencias por encima/debajo de algunos empleados: recalcula el ciclo antes de simular tercios."
+            )
+        boxes = dict(zip(self.employee_ids, zip(*assigned)))
+        counts = dict.fromkeys((code for code, _ in BOXES.values()), 0)
+        moves = []
+        for employee_id in employee_ids:
+            code = BOXES[boxes[employee_id]][0]
+            counts[code] += 1
+            if code != self.box_codes[employee_id]:
+                moves.append(
+                    {
+                        "employee_id": employee_id,
+                        "name": self.names[employee_id],
+                        "from": self.box_codes[employee_id],
+                        "to": code,
+                    }
+                )
+        return {"config": config_as_dict(cfg), "counts": counts, "moved": len(moves), "moves": moves}
+
+
+def load_cohort(cycle, employees_qs):
+    """Una consulta: scores guardados de employees_qs en el ciclo (los empleados sin score no entran)."""
+    return ScoreCohort(
+        EmployeeCycleScore.objects.filter(cycle=cycle, employee__in=employees_qs)
+        .order_by("employee_id")
+        .values_list(
+            "employee__user__username",
+            "employee__user__first_name",
+            "employee__user__last_name",
+            "qual_tercile",
+            "quant_tercile",
+            *COHORT_FIELDS,
+        )
+    )
+
+
+def simulate_nine_box(cycle, employees_qs, candidates, dept_id=None, role_id=None):
+    """
+    Evalúa las configuraciones `candidates` (TalentMapSettings sin guardar) sobre los scores
+    guardados de employees_qs (la cohorte del recálculo: empleados activos). No escribe nada.
+    Devuelve {"employees", "current": {"counts"}, "results": [...]} para los filtros dados.
+    """
+    if not candidates:
+        raise SimulationError("Indica al menos una configuración.")
+    if len(candidates) > MAX_CANDIDATES:
+        raise SimulationError(f"Como máximo {MAX_CANDIDATES} configuraciones por simulación.")
+    cohort = load_cohort(cycle, employees_qs)
+    employee_ids = cohort.reported_ids(dept_id, role_id)
+    return {
+        "employees": len(employee_ids),
+        "current": {"counts": cohort.current_counts(employee_ids)},
+        "results": [cohort.evaluate(cfg, employee_ids) for cfg in candidates],
+    }
@@ -0,0 +1,289 @@
+"""
+Snapshots de ciclos cerrados.
+
+Un ciclo cerrado ya no cambia: solo admite consulta y queda fuera de los recálculos.
+`finalize_cycle` lo congela:
+
+- empleados activos, scores y boxes en un único blob comprimido (CycleSnapshot);
+- niveles alcanzados por competencia en filas indexadas (SnapshotCompetencyLevel).
+
+Las páginas del ciclo (9-box, equipo, inicio y competencias) se sirven desde el snapshot, sin
+recorrer las tablas vivas.
+
+    python manage.py finalize_cycles
+"""
+import json
+import zlib
+from decimal import Decimal
+
+from django.db import transaction
+
+from competencies.catalog import get_catalog
+from competencies.models import RoleCompetencyRequirement
+from evaluations.models import (
+    CycleSnapshot,
+    EmployeeCycleScore,
+    QualitativeIndicatorAssessment,
+    SnapshotCompetencyLevel,
+)
+from evaluations.services.scoring import PASS_RATING, SCORE_WRITE_CHUNK
+from evaluations.services.view_models import NineBoxCard, TeamRow, display_name, id_url
+from people.models import Employee
+from talentmap import cache as app_cache
+
+SNAPSHOT_FORMAT = 1
+
+# Columnas de cada fila del blob: una fila por empleado activo al congelar el ciclo.
+# Sin score en el ciclo, las columnas de score van a null.
+ROW_FIELDS = (
+    "employee_id",
+    "name",
+    "last_name",
+    "email",
+    "department_id",
+    "department",
+    "role_id",
+    "role",
+    "manager",
+    "qualitative_score",
+    "quantitative_score",
+    "qual_tercile",
+    "quant_tercile",
+    "box_code",
+    "box_label",
+)
+_SCORE_FIELDS = ("qualitative_score", "quantitative_score", "qual_tercile", "quant_tercile", "box_code", "box_label")
+
+
+def _employee_rows(cycle):
+    scores = {
+        employee_id: (str(ql), str(qt), qual_t, quant_t, code, label)
+        for employee_id, ql, qt, qual_t, quant_t, code, label in EmployeeCycleScore.objects.filter(cycle=cycle)
+        .values_list("employee_id", *_SCORE_FIELDS)
+    }
+    no_score = (None,) * len(_SCORE_FIELDS)
+    rows = []
+    for (
+        employee_id, username, first_name, last_name, email, dept_id, dept, role_id, role,
+        mgr_username, mgr_first, mgr_last,
+    ) in Employee.objects.filter(active=True).order_by("id").values_list(
+        "id",
+        "user__username",
+        "user__first_name",
+        "user__last_name",
+        "user__email",
+        "department_id",
+        "department__name",
+        "role_id",
+        "role__name",
+        "manager__user__username",
+        "manager__user__first_name",
+        "manager__user__last_name",
+    ):
+        rows.append(
+            (
+                employee_id,
+                display_name(username, first_name, last_name),
+                last_name or "",
+                email or "",
+                dept_id,
+                dept,
+                role_id,
+                role,
+                display_name(mgr_username, mgr_first, mgr_last) if mgr_username else "",
+                *scores.get(employee_id, no_score),
+            )
+        )
+    return rows
+
+
+def _competency_levels(cycle, rows):
+    """
+    Nivel alcanzado por competencia de cada fila, con el criterio del score: niveles superados
+    en orden (todos sus comportamientos en >= PASS_RATING), sin tope en el requerido.
+    """
+    catalog = get_catalog()
+    level_indicators = {
+        competency_id: [(lvl.level, [ind.id for ind in lvl.indicators.all()]) for lvl in levels]
+        for competency_id, levels in catalog.items()
+    }
+    requirements = {}
+    for role_id, competency_id, required in RoleCompetencyRequirement.objects.values_list(
+        "role_id", "competency_id", "required_level"
+    ):
+        requirements.setdefault(role_id, []).append((competency_id, max(1, int(required))))
+
+    passed = {}
+    for employee_id, indicator_id in QualitativeIndicatorAssessment.objects.filter(
+        cycle=cycle, rating__gte=PASS_RATING
+    ).values_list("employee_id", "indicator_id"):
+        passed.setdefault(employee_id, set()).add(indicator_id)
+
+    levels = []
+    for row in rows:
+        employee_id, role_id = row[0], row[6]
+        employee_passed = passed.get(employee_id, ())
+        for competency_id, required in requirements.get(role_id, ()):
+            achieved = 0
+            for level, indicator_ids in level_indicators.get(competency_id, ()):
+                if not indicator_ids or not all(i in employee_passed for i in indicator_ids):
+                    break
+                achieved = level
+            levels.append(
+                SnapshotCompetencyLevel(
+                    cycle=cycle,
+                    employee_id=employee_id,
+                    competency_id=competency_id,
+                    required_level=required,
+                    achieved_level=achieved,
+                )
+            )
+    return levels
+
+
+def _encode(rows):
+    return zlib.compress(json.dumps({"fields": ROW_FIELDS, "rows": rows}, separators=(",", ":")).encode(), 6)
+
+
+def _decode(blob):
+    payload = json.loads(zlib.decompress(bytes(blob)))
+    return [tuple(row) for row in payload["rows"]]
+
+
+def finalize_cycle(cycle, force=False):
+    """
+    Congela un ciclo cerrado. Devuelve el CycleSnapshot, o None si ya estaba congelado
+    (con force=True se vuelve a generar). Un ciclo abierto lanza ValueError.
+    """
+    if not cycle.is_closed:
+        raise ValueError(f"El ciclo {cycle} sigue abierto: solo se congelan ciclos cerrados.")
+    if not force and CycleSnapshot.objects.filter(cycle=cycle).exists():
+        return None
+
+    rows = _employee_rows(cycle)
+    levels = _competency_levels(cycle, rows)
+
+    # Sin CycleSnapshot las páginas usan la vía en vivo (mismos datos: el ciclo está cerrado),
+    # así que las filas se escriben en transacciones cortas y el snapshot se crea al final.
+    with transaction.atomic():
+        CycleSnapshot.objects.filter(cycle=cycle).delete()
+        SnapshotCompetencyLevel.objects.filter(cycle=cycle).delete()
+    for start in range(0, len(levels), SCORE_WRITE_CHUNK):
+        with transaction.atomic():
+            SnapshotCompetencyLevel.objects.bulk_create(levels[start:start + SCORE_WRITE_CHUNK])
+    snapshot = CycleSnapshot.objects.create(
+        cycle=cycle, format_version=SNAPSHOT_FORMAT, data=_encode(rows), employee_count=len(rows)
+    )
+    app_cache.invalidate(app_cache.SNAPSHOTS_NAMESPACE)
+    # Los fragmentos del 9-box pasan a salir del snapshot.
+    app_cache.invalidate(app_cache.NINE_BOX_NAMESPACE)
+    return snapshot
+
+
+class FrozenCycle:
+    """Contenido de un snapshot, decodificado; ofrece lo mismo que las consultas vivas."""
+
+    __slots__ = ("cycle_id", "rows", "rows_by_last_name")
+
+    def __init__(self, cycle_id, rows):
+        self.cycle_id = cycle_id
+        # Los scores van como texto en el blob; se convierten una vez al decodificar.
+        rows = [
+            row[:9] + (Decimal(row[9]), Decimal(row[10])) + row[11:] if row[9] is not None else row
+            for row in rows
+        ]
+        # Orden del 9-box: score cualitativo y cuantitativo descendente (sin score al final).
+        self.rows = sorted(rows, key=lambda r: (r[9] is None, -(r[9] or 0), -(r[10] or 0), r[0]))
+        self.rows_by_last_name = sorted(rows, key=lambda r: (r[2], r[0]))
+
+    def _scored(self, dept_id=None, role_id=None):
+        dept_id = int(dept_id) if dept_id else None
+        role_id = int(role_id) if role_id else None
+        for row in self.rows:
+            if row[9] is None:
+                continue
+            if dept_id is not None and row[4] != dept_id:
+                continue
+            if role_id is not None and row[6] != role_id:
+                continue
+            yield row
+
+    def nine_box_cards(self, dept_id=None, role_id=None):
+        """Como view_models.nine_box_cards: {(qual_tercile, quant_tercile): [NineBoxCard]}."""
+        grid = {}
+        for (
+            employee_id, name, _, email, _, dept, _, role, manager,
+            ql, qt, qual_t, quant_t, _, box_label,
+        ) in self._scored(dept_id, role_id):
+            grid.setdefault((qual_t, quant_t), []).append(
+                NineBoxCard(
+                    employee_id=employee_id,
+                    name=name,
+                    email=email,
+                    department=dept,
+                    role=role,
+                    manager=manager,
+                    qualitative_score=ql,
+                    quantitative_score=qt,
+                    qual_tercile=qual_t,
+                    quant_tercile=quant_t,
+                    box_label=box_label,
+                )
+            )
+        return grid
+
+    def box_counts(self, dept_id=None, role_id=None):
+        """Como scoring.nine_box_counts: {box_code: empleados}."""
+        counts = {}
+        for row in self._scored(dept_id, role_id):
+            counts[row[13]] = counts.get(row[13], 0) + 1
+        return counts
+
+    def team_rows(self, employee_ids=None):
+        """Como view_models.team_rows, por apellido; employee_ids limita a esos empleados (managers)."""
+        goals_url = id_url("edit_quantitative")
+        competencies_url = id_url("competency_picker")
+        return [
+            TeamRow(
+                employee_id=employee_id,
+                name=name,
+                role=role,
+                department=dept,
+                has_score=ql is not None,
+                qualitative_score=ql,
+                quantitative_score=qt,
+                box_label=box_label or "",
+                goals_url=goals_url.format(employee_id),
+                competencies_url=competencies_url.format(employee_id),
+            )
+            for (
+                employee_id, name, _, _, _, dept, _, role, _,
+                ql, qt, _, _, _, box_label,
+            ) in self.rows_by_last_name
+            if employee_ids is None or employee_id in employee_ids
+        ]
+
+
+def load_snapshot(cycle):
+    """
+    FrozenCycle del ciclo, o None si no está congelado. Cacheado hasta que se congele otro ciclo;
+    el None no se cachea, así que un snapshot creado después se ve en la siguiente petición.
+    """
+
+    def build():
+        snapshot = CycleSnapshot.objects.filter(cycle_id=cycle.pk).values_list("format_version", "data").first()
+        if snapshot is None or snapshot[0] != SNAPSHOT_FORMAT:
+            return None
+        return FrozenCycle(cycle.pk, _decode(snapshot[1]))
+
+    return app_cache.get_or_build(app_cache.SNAPSHOTS_NAMESPACE, [cycle.pk], build, cache_none=False)
+
+
+def snapshot_competency_rows(cycle, employee):
+    """Filas del selector de competencias desde el snapshot (el nivel actual se muestra hasta el requerido)."""
+    return [
+        {"req": level, "achieved_level": min(level.achieved_level, level.required_level)}
+        for level in SnapshotCompetencyLevel.objects.filter(cycle=cycle, employee=employee)
+        .select_related("competency")
+        .order_by("competency__name")
+    ]
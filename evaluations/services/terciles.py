@@ -0,0 +1,206 @@
+"""
+Etapa de terciles de la cohorte sobre arrays compactos.
+
+Recibe listas paralelas (ids, scores, conteos del perfil), no instancias de modelo, y calcula en
+pasadas vectorizadas los terciles por ranking, los cortes de la campana y el índice del box. Con NumPy
+instalado (opcional) usa arrays de NumPy; sin él, `array` y la biblioteca estándar.
+
+Con `groups` (departamento o rol de cada posición) los terciles se calculan dentro de cada
+cohorte, todas en la misma pasada.
+
+Los dos backends dan el mismo resultado:
+- ranking: orden ascendente por valor y, a igualdad, por clave;
+- campana: media y desviación típica con sumas exactas (math.fsum), así que los cortes no
+  dependen del orden de suma de cada backend.
+
+    python -m loadtest.bench_terciles --employees 100000
+"""
+from array import array
+from importlib.util import find_spec
+from itertools import groupby
+from math import fsum, sqrt
+
+HAS_NUMPY = find_spec("numpy") is not None
+BACKENDS = ("python", "numpy")
+DEFAULT_BACKEND = "numpy" if HAS_NUMPY else "python"
+
+# Cortes de terciles de la normal estándar.
+GAUSSIAN_Z = 0.4307
+
+
+def _backend(backend):
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de terciles desconocido: {backend!r}.")
+    if backend == "numpy" and not HAS_NUMPY:
+        raise ValueError("El backend 'numpy' necesita NumPy instalado.")
+    return backend
+
+
+def _np():
+    import numpy
+
+    return numpy
+
+
+def _segments(order, groups):
+    """Posiciones de `order` partidas por cohorte (order ya agrupado); sin groups, una sola."""
+    if groups is None:
+        return [order]
+    return [list(segment) for _, segment in groupby(order, key=groups.__getitem__)]
+
+
+def _np_segments(np, sorted_groups):
+    """(inicio, tamaño) de cada cohorte en un array de grupos ya ordenado."""
+    n = len(sorted_groups)
+    starts = np.flatnonzero(np.concatenate(([True], sorted_groups[1:] != sorted_groups[:-1])))
+    return starts, np.diff(np.append(starts, n))
+
+
+def _np_groups(np, groups, n):
+    return np.zeros(n, dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+
+
+def rank_terciles(keys, values, groups=None, backend=None):
+    """
+    Terciles 1..3 por ranking ascendente de values (a igualdad, por keys), ~1/3 en cada uno,
+    dentro de cada cohorte de groups (o de todas las posiciones sin groups).
+    keys, groups: enteros (ids); values: números (Decimal, float). Devuelve una lista alineada con la entrada.
+    """
+    n = len(values)
+    if n == 0:
+        return []
+
+    if _backend(backend) == "numpy":
+        np = _np()
+        cohort = _np_groups(np, groups, n)
+        order = np.lexsort(
+            (np.asarray(keys, dtype=np.int64), np.fromiter(map(float, values), np.float64, n), cohort)
+        )
+        starts, sizes = _np_segments(np, cohort[order])
+        rank = np.arange(n) - np.repeat(starts, sizes)
+        third = np.repeat(np.maximum(1, sizes // 3), sizes)
+        out = np.empty(n, dtype=np.int8)
+        out[order] = 1 + (rank >= third) + (rank >= 2 * third)
+        return out.tolist()
+
+    floats = array("d", map(float, values))
+    # Ordenaciones estables (clave, valor y cohorte) = orden por (cohorte, valor, clave), sin tuplas.
+    order = sorted(range(n), key=keys.__getitem__)
+    order.sort(key=floats.__getitem__)
+    if groups is not None:
+        order.sort(key=groups.__getitem__)
+    out = array("b", [3]) * n
+    for segment in _segments(order, groups):
+        third = max(1, len(segment) // 3)
+        for i in segment[:third]:
+            out[i] = 1
+        for i in segment[third:2 * third]:
+            out[i] = 2
+    return out.tolist()
+
+
+def _cuts(floats):
+    """(corte bajo, corte alto) de una cohorte, o None con menos de 2 valores o sin dispersión."""
+    n = len(floats)
+    if n < 2:
+        return None
+    mu = fsum(floats) / n
+    sigma = sqrt(fsum([(v - mu) * (v - mu) for v in floats]) / n)
+    if sigma == 0:
+        return None
+    return mu - GAUSSIAN_Z * sigma, mu + GAUSSIAN_Z * sigma
+
+
+def gaussian_terciles(values, groups=None, backend=None):
+    """
+    Terciles por campana dentro de cada cohorte: <= media - GAUSSIAN_Z·σ → 1,
+    >= media + GAUSSIAN_Z·σ → 3, resto → 2 (σ poblacional). Una cohorte con menos de
+    2 valores o sin dispersión queda entera en 2.
+    """
+    n = len(values)
+    if n == 0:
+        return []
+
+    if _backend(backend) == "numpy":
+        np = _np()
+        floats = np.fromiter(map(float, values), np.float64, n)
+        cohort = _np_groups(np, groups, n)
+        order = np.argsort(cohort, kind="stable")
+        sorted_floats = floats[order]
+        starts, sizes = _np_segments(np, cohort[order])
+        # Sin dispersión: cortes imposibles, todo queda en 2.
+        low, high = np.full(len(starts), -np.inf), np.full(len(starts), np.inf)
+        for g, (start, size) in enumerate(zip(starts.tolist(), sizes.tolist())):
+            cuts = _cuts(sorted_floats[start:start + size].tolist())
+            if cuts is not None:
+                low[g], high[g] = cuts
+        low, high = np.repeat(low, sizes), np.repeat(high, sizes)
+        out = np.empty(n, dtype=np.int8)
+        out[order] = np.where(sorted_floats <= low, 1, np.where(sorted_floats >= high, 3, 2))
+        return out.tolist()
+
+    floats = array("d", map(float, values))
+    if groups is None:
+        cuts = _cuts(floats)
+        if cuts is None:
+            return [2] * n
+        low_cut, high_cut = cuts
+        return [1 if v <= low_cut else 3 if v >= high_cut else 2 for v in floats]
+
+    out = array("b", [2]) * n
+    for segment in _segments(sorted(range(n), key=groups.__getitem__), groups):
+        cuts = _cuts([floats[i] for i in segment])
+        if cuts is None:
+            continue
+        low_cut, high_cut = cuts
+        for i in segment:
+            v = floats[i]
+            out[i] = 1 if v <= low_cut else 3 if v >= high_cut else 2
+    return out.tolist()
+
+
+def profile_terciles(above, below, top_min_above, middle_max_below, backend=None):
+    """
+    Terciles por reglas del perfil ideal a partir de las competencias por encima/debajo (listas alineadas):
+    - superior: 0 por debajo y >= top_min_above por encima;
+    - bajo: más de middle_max_below por debajo o balance negativo;
+    - intermedio: balance exacto, o positivo con alguna por debajo; el resto, bajo.
+    """
+    top_min_above, middle_max_below = int(top_min_above), int(middle_max_below)
+    if _backend(backend) == "numpy":
+        np = _np()
+        above = np.asarray(above, dtype=np.int64)
+        below = np.asarray(below, dtype=np.int64)
+        delta = above - below
+        return np.select(
+            [
+                (below == 0) & (above >= top_min_above),
+                (below > middle_max_below) | (delta < 0),
+                (delta == 0) | ((delta > 0) & (below > 0)),
+            ],
+            [3, 1, 2],
+            default=1,
+        ).tolist()
+
+    out = []
+    for a, b in zip(above, below):
+        if b == 0 and a >= top_min_above:
+            out.append(3)
+        elif b > middle_max_below or a < b:
+            out.append(1)
+        elif a == b or b > 0:
+            out.append(2)
+        else:
+            out.append(1)
+    return out
+
+
+def box_indexes(qual_terciles, quant_terciles, backend=None):
+    """Índice del box, (qual_tercile - 1) * 3 + (quant_tercile - 1), alineado con la entrada (ver scoring.BOX_TABLE)."""
+    if _backend(backend) == "numpy":
+        np = _np()
+        qual = np.asarray(qual_terciles, dtype=np.int64)
+        quant = np.asarray(quant_terciles, dtype=np.int64)
+        return ((qual - 1) * 3 + quant - 1).tolist()
+    return [(q - 1) * 3 + t - 1 for q, t in zip(qual_terciles, quant_terciles)]
@@ -0,0 +1,178 @@
+"""
+Filas planas para las plantillas de listados grandes.
+
+Se construyen con `values_list` (consultas con joins, sin instanciar modelos) y exponen
+atributos ya resueltos (clases con `__slots__`): la plantilla no sigue FKs, no llama a
+`__str__` de los modelos, no busca en diccionarios con filtros ni invierte URLs por fila.
+"""
+from django.urls import reverse
+
+from evaluations.models import BehaviorRating, EmployeeCycleScore
+
+RATING_LABELS = dict(BehaviorRating.choices)
+
+
+def display_name(username, first_name, last_name):
+    # Igual que Employee.__str__ sin instanciar modelos.
+    return f"{first_name or ''} {last_name or ''}".strip() or (username or "")
+
+
+def id_url(name):
+    """
+    URL con id 0 (p.ej. `/evaluations/employee/0/quantitative/`) que se completa con `.format(id)`:
+    evita un `reverse()` por fila.
+    """
+    return reverse(name, args=[0]).replace("/0/", "/{}/", 1)
+
+
+class NineBoxCard:
+    """Tarjeta de empleado del 9-box."""
+
+    __slots__ = (
+        "employee_id",
+        "name",
+        "email",
+        "department",
+        "role",
+        "manager",
+        "qualitative_score",
+        "quantitative_score",
+        "qual_tercile",
+        "quant_tercile",
+        "box_label",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+
+_NINE_BOX_FIELDS = (
+    "employee_id",
+    "employee__user__username",
+    "employee__user__first_name",
+    "employee__user__last_name",
+    "employee__user__email",
+    "employee__department__name",
+    "employee__role__name",
+    "employee__manager__user__username",
+    "employee__manager__user__first_name",
+    "employee__manager__user__last_name",
+    "qualitative_score",
+    "quantitative_score",
+    "qual_tercile",
+    "quant_tercile",
+    "box_label",
+)
+
+
+def nine_box_cards(cycle, employees_qs):
+    """
+    Tarjetas del 9-box de un ciclo agrupadas por celda: {(qual_tercile, quant_tercile): [NineBoxCard]}.
+    Una sola consulta; cada celda mantiene el orden por score cualitativo y cuantitativo descendente.
+    """
+    qs = (
+        EmployeeCycleScore.objects.filter(cycle=cycle, employee__in=employees_qs)
+        .order_by("-qualitative_score", "-quantitative_score")
+        .values_list(*_NINE_BOX_FIELDS)
+    )
+    grid = {}
+    for (
+        employee_id, username, first_name, last_name, email, dept, role,
+        mgr_username, mgr_first, mgr_last,
+        ql, qt, qual_t, quant_t, box_label,
+    ) in qs:
+        card = NineBoxCard(
+            employee_id=employee_id,
+            name=display_name(username, first_name, last_name),
+            email=email or "",
+            department=dept,
+            role=role,
+            manager=display_name(mgr_username, mgr_first, mgr_last) if mgr_username else "",
+            qualitative_score=ql,
+            quantitative_score=qt,
+            qual_tercile=qual_t,
+            quant_tercile=quant_t,
+            box_label=box_label,
+        )
+        grid.setdefault((int(qual_t), int(quant_t)), []).append(card)
+    return grid
+
+
+class TeamRow:
+    """Fila de `team_overview`: empleado, su score del ciclo (si existe) y enlaces de edición."""
+
+    __slots__ = (
+        "employee_id",
+        "name",
+        "role",
+        "department",
+        "has_score",
+        "qualitative_score",
+        "quantitative_score",
+        "box_label",
+        "goals_url",
+        "competencies_url",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+
+def team_rows(cycle, employees_qs):
+    """
+    Filas de `team_overview` en el orden de employees_qs.
+    Dos consultas (empleados y scores del ciclo) sin instanciar modelos.
+    """
+    scores = {
+        employee_id: (ql, qt, box_label)
+        for employee_id, ql, qt, box_label in EmployeeCycleScore.objects.filter(
+            cycle=cycle, employee__in=employees_qs
+        ).values_list("employee_id", "qualitative_score", "quantitative_score", "box_label")
+    }
+    goals_url = id_url("edit_quantitative")
+    competencies_url = id_url("competency_picker")
+
+    rows = []
+    for employee_id, username, first_name, last_name, role, dept in employees_qs.values_list(
+        "id", "user__username", "user__first_name", "user__last_name", "role__name", "department__name"
+    ):
+        ql, qt, box_label = scores.get(employee_id, (None, None, ""))
+        rows.append(
+            TeamRow(
+                employee_id=employee_id,
+                name=display_name(username, first_name, last_name),
+                role=role,
+                department=dept,
+                has_score=employee_id in scores,
+                qualitative_score=ql,
+                quantitative_score=qt,
+                box_label=box_label,
+                goals_url=goals_url.format(employee_id),
+                competencies_url=competencies_url.format(employee_id),
+            )
+        )
+    return rows
+
+
+class IndicatorRow:
+    """Comportamiento de `edit_qualitative` con su valoración y la autoevaluación ya resueltas."""
+
+    __slots__ = ("id", "text", "rating", "self_rating", "self_label")
+
+    def __init__(self, id, text, rating, self_rating):
+        # Como texto: se pinta ~20 veces por fila y un int pasaría cada vez por la localización.
+        self.id = str(id)
+        self.text = text
+        self.rating = rating
+        self.self_rating = self_rating
+        self.self_label = RATING_LABELS.get(self_rating, "")
+
+
+def indicator_rows(indicators, rating_map, self_rating_map):
+    """Sin valoración guardada, `rating` es 1 (Nunca), como en el formulario."""
+    return [
+        IndicatorRow(ind.id, ind.text, rating_map.get(ind.id, 1), self_rating_map.get(ind.id))
+        for ind in indicators
+    ]
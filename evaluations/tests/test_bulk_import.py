@@ -0,0 +1,151 @@
+import io
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from openpyxl import Workbook
+
+from competencies.models import Competency, CompetencyLevel, LevelIndicator, RoleCompetencyRequirement
+from evaluations.models import EmployeeCycleScore, EvaluationCycle, QualitativeIndicatorAssessment, QuantitativeGoal
+from people.models import Department, Employee, Role
+
+
+def build_upload(header, rows):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return SimpleUploadedFile(
+        "import.xlsx",
+        buf.getvalue(),
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+
+class GoalBulkImportTests(TestCase):
+    def setUp(self):
+        dep = Department.objects.create(name="Tech")
+        role = Role.objects.create(name="Developer", department=dep)
+        self.hr = User.objects.create_superuser("hr", "hr@example.com", "pass")
+        self.cycle = EvaluationCycle.objects.create(name="2026", start_date=date(2026, 1, 1), end_date=date(2099, 12, 31))
+
+        self.ana = Employee.objects.create(
+            user=User.objects.create_user("ana", email="Ana@Example.com"), department=dep, role=role
+        )
+        self.luis = Employee.objects.create(
+            user=User.objects.create_user("luis", email="luis@example.com"), department=dep, role=role
+        )
+        QuantitativeGoal.objects.create(
+            employee=self.luis, cycle=self.cycle, title="Ventas", weight_percent=Decimal("60"),
+            completion_percent=Decimal("10"), created_by=self.hr,
+        )
+        QuantitativeGoal.objects.create(
+            employee=self.luis, cycle=self.cycle, title="NPS", weight_percent=Decimal("40"),
+            completion_percent=Decimal("10"), created_by=self.hr,
+        )
+
+    def _post(self, rows):
+        self.client.force_login(self.hr)
+        return self.client.post(
+            reverse("bulk_import"),
+            {"import_goals": "1", "excel_file": build_upload(["email", "titulo", "peso", "completado"], rows)},
+            follow=True,
+        )
+
+    def test_upserts_goals_and_recomputes_once(self):
+        with patch("evaluations.views.recompute_cycle_scores") as recompute:
+            response = self._post([
+                ["ana@example.com", "Objetivo A", 70, 100],
+                ["ana@example.com", "Objetivo B", 30, 50],
+                ["luis@example.com", "Ventas", 60, 80],
+            ])
+
+        self.assertContains(response, "2 creadas, 1 actualizadas (2 empleados)")
+        self.assertEqual(recompute.call_count, 1)
+        self.assertEqual(QuantitativeGoal.objects.filter(employee=self.ana, cycle=self.cycle).count(), 2)
+        ventas = QuantitativeGoal.objects.get(employee=self.luis, title="Ventas")
+        self.assertEqual(ventas.completion_percent, Decimal("80.00"))
+        self.assertTrue(QuantitativeGoal.objects.filter(employee=self.luis, title="NPS").exists())
+
+    def test_weights_not_summing_100_rejects_whole_file(self):
+        response = self._post([
+            ["ana@example.com", "Objetivo A", 70, 100],
+            ["luis@example.com", "Nueva", 10, 0],
+        ])
+
+        self.assertContains(response, "ana@example.com: los pesos deben sumar exactamente 100% (suman 70%)")
+        self.assertContains(response, "luis@example.com: los pesos deben sumar exactamente 100% (suman 110%)")
+        self.assertFalse(QuantitativeGoal.objects.filter(employee=self.ana).exists())
+        self.assertFalse(EmployeeCycleScore.objects.exists())
+
+    def test_unknown_employee_is_reported(self):
+        response = self._post([["ghost@example.com", "X", 100, 0]])
+        self.assertContains(response, "&#x27;ghost@example.com&#x27; no coincide con ningún empleado activo")
+
+
+class RatingBulkImportTests(TestCase):
+    def setUp(self):
+        dep = Department.objects.create(name="Tech")
+        role = Role.objects.create(name="Developer", department=dep)
+        self.hr = User.objects.create_superuser("hr", "hr@example.com", "pass")
+        self.cycle = EvaluationCycle.objects.create(name="2026", start_date=date(2026, 1, 1), end_date=date(2099, 12, 31))
+        self.emp = Employee.objects.create(
+            user=User.objects.create_user("ana", email="ana@example.com"), department=dep, role=role
+        )
+
+        self.comp = Competency.objects.create(name="Comunicación")
+        RoleCompetencyRequirement.objects.create(role=role, competency=self.comp, required_level=2)
+        l1 = CompetencyLevel.objects.create(competency=self.comp, level=1)
+        l2 = CompetencyLevel.objects.create(competency=self.comp, level=2)
+        self.i1 = LevelIndicator.objects.create(level=l1, text="Escucha")
+        self.i2 = LevelIndicator.objects.create(level=l2, text="Negocia")
+
+    def _post(self, rows):
+        self.client.force_login(self.hr)
+        return self.client.post(
+            reverse("bulk_import"),
+            {
+                "import_ratings": "1",
+                "excel_file": build_upload(["email", "competencia", "nivel", "comportamiento", "valoracion"], rows),
+            },
+            follow=True,
+        )
+
+    def test_level_unlocked_within_same_file(self):
+        with patch("evaluations.views.recompute_cycle_scores") as recompute:
+            response = self._post([
+                ["ana@example.com", "comunicación", 1, "Escucha", "Siempre"],
+                ["ana@example.com", "Comunicación", 2, "negocia", 3],
+            ])
+
+        self.assertContains(response, "2 creadas, 0 actualizadas (1 empleados)")
+        self.assertEqual(recompute.call_count, 1)
+        ratings = dict(QualitativeIndicatorAssessment.objects.values_list("indicator_id", "rating"))
+        self.assertEqual(ratings, {self.i1.id: 4, self.i2.id: 3})
+
+    def test_locked_level_is_skipped_with_warning(self):
+        response = self._post([
+            ["ana@example.com", "Comunicación", 1, "Escucha", 2],
+            ["ana@example.com", "Comunicación", 2, "Negocia", 4],
+        ])
+
+        self.assertContains(response, "Fila 3: nivel bloqueado")
+        self.assertEqual(
+            list(QualitativeIndicatorAssessment.objects.values_list("indicator_id", flat=True)), [self.i1.id]
+        )
+
+    def test_unknown_indicator_rejects_whole_file(self):
+        response = self._post([
+            ["ana@example.com", "Comunicación", 1, "Escucha", 4],
+            ["ana@example.com", "Comunicación", 1, "Inventado", 4],
+        ])
+
+        self.assertContains(response, "Fila 3: el comportamiento no existe en el nivel 1 de Comunicación")
+        self.assertFalse(QualitativeIndicatorAssessment.objects.exists())
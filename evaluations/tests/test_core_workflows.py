@@ -58,6 +58,19 @@ class CoreWorkflowTests(TestCase):
         self.assertEqual(allowed.status_code, 200)
         self.assertEqual(denied.status_code, 403)
 
+    def test_team_overview_rows_show_scores_and_edit_links(self):
+        EmployeeCycleScore.objects.create(
+            employee=self.report, cycle=self.cycle,
+            qualitative_score=Decimal("61.50"), quantitative_score=Decimal("72.00"), box_label="Estrellas",
+        )
+        self.client.login(username="hr", password="pass")
+        resp = self.client.get(reverse("team_overview"))
+
+        self.assertContains(resp, "Qlt 61.50")
+        self.assertContains(resp, "Sin score", count=2)
+        self.assertContains(resp, f'href="{reverse("edit_quantitative", args=[self.report.id])}"')
+        self.assertContains(resp, f'href="{reverse("competency_picker", args=[self.other.id])}"')
+
     def test_nine_box_recompute_assigns_box(self):
         comp = Competency.objects.create(name="Communication")
         lvl = CompetencyLevel.objects.create(competency=comp, level=1, title="L1")
@@ -0,0 +1,63 @@
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from evaluations.models import EvaluationCycle
+from evaluations.views import SESSION_CYCLE_KEY
+from people.models import Department, Employee, Role
+
+
+def _session_writes(queries):
+    return [
+        q["sql"] for q in queries
+        if "django_session" in q["sql"] and q["sql"].lstrip().upper().startswith(("UPDATE", "INSERT"))
+    ]
+
+
+class CycleSessionTests(TestCase):
+    def setUp(self):
+        dep = Department.objects.create(name="Tech")
+        role = Role.objects.create(name="Developer", department=dep)
+        self.manager_user = User.objects.create_user("manager", password="pass")
+        Employee.objects.create(user=self.manager_user, department=dep, role=role)
+
+        self.old = EvaluationCycle.objects.create(name="2025", start_date=date(2025, 1, 1), end_date=date(2025, 12, 31))
+        self.current = EvaluationCycle.objects.create(name="2026", start_date=date(2026, 1, 1), end_date=date(2026, 12, 31))
+        self.client.force_login(self.manager_user)
+
+    def test_page_views_do_not_write_session(self):
+        with CaptureQueriesContext(connection) as ctx:
+            first = self.client.get(reverse("team_overview"))
+            second = self.client.get(reverse("team_overview"))
+
+        self.assertEqual((first.status_code, second.status_code), (200, 200))
+        self.assertEqual(first.context["current_cycle"], self.current)
+        self.assertEqual(_session_writes(ctx.captured_queries), [])
+        self.assertNotIn(SESSION_CYCLE_KEY, self.client.session)
+
+    def test_cycle_selection_is_written_only_when_it_changes(self):
+        self.client.post(reverse("set_cycle"), {"cycle_id": self.old.id, "next": reverse("team_overview")})
+        self.assertEqual(self.client.session[SESSION_CYCLE_KEY], self.old.id)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse("set_cycle"), {"cycle_id": self.old.id, "next": reverse("team_overview")})
+            response = self.client.get(reverse("team_overview"))
+
+        self.assertEqual(response.context["current_cycle"], self.old)
+        self.assertEqual(_session_writes(ctx.captured_queries), [])
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_signed_cookie_sessions_keep_cycle_selection(self):
+        self.client.force_login(self.manager_user)
+        self.client.post(reverse("set_cycle"), {"cycle_id": self.old.id, "next": reverse("team_overview")})
+
+        response = self.client.get(reverse("team_overview"))
+
+        self.assertEqual(response.context["current_cycle"], self.old)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
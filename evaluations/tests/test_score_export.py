@@ -0,0 +1,85 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from openpyxl import load_workbook
+
+from evaluations.models import EmployeeCycleScore, EvaluationCycle
+from people.models import Department, Employee, Role
+
+
+class ScoreExportTests(TestCase):
+    def setUp(self):
+        self.tech = Department.objects.create(name="Tech")
+        self.sales = Department.objects.create(name="Sales")
+        self.dev = Role.objects.create(name="Developer", department=self.tech)
+        self.rep = Role.objects.create(name="Sales Rep", department=self.sales)
+
+        self.hr = User.objects.create_superuser("hr", "hr@example.com", "pass")
+        mgr_user = User.objects.create_user("mgr", first_name="Marta", last_name="Ruiz", password="pass")
+        dev_user = User.objects.create_user("dev", first_name="Luis", last_name="Pérez", email="luis@example.com", password="pass")
+        rep_user = User.objects.create_user("rep", password="pass")
+
+        self.cycle = EvaluationCycle.objects.create(name="Ciclo 2026", start_date=date(2026, 1, 1), end_date=date(2026, 12, 31))
+        self.mgr = Employee.objects.create(user=mgr_user, department=self.tech, role=self.dev)
+        self.dev_emp = Employee.objects.create(user=dev_user, department=self.tech, role=self.dev, manager=self.mgr)
+        self.rep_emp = Employee.objects.create(user=rep_user, department=self.sales, role=self.rep)
+
+        for emp, ql, qt in [(self.mgr, "80", "70"), (self.dev_emp, "50.5", "20"), (self.rep_emp, "10", "90")]:
+            EmployeeCycleScore.objects.create(
+                employee=emp, cycle=self.cycle,
+                qualitative_score=Decimal(ql), quantitative_score=Decimal(qt),
+                qual_tercile=2, quant_tercile=1, box_code="INCONSISTENT", box_label="Irregulares",
+            )
+
+    def test_csv_export_respects_department_filter(self):
+        self.client.force_login(self.hr)
+        response = self.client.get(reverse("nine_box_export"), {"format": "csv", "department": self.tech.id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode("utf-8-sig").splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["nombre", "email", "departamento"])
+        self.assertEqual(len(lines), 3)
+        self.assertIn("Luis Pérez,luis@example.com,Tech,Developer,Marta Ruiz,50.50,20.00,2,1,INCONSISTENT,Irregulares", lines)
+
+    def test_xlsx_export_contains_every_score(self):
+        self.client.force_login(self.hr)
+        response = self.client.get(reverse("nine_box_export"), {"format": "xlsx"})
+
+        self.assertEqual(response.status_code, 200)
+        wb = load_workbook(io.BytesIO(b"".join(response.streaming_content)), read_only=True)
+        rows = list(wb.active.iter_rows(values_only=True))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual({r[0] for r in rows[1:]}, {"Marta Ruiz", "Luis Pérez", "rep"})
+
+    def test_export_is_hr_only(self):
+        User.objects.create_user("plain", password="pass")
+        self.client.login(username="plain", password="pass")
+        response = self.client.get(reverse("nine_box_export"))
+        self.assertEqual(response.status_code, 403)
+
+    def test_nine_box_cards_use_flat_rows_and_constant_queries(self):
+        self.client.force_login(self.hr)
+        self.client.get(reverse("nine_box"))  # calienta sesión y singletons
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.get(reverse("nine_box"))
+        self.assertContains(response, 'data-manager="Marta Ruiz"')
+        self.assertContains(response, 'data-edit-quant-url="/evaluations/employee/0/quantitative/"')
+
+        for i in range(20):
+            user = User.objects.create_user(f"extra{i}", first_name="Extra", last_name=str(i))
+            emp = Employee.objects.create(user=user, department=self.tech, role=self.dev, manager=self.mgr)
+            EmployeeCycleScore.objects.create(
+                employee=emp, cycle=self.cycle, qual_tercile=3, quant_tercile=3, box_code="STAR", box_label="Estrellas"
+            )
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse("nine_box"))
+
+        self.assertContains(response, 'class="ninebox-emp"', count=23)
+        self.assertEqual(len(large), len(small))
@@ -1,8 +1,11 @@
 from datetime import date
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from people.models import Department, Role, Employee
 from evaluations.models import (
@@ -12,10 +15,16 @@ from evaluations.models import (
     BehaviorRating,
     EmployeeCycleScore,
     TalentMapSettings,
+    TercileCohort,
     QualitativeAxisMethod,
 )
 from competencies.models import Competency, CompetencyLevel, LevelIndicator, RoleCompetencyRequirement
-from evaluations.services.scoring import compute_quantitative_score, compute_qualitative_score, recompute_cycle_scores
+from evaluations.services.scoring import (
+    compute_quantitative_score,
+    compute_qualitative_score,
+    reassign_terciles,
+    recompute_cycle_scores,
+)
 
 
 class ScoringTests(TestCase):
@@ -153,3 +162,95 @@ class ScoringTests(TestCase):
         self.assertEqual(EmployeeCycleScore.objects.get(employee=e1, cycle=self.cycle).qual_tercile, 1)
         self.assertEqual(EmployeeCycleScore.objects.get(employee=e2, cycle=self.cycle).qual_tercile, 3)
         self.assertEqual(EmployeeCycleScore.objects.get(employee=e3, cycle=self.cycle).qual_tercile, 3)
+
+    def test_settings_change_reassigns_qualitative_terciles_from_stored_scores(self):
+        e2 = Employee.objects.create(user=User.objects.create_user(username="e2"), department=self.dep, role=self.role)
+        employees = Employee.objects.filter(id__in=[self.emp.id, e2.id])
+        comp = Competency.objects.create(name="Comp", description="")
+        ind = LevelIndicator.objects.create(level=CompetencyLevel.objects.create(competency=comp, level=1, title="L1"), text="i")
+        RoleCompetencyRequirement.objects.create(role=self.role, competency=comp, required_level=1, weight=Decimal("1"))
+        QualitativeIndicatorAssessment.objects.create(employee=self.emp, cycle=self.cycle, indicator=ind, rating=1, assessed_by=self.mgr_user)
+        QualitativeIndicatorAssessment.objects.create(employee=e2, cycle=self.cycle, indicator=ind, rating=4, assessed_by=self.mgr_user)
+
+        # Scores sin competencias por encima/debajo guardadas: hace falta el recálculo completo.
+        EmployeeCycleScore.objects.create(employee=self.emp, cycle=self.cycle)
+        EmployeeCycleScore.objects.create(employee=e2, cycle=self.cycle)
+        self.assertIsNone(reassign_terciles(self.cycle, employees))
+
+        # Tercios: emp queda por debajo del perfil (1) y e2 lo cumple justo (2).
+        recompute_cycle_scores(self.cycle, employees)
+        self.assertEqual(
+            list(EmployeeCycleScore.objects.filter(cycle=self.cycle).order_by("employee_id").values_list("qual_tercile", flat=True)),
+            [1, 2],
+        )
+
+        cfg = TalentMapSettings.get_solo()
+        cfg.qualitative_axis_method = QualitativeAxisMethod.GAUSSIAN
+        cfg.save()
+        with CaptureQueriesContext(connection) as ctx:
+            moved = reassign_terciles(self.cycle, employees)
+        self.assertEqual(moved, 1)
+        self.assertFalse(any("qualitativeindicatorassessment" in q["sql"] for q in ctx.captured_queries))
+        self.assertFalse(any("quantitativegoal" in q["sql"] for q in ctx.captured_queries))
+
+        def boxes():
+            return list(
+                EmployeeCycleScore.objects.filter(cycle=self.cycle).order_by("employee_id").values_list("qual_tercile", "box_code")
+            )
+
+        reassigned = boxes()
+        recompute_cycle_scores(self.cycle, employees)
+        self.assertEqual(reassigned, boxes())
+        self.assertEqual(reassign_terciles(self.cycle, employees), 0)
+
+    def test_tercile_cohort_ranks_within_each_department(self):
+        ops = Department.objects.create(name="Ops")
+        ops_role = Role.objects.create(name="Ops", department=ops)
+        o1 = Employee.objects.create(user=User.objects.create_user(username="o1"), department=ops, role=ops_role)
+        o2 = Employee.objects.create(user=User.objects.create_user(username="o2"), department=ops, role=ops_role)
+        for emp, completion in ((self.mgr, "10"), (self.emp, "20"), (o1, "80"), (o2, "90")):
+            QuantitativeGoal.objects.create(
+                employee=emp, cycle=self.cycle, title="A", description="",
+                weight_percent=Decimal("100"), completion_percent=Decimal(completion),
+                created_by=self.mgr_user
+            )
+        employees = Employee.objects.filter(id__in=[self.mgr.id, self.emp.id, o1.id, o2.id])
+
+        def quant_terciles():
+            return list(
+                EmployeeCycleScore.objects.filter(cycle=self.cycle).order_by("quantitative_score").values_list("quant_tercile", flat=True)
+            )
+
+        recompute_cycle_scores(self.cycle, employees)
+        self.assertEqual(quant_terciles(), [1, 2, 3, 3])
+
+        # Por departamento: Ops deja de compararse con Tech, sin recalcular los scores.
+        cfg = TalentMapSettings.get_solo()
+        cfg.tercile_cohort = TercileCohort.DEPARTMENT
+        cfg.save()
+        with CaptureQueriesContext(connection) as ctx:
+            moved = reassign_terciles(self.cycle, employees)
+        self.assertEqual(moved, 2)
+        self.assertFalse(any("quantitativegoal" in q["sql"] for q in ctx.captured_queries))
+        self.assertEqual(quant_terciles(), [1, 2, 1, 2])
+
+        recompute_cycle_scores(self.cycle, employees)
+        self.assertEqual(quant_terciles(), [1, 2, 1, 2])
+
+    def test_recompute_upserts_in_chunks(self):
+        QuantitativeGoal.objects.create(
+            employee=self.emp, cycle=self.cycle, title="A", description="",
+            weight_percent=Decimal("100"), completion_percent=Decimal("80"),
+            created_by=self.mgr_user
+        )
+        stale = EmployeeCycleScore.objects.create(employee=self.emp, cycle=self.cycle, box_code="RISK", box_label="En riesgo")
+
+        with patch("evaluations.services.scoring.SCORE_WRITE_CHUNK", 1):
+            recompute_cycle_scores(self.cycle, Employee.objects.filter(id__in=[self.mgr.id, self.emp.id]))
+
+        self.assertEqual(EmployeeCycleScore.objects.filter(cycle=self.cycle).count(), 2)
+        row = EmployeeCycleScore.objects.get(employee=self.emp, cycle=self.cycle)
+        self.assertEqual(row.id, stale.id)
+        self.assertEqual(row.quantitative_score, Decimal("80"))
+        self.assertGreater(row.quant_tercile, EmployeeCycleScore.objects.get(employee=self.mgr, cycle=self.cycle).quant_tercile)
+        self.assertGreater(row.updated_at, stale.updated_at)
@@ -7,7 +7,13 @@ urlpatterns = [
     path("cycle-setup/", views.cycle_setup, name="cycle_setup"),
     path("set-cycle/", views.set_cycle, name="set_cycle"),
     path("nine-box/", views.nine_box_dashboard, name="nine_box"),
+    path("nine-box/export/", views.nine_box_export, name="nine_box_export"),
+    path("nine-box/movement/", views.talent_movement, name="talent_movement"),
+    path("nine-box/simulate/", views.api_nine_box_simulate, name="api_nine_box_simulate"),
     path("team/", views.team_overview, name="team_overview"),
+    path("import/", views.bulk_import, name="bulk_import"),
+    path("import/goals-template/", views.download_goals_template, name="download_goals_template"),
+    path("import/ratings-template/", views.download_ratings_template, name="download_ratings_template"),
 
     # Entry-point cualitativo (1 arg) -> selector de competencias.
     # Mantiene compatibilidad con templates que hacen:
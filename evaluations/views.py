@@ -1,24 +1,46 @@
+import json
 from datetime import date
+from urllib.parse import urlencode
 
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.text import slugify
 
-from competencies.models import Competency, CompetencyLevel, RoleCompetencyRequirement
+from competencies.catalog import competency_levels, get_catalog
+from competencies.models import Competency, RoleCompetencyRequirement
 from evaluations.forms import CycleCreateForm, GoalFormSet
 from evaluations.models import (
     EmployeeCycleScore,
     EvaluationCycle,
     TalentMapSettings,
+    TercileCohort,
     QualitativeAxisMethod,
     QualitativeIndicatorAssessment,
     QualitativeIndicatorSelfAssessment,
     QuantitativeGoal,
 )
-from evaluations.services.scoring import BOXES, PASS_RATING, recompute_cycle_scores, terciles_for_scores
+from evaluations.services.exports import build_scores_xlsx, iter_scores_csv
+from evaluations.services.fragments import fragment_timeout, fragment_versions
+from evaluations.services.imports import build_goals_template, build_ratings_template, import_goals, import_ratings
+from evaluations.services.movement import BOX_BY_CODE, movement_matrix, movement_rows
+from evaluations.services.scoring import (
+    BOXES,
+    PASS_RATING,
+    lock_new_ratings,
+    nine_box_counts,
+    qual_progress,
+    reassign_terciles,
+    recompute_cycle_scores,
+)
+from evaluations.services.simulation import SimulationError, candidate_config, simulate_nine_box
+from evaluations.services.snapshots import load_snapshot, snapshot_competency_rows
+from evaluations.services.view_models import indicator_rows, nine_box_cards, team_rows
 from people.models import Department, Employee, Role
-from people.services.access import is_hr, managed_employees_qs
+from people.services.access import direct_report_ids, is_hr, managed_employees_qs
 from django.contrib import messages
 
 
@@ -43,16 +65,26 @@ def _default_cycle():
 
 
 def get_current_cycle(request):
-    cycle_id = request.session.get(SESSION_CYCLE_KEY)
-    if cycle_id:
-        cycle = EvaluationCycle.objects.filter(id=cycle_id).first()
-        if cycle:
-            return cycle
-
-    cycle = _default_cycle()
-    if cycle:
+    """
+    Ciclo elegido en la sesión o, si no hay (o ya no existe), el ciclo por defecto.
+    Solo lee la sesión: el ciclo por defecto no se guarda, así que ver una página no
+    escribe en la sesión (ni UPDATE django_session ni Set-Cookie con signed_cookies).
+    Se memoiza en la request (vista + context processor).
+    """
+    if not hasattr(request, "_current_cycle"):
+        cycle = None
+        cycle_id = request.session.get(SESSION_CYCLE_KEY)
+        if cycle_id:
+            cycle = EvaluationCycle.objects.filter(id=cycle_id).first()
+        request._current_cycle = cycle or _default_cycle()
+    return request._current_cycle
+
+
+def _remember_cycle(request, cycle):
+    """Guarda la selección de ciclo solo si cambia (asignar el mismo valor marcaría la sesión como modificada)."""
+    if request.session.get(SESSION_CYCLE_KEY) != cycle.id:
         request.session[SESSION_CYCLE_KEY] = cycle.id
-    return cycle
+    request._current_cycle = cycle
 
 
 @login_required
@@ -64,7 +96,7 @@ def set_cycle(request):
     if cycle_id:
         cycle = EvaluationCycle.objects.filter(id=cycle_id).first()
         if cycle:
-            request.session[SESSION_CYCLE_KEY] = cycle.id
+            _remember_cycle(request, cycle)
 
     next_url = request.POST.get("next") or request.META.get("HTTP_REFERER") or "/evaluations/"
     return redirect(next_url or "eval_home")
@@ -86,7 +118,12 @@ def _cycle_or_admin_redirect(request):
 
 
 def _cycle_is_closed(cycle: EvaluationCycle) -> bool:
-    return cycle.end_date < timezone.localdate()
+    return cycle.is_closed
+
+
+def _frozen_cycle(cycle: EvaluationCycle):
+    """Snapshot del ciclo (FrozenCycle) si está cerrado y congelado; None en otro caso (vía en vivo)."""
+    return load_snapshot(cycle) if _cycle_is_closed(cycle) else None
 
 
 @login_required
@@ -106,7 +143,7 @@ def cycle_setup(request):
             form.add_error("end_date", "La fecha de término no puede ser anterior a hoy.")
         else:
             cycle = EvaluationCycle.objects.create(name=name, start_date=start_date, end_date=end_date)
-            request.session[SESSION_CYCLE_KEY] = cycle.id
+            _remember_cycle(request, cycle)
             messages.success(request, "Nuevo ciclo creado correctamente.")
             return redirect("eval_home")
 
@@ -114,7 +151,7 @@ def cycle_setup(request):
 
 
 def _can_manage_employee(user, employee: Employee) -> bool:
-    return is_hr(user) or managed_employees_qs(user).filter(id=employee.id).exists()
+    return is_hr(user) or employee.id in direct_report_ids(user)
 
 
 @login_required
@@ -131,8 +168,12 @@ def cycle_home(request):
         return render(request, "evaluations/no_employee.html", {"cycle": cycle})
 
     my_score = EmployeeCycleScore.objects.filter(employee=me, cycle=cycle).first()
-    is_manager = managed_employees_qs(request.user).exists()
     hr = is_hr(request.user)
+    is_manager = hr or bool(direct_report_ids(request.user))
+
+    frozen = _frozen_cycle(cycle) if hr else None
+    box_counts = (frozen.box_counts() if frozen else nine_box_counts(cycle)) if hr else {}
+    nine_box_summary = [(label, box_counts.get(code, 0)) for code, label in BOXES.values()] if hr else []
 
     can_edit_me = hr or (me.manager_id and me.manager.user_id == request.user.id)
     can_self_evaluate = hasattr(request.user, "employee")
@@ -146,6 +187,7 @@ def cycle_home(request):
             "my_score": my_score,
             "is_manager": is_manager,
             "is_hr": hr,
+            "nine_box_summary": nine_box_summary,
             "can_edit_me": can_edit_me,
             "can_self_evaluate": can_self_evaluate,
             "cycle_locked": cycle_locked,
@@ -160,15 +202,22 @@ def team_overview(request):
         return fallback
 
     # Managers: solo reportes directos, HR: toda la empresa
-    emps = managed_employees_qs(request.user).select_related("user", "role", "department").order_by("user__last_name")
-    if is_hr(request.user):
-        emps = Employee.objects.filter(active=True).select_related("user", "role", "department").order_by("user__last_name")
+    hr = is_hr(request.user)
+    emps = managed_employees_qs(request.user).order_by("user__last_name")
+    if hr:
+        emps = Employee.objects.filter(active=True).order_by("user__last_name")
+
+    frozen = _frozen_cycle(cycle)
+    if frozen:
+        # Plantilla congelada al cerrar el ciclo; los managers ven solo a sus reportes actuales.
+        rows = frozen.team_rows(None if hr else set(emps.values_list("id", flat=True)))
+    else:
+        rows = team_rows(cycle, emps)
 
-    scores = {s.employee_id: s for s in EmployeeCycleScore.objects.filter(cycle=cycle, employee__in=emps)}
     return render(
         request,
         "evaluations/team_overview.html",
-        {"cycle": cycle, "employees": emps, "scores": scores, "cycle_locked": _cycle_is_closed(cycle)},
+        {"cycle": cycle, "rows": rows, "cycle_locked": _cycle_is_closed(cycle)},
     )
 
 
@@ -211,7 +260,7 @@ def edit_quantitative(request, employee_id):
 
             _recompute_company(cycle)
 
-            return redirect("team_overview" if managed_employees_qs(request.user).exists() or is_hr(request.user) else "eval_home")
+            return redirect("team_overview" if is_hr(request.user) or direct_report_ids(request.user) else "eval_home")
     else:
         formset = GoalFormSet(queryset=qs)
 
@@ -243,25 +292,29 @@ def competency_picker(request, employee_id):
     if not allowed:
         return render(request, "evaluations/forbidden.html", status=403)
 
-    reqs = list(
-        RoleCompetencyRequirement.objects.filter(role=emp.role)
-        .select_related("competency")
-        .order_by("competency__name")
-    )
-
     model_cls = QualitativeIndicatorSelfAssessment if is_self_eval else QualitativeIndicatorAssessment
-    req_rows = []
-    for req in reqs:
-        levels = (
-            CompetencyLevel.objects.filter(competency=req.competency, level__lte=req.required_level)
-            .prefetch_related("indicators")
-            .order_by("level")
+
+    def req_rows():
+        # Se evalúa desde la plantilla: si el fragmento está en caché no se consulta nada.
+        if not is_self_eval and _frozen_cycle(cycle):
+            frozen_rows = snapshot_competency_rows(cycle, emp)
+            if frozen_rows:
+                return frozen_rows
+        reqs = (
+            RoleCompetencyRequirement.objects.filter(role_id=emp.role_id)
+            .select_related("competency")
+            .order_by("competency__name")
         )
-        indicator_ids = [ind.id for lvl in levels for ind in lvl.indicators.all()]
-        ratings = model_cls.objects.filter(employee=emp, cycle=cycle, indicator_id__in=indicator_ids)
-        rating_map = {a.indicator_id: int(a.rating) for a in ratings}
-        achieved_level, _, _ = _qual_progress(levels, rating_map, int(req.required_level))
-        req_rows.append({"req": req, "achieved_level": achieved_level})
+        catalog = get_catalog()
+        rows = []
+        for req in reqs:
+            levels = competency_levels(req.competency_id, int(req.required_level), catalog=catalog)
+            indicator_ids = [ind.id for lvl in levels for ind in lvl.indicators.all()]
+            ratings = model_cls.objects.filter(employee=emp, cycle=cycle, indicator_id__in=indicator_ids)
+            rating_map = {a.indicator_id: int(a.rating) for a in ratings}
+            achieved_level, _, _ = qual_progress(levels, rating_map, int(req.required_level))
+            rows.append({"req": req, "achieved_level": achieved_level})
+        return rows
 
     return render(
         request,
@@ -272,40 +325,12 @@ def competency_picker(request, employee_id):
             "req_rows": req_rows,
             "is_self_eval": is_self_eval,
             "cycle_locked": cycle_locked,
+            "versions": fragment_versions(cycle, emp),
+            "fragment_timeout": fragment_timeout(),
         },
     )
 
 
-def _qual_progress(levels, rating_map, required_level):
-    """
-    Devuelve (achieved_level, unlocked_max_level, missing_level)
-    - achieved_level: último nivel completado (con indicadores).
-    - unlocked_max_level: primer nivel NO completado (editable) o nivel con config incompleta.
-    - missing_level: número de nivel sin indicadores (si existe).
-    """
-    achieved = 0
-    unlocked = 1
-    missing_level = None
-
-    for lvl in levels:
-        inds = list(lvl.indicators.all())
-        if not inds:
-            missing_level = lvl.level
-            unlocked = lvl.level
-            break
-
-        passed = sum(1 for ind in inds if rating_map.get(ind.id, 1) >= PASS_RATING)
-        if passed == len(inds):
-            achieved = lvl.level
-            unlocked = min(lvl.level + 1, required_level)
-        else:
-            unlocked = lvl.level
-            break
-
-    unlocked = max(1, min(unlocked, required_level))
-    return achieved, unlocked, missing_level
-
-
 @login_required
 def edit_qualitative(request, employee_id, competency_id):
     """ CUALITATIVO = competencias→niveles→comportamientos con escala Nunca/Casi nunca/Casi siempre/Siempre. """
@@ -325,11 +350,7 @@ def edit_qualitative(request, employee_id, competency_id):
     req = RoleCompetencyRequirement.objects.filter(role=emp.role, competency=comp).first()
     required_level = int(req.required_level) if req else 1
 
-    levels = (
-        CompetencyLevel.objects.filter(competency=comp, level__lte=required_level)
-        .prefetch_related("indicators")
-        .order_by("level")
-    )
+    levels = competency_levels(comp.id, required_level)
 
     indicator_ids = []
     for lvl in levels:
@@ -340,19 +361,7 @@ def edit_qualitative(request, employee_id, competency_id):
     existing = model_cls.objects.filter(employee=emp, cycle=cycle, indicator_id__in=indicator_ids)
     rating_map = {a.indicator_id: int(a.rating) for a in existing}
 
-    self_rating_map = {}
-    if not is_self_eval:
-        official_ids = set(
-            QualitativeIndicatorAssessment.objects.filter(
-                employee=emp, cycle=cycle, indicator_id__in=indicator_ids
-            ).values_list("indicator_id", flat=True)
-        )
-        self_existing = QualitativeIndicatorSelfAssessment.objects.filter(
-            employee=emp, cycle=cycle, indicator_id__in=indicator_ids
-        )
-        self_rating_map = {a.indicator_id: int(a.rating) for a in self_existing if a.indicator_id in official_ids}
-
-    achieved_level, unlocked_max_level, missing_level = _qual_progress(levels, rating_map, required_level)
+    achieved_level, unlocked_max_level, missing_level = qual_progress(levels, rating_map, required_level)
     current_level = unlocked_max_level
 
     if request.method == "POST":
@@ -360,39 +369,29 @@ def edit_qualitative(request, employee_id, competency_id):
             messages.error(request, "Este ciclo está cerrado. Solo se permite consulta.")
             return redirect("edit_qualitative_competency", employee_id=employee_id, competency_id=competency_id)
 
+        new_ratings = {}
+        indicators_by_id = {}
+        for lvl in levels:
+            for ind in lvl.indicators.all():
+                raw = request.POST.get(f"ind_{ind.id}")
+                try:
+                    rating = int(raw) if raw else 1
+                except ValueError:
+                    rating = 1
+                new_ratings[ind.id] = max(1, min(4, rating))
+                indicators_by_id[ind.id] = ind
+
+        # Enforce server-side locking: no aceptar niveles bloqueados.
+        accepted, _ = lock_new_ratings(levels, rating_map, new_ratings, required_level)
+
         with transaction.atomic():
-            post_rating_map = dict(rating_map)
-            dynamic_unlocked_max = unlocked_max_level
-            for lvl in levels:
-                # Enforce server-side locking: no aceptar niveles bloqueados.
-                if lvl.level > dynamic_unlocked_max:
-                    continue
-
-                inds = list(lvl.indicators.all())
-                for ind in lvl.indicators.all():
-                    raw = request.POST.get(f"ind_{ind.id}")
-                    try:
-                        rating = int(raw) if raw else 1
-                    except ValueError:
-                        rating = 1
-                    rating = max(1, min(4, rating))
-
-                    model_cls.objects.update_or_create(
-                        employee=emp,
-                        cycle=cycle,
-                        indicator=ind,
-                        defaults={"rating": rating, **({} if is_self_eval else {"assessed_by": request.user})},
-                    )
-                    post_rating_map[ind.id] = rating
-
-                # Recalcula desbloqueo dentro del mismo submit para no obligar a guardar entre niveles.
-                if inds:
-                    passed = sum(1 for ind in inds if post_rating_map.get(ind.id, 1) >= PASS_RATING)
-                    if passed == len(inds):
-                        dynamic_unlocked_max = min(lvl.level + 1, required_level)
-                    else:
-                        dynamic_unlocked_max = lvl.level
-                        break
+            for ind_id, rating in accepted.items():
+                model_cls.objects.update_or_create(
+                    employee=emp,
+                    cycle=cycle,
+                    indicator=indicators_by_id[ind_id],
+                    defaults={"rating": rating, **({} if is_self_eval else {"assessed_by": request.user})},
+                )
 
         if is_self_eval:
             messages.success(request, "Autoevaluación cualitativa guardada.")
@@ -401,23 +400,38 @@ def edit_qualitative(request, employee_id, competency_id):
             messages.success(request, "Cualitativo guardado.")
         return redirect("edit_qualitative_competency", employee_id=emp.id, competency_id=comp.id)
 
-    # GET render
-    levels_ctx = []
-    for lvl in levels:
-        inds = list(lvl.indicators.all())
-        total = len(inds)
-        passed = sum(1 for ind in inds if rating_map.get(ind.id, 1) >= PASS_RATING)
-
-        levels_ctx.append(
-            {
-                "level": lvl,
-                "indicators": inds,
-                "passed": passed,
-                "total": total,
-                "missing_config": (total == 0),
-                "locked_initial": (lvl.level > unlocked_max_level),
-            }
-        )
+    # GET render. Niveles y comportamientos se evalúan desde la plantilla, dentro del fragmento
+    # cacheado: con el fragmento en caché no se consultan las autoevaluaciones ni se construyen filas.
+    def levels_ctx():
+        self_rating_map = {}
+        if not is_self_eval:
+            official_ids = set(
+                QualitativeIndicatorAssessment.objects.filter(
+                    employee=emp, cycle=cycle, indicator_id__in=indicator_ids
+                ).values_list("indicator_id", flat=True)
+            )
+            self_existing = QualitativeIndicatorSelfAssessment.objects.filter(
+                employee=emp, cycle=cycle, indicator_id__in=indicator_ids
+            )
+            self_rating_map = {a.indicator_id: int(a.rating) for a in self_existing if a.indicator_id in official_ids}
+
+        rows = []
+        for lvl in levels:
+            inds = indicator_rows(lvl.indicators.all(), rating_map, self_rating_map)
+            total = len(inds)
+            passed = sum(1 for ind in inds if ind.rating >= PASS_RATING)
+
+            rows.append(
+                {
+                    "level": lvl,
+                    "indicators": inds,
+                    "passed": passed,
+                    "total": total,
+                    "missing_config": (total == 0),
+                    "locked_initial": (lvl.level > unlocked_max_level),
+                }
+            )
+        return rows
 
     return render(
         request,
@@ -428,20 +442,29 @@ def edit_qualitative(request, employee_id, competency_id):
             "competency": comp,
             "required_level": required_level,
             "levels_ctx": levels_ctx,
-            "rating_map": rating_map,
             "achieved_level": achieved_level,
             "current_level": current_level,
             "unlocked_max_level": unlocked_max_level,
             "missing_level": missing_level,
             "PASS_RATING": PASS_RATING,
             "is_self_eval": is_self_eval,
-            "self_rating_map": self_rating_map,
             "cycle_locked": cycle_locked,
+            "versions": fragment_versions(cycle, emp),
+            "fragment_timeout": fragment_timeout(),
         },
     )
 
 
 
+def _nine_box_employees(dept_id, role_id):
+    base_emps = Employee.objects.filter(active=True)
+    if dept_id:
+        base_emps = base_emps.filter(department_id=dept_id)
+    if role_id:
+        base_emps = base_emps.filter(role_id=role_id)
+    return base_emps
+
+
 @login_required
 def nine_box_dashboard(request):
     """
@@ -456,9 +479,21 @@ def nine_box_dashboard(request):
 
     settings_obj = TalentMapSettings.get_solo()
     if request.method == "POST":
+        def current_settings():
+            return (
+                settings_obj.qualitative_axis_method,
+                settings_obj.top_min_above,
+                settings_obj.middle_max_below,
+                settings_obj.tercile_cohort,
+            )
+
+        previous = current_settings()
         method = request.POST.get("qualitative_axis_method")
         if method in {QualitativeAxisMethod.THIRDS, QualitativeAxisMethod.GAUSSIAN}:
             settings_obj.qualitative_axis_method = method
+        cohort = request.POST.get("tercile_cohort")
+        if cohort in TercileCohort.values:
+            settings_obj.tercile_cohort = cohort
 
         try:
             settings_obj.top_min_above = max(1, int(request.POST.get("top_min_above", settings_obj.top_min_above)))
@@ -467,48 +502,63 @@ def nine_box_dashboard(request):
             messages.error(request, "Parámetros inválidos para la configuración del eje cualitativo.")
             return redirect("nine_box")
 
+        if current_settings() == previous:
+            messages.info(request, "Sin cambios en la configuración del mapa de talento.")
+            return redirect("nine_box")
+
         settings_obj.save()
-        _recompute_company(cycle)
-        messages.success(request, "Configuración del mapa de talento actualizada.")
+        if cycle.is_frozen:
+            messages.success(
+                request, "Configuración guardada. Este ciclo está congelado: su 9-box no se recalcula."
+            )
+            return redirect("nine_box")
+
+        # La configuración solo afecta a los terciles: se reasignan desde los scores guardados.
+        moved = reassign_terciles(cycle, Employee.objects.filter(active=True))
+        if moved is None:
+            _recompute_company(cycle)
+            messages.success(request, "Configuración del mapa de talento actualizada.")
+        elif moved == 1:
+            messages.success(request, "Configuración del mapa de talento actualizada: 1 empleado cambia de box.")
+        else:
+            messages.success(
+                request, f"Configuración del mapa de talento actualizada: {moved} empleados cambian de box."
+            )
         return redirect("nine_box")
 
     dept_id = request.GET.get("department")
     role_id = request.GET.get("role")
-
-    base_emps = Employee.objects.filter(active=True)
-    if dept_id:
-        base_emps = base_emps.filter(department_id=dept_id)
-    if role_id:
-        base_emps = base_emps.filter(role_id=role_id)
-
-    scores = list(
-        EmployeeCycleScore.objects.filter(cycle=cycle, employee__in=base_emps)
-        .select_related("employee", "employee__user", "employee__department", "employee__role")
-        .order_by("-qualitative_score", "-quantitative_score")
-    )
-
-    grid = terciles_for_scores(scores)
-
-    order = [
-        (3, 1), (3, 2), (3, 3),
-        (2, 1), (2, 2), (2, 3),
-        (1, 1), (1, 2), (1, 3),
-    ]
-    box_label = {k: v[1] for k, v in BOXES.items()}
-
-    cells = []
-    for qual, quant in order:
-        cells.append(
+    base_emps = _nine_box_employees(dept_id, role_id)
+
+    def cells():
+        # Se evalúa desde la plantilla, dentro del fragmento cacheado con la versión del 9-box.
+        frozen = _frozen_cycle(cycle)
+        grid = frozen.nine_box_cards(dept_id, role_id) if frozen else nine_box_cards(cycle, base_emps)
+        order = [
+            (3, 1), (3, 2), (3, 3),
+            (2, 1), (2, 2), (2, 3),
+            (1, 1), (1, 2), (1, 3),
+        ]
+        box_label = {k: v[1] for k, v in BOXES.items()}
+        return [
             {
                 "qual": qual,
                 "quant": quant,
                 "label": box_label[(qual, quant)],
                 "items": grid.get((qual, quant), []),
             }
-        )
+            for qual, quant in order
+        ]
 
     roles_qs = Role.objects.filter(department_id=dept_id).order_by("name") if dept_id else Role.objects.none()
-    editable_employee_ids = set(base_emps.values_list("id", flat=True))
+
+    # Una URL por acción con id 0; el JS del modal la completa con el id de la tarjeta.
+    # Solo HR llega aquí y las tarjetas salen de base_emps: todas son editables.
+    card_url_templates = {
+        "edit_qual": reverse("competency_picker", args=[0]),
+        "edit_quant": reverse("edit_quantitative", args=[0]),
+        "delete": reverse("delete_employee", args=[0]),
+    }
 
     return render(
         request,
@@ -522,7 +572,232 @@ def nine_box_dashboard(request):
             "role_id": role_id or "",
             "talentmap_settings": settings_obj,
             "qualitative_axis_choices": QualitativeAxisMethod.choices,
-            "editable_employee_ids": editable_employee_ids,
+            "tercile_cohort_choices": TercileCohort.choices,
+            "card_url_templates": card_url_templates,
             "is_hr": is_hr(request.user),
+            "versions": fragment_versions(cycle),
+            "fragment_timeout": fragment_timeout(),
+        },
+    )
+
+
+@login_required
+def api_nine_box_simulate(request):
+    """
+    JSON: simula configuraciones del eje cualitativo sobre los scores guardados del ciclo actual,
+    sin guardar nada. SOLO ADMINS (HR_ADMIN/superuser).
+
+    POST con cuerpo JSON:
+        {"configs": [{"qualitative_axis_method": "GAUSSIAN"}, {"top_min_above": 2}, ...],
+         "department": <id opcional>, "role": <id opcional>}
+    Lo que falte en cada configuración se toma de la actual.
+    """
+    if not is_hr(request.user):
+        return JsonResponse({"ok": False, "error": "Forbidden"}, status=403)
+    if request.method != "POST":
+        return JsonResponse({"ok": False, "error": "POST required"}, status=405)
+
+    cycle = get_current_cycle(request)
+    if cycle is None:
+        return JsonResponse({"ok": False, "error": "No hay ciclos de evaluación."}, status=400)
+    try:
+        payload = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "Cuerpo JSON inválido."}, status=400)
+    if not isinstance(payload, dict) or not isinstance(payload.get("configs"), list):
+        return JsonResponse({"ok": False, "error": "Falta la lista 'configs'."}, status=400)
+
+    base = TalentMapSettings.get_solo()
+    try:
+        candidates = [candidate_config(data, base) for data in payload["configs"]]
+        result = simulate_nine_box(
+            cycle,
+            Employee.objects.filter(active=True),
+            candidates,
+            dept_id=payload.get("department"),
+            role_id=payload.get("role"),
+        )
+    except SimulationError as exc:
+        return JsonResponse({"ok": False, "error": str(exc)}, status=400)
+    return JsonResponse({"ok": True, "cycle": cycle.id, **result})
+
+
+@login_required
+def nine_box_export(request):
+    """
+    Exporta scores y 9-box del ciclo actual (CSV o XLSX) con los filtros del 9-box.
+    SOLO ADMINS (HR_ADMIN/superuser).
+    """
+    if not is_hr(request.user):
+        return render(request, "evaluations/forbidden.html", status=403)
+
+    cycle, fallback = _cycle_or_admin_redirect(request)
+    if fallback:
+        return fallback
+
+    base_emps = _nine_box_employees(request.GET.get("department"), request.GET.get("role"))
+    filename = f"9box_{slugify(cycle.name) or cycle.id}"
+
+    if request.GET.get("format") == "xlsx":
+        return FileResponse(
+            build_scores_xlsx(cycle, base_emps),
+            as_attachment=True,
+            filename=f"{filename}.xlsx",
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+    response = StreamingHttpResponse(iter_scores_csv(cycle, base_emps), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def _previous_cycle(cycle):
+    return (
+        EvaluationCycle.objects.filter(end_date__lt=cycle.end_date)
+        .exclude(pk=cycle.pk)
+        .order_by("-end_date", "-start_date")
+        .first()
+    )
+
+
+@login_required
+def talent_movement(request):
+    """
+    Movimientos entre dos ciclos: matriz 9×9 (box de origen × box de destino) con los filtros
+    del 9-box y detalle de las personas de una transición. SOLO ADMINS (HR_ADMIN/superuser).
+    Por defecto compara el ciclo actual con el anterior.
+    """
+    if not is_hr(request.user):
+        return render(request, "evaluations/forbidden.html", status=403)
+
+    cycle, fallback = _cycle_or_admin_redirect(request)
+    if fallback:
+        return fallback
+
+    cycles = list(EvaluationCycle.objects.order_by("-end_date", "-start_date"))
+    cycles_by_id = {str(c.pk): c for c in cycles}
+    to_cycle = cycles_by_id.get(request.GET.get("to")) or cycle
+    from_cycle = cycles_by_id.get(request.GET.get("from")) or _previous_cycle(to_cycle)
+    dept_id = request.GET.get("department")
+    role_id = request.GET.get("role")
+
+    matrix = None
+    drill = None
+    query = {}
+    if from_cycle and from_cycle != to_cycle:
+        matrix = movement_matrix(from_cycle, to_cycle, dept_id, role_id)
+        query = {"from": from_cycle.pk, "to": to_cycle.pk, "department": dept_id or "", "role": role_id or ""}
+        from_code, to_code = request.GET.get("from_box"), request.GET.get("to_box")
+        if from_code in BOX_BY_CODE and to_code in BOX_BY_CODE:
+            drill = {
+                "from_code": from_code,
+                "to_code": to_code,
+                "from_label": BOXES[BOX_BY_CODE[from_code]][1],
+                "to_label": BOXES[BOX_BY_CODE[to_code]][1],
+                "rows": movement_rows(from_cycle, to_cycle, from_code, to_code, dept_id, role_id),
+            }
+
+    roles_qs = Role.objects.filter(department_id=dept_id).order_by("name") if dept_id else Role.objects.none()
+
+    return render(
+        request,
+        "evaluations/talent_movement.html",
+        {
+            "cycle": cycle,
+            "cycles": cycles,
+            "from_cycle": from_cycle,
+            "to_cycle": to_cycle,
+            "matrix": matrix,
+            "drill": drill,
+            # Query string de la comparación; las celdas le añaden from_box/to_box.
+            "matrix_query": urlencode(query),
+            "departments": Department.objects.all(),
+            "roles": roles_qs,
+            "dept_id": dept_id or "",
+            "role_id": role_id or "",
         },
     )
+
+
+@login_required
+def bulk_import(request):
+    """
+    Importación masiva de metas y valoraciones cualitativas del ciclo actual desde Excel.
+    SOLO ADMINS (HR_ADMIN/superuser). Un único recálculo al final.
+    """
+    if not is_hr(request.user):
+        return render(request, "evaluations/forbidden.html", status=403)
+
+    cycle, fallback = _cycle_or_admin_redirect(request)
+    if fallback:
+        return fallback
+
+    cycle_locked = _cycle_is_closed(cycle)
+
+    if request.method == "POST":
+        if cycle_locked:
+            messages.error(request, "Este ciclo está cerrado. Solo se permite consulta.")
+            return redirect("bulk_import")
+        if "excel_file" not in request.FILES:
+            messages.error(request, "Selecciona un archivo Excel.")
+            return redirect("bulk_import")
+
+        if "import_goals" in request.POST:
+            result = import_goals(request.FILES["excel_file"], cycle=cycle, created_by=request.user)
+        elif "import_ratings" in request.POST:
+            result = import_ratings(request.FILES["excel_file"], cycle=cycle, assessed_by=request.user)
+        else:
+            return redirect("bulk_import")
+
+        for e in result.errors:
+            messages.error(request, e)
+        if result.errors:
+            messages.warning(request, "No se ha importado ninguna fila. Corrige los errores y vuelve a subir el archivo.")
+        else:
+            for w in result.warnings:
+                messages.warning(request, w)
+            if result.changed:
+                _recompute_company(cycle)
+            messages.success(
+                request,
+                f"Importación completada: {result.created} creadas, {result.updated} actualizadas ({result.employees} empleados).",
+            )
+        return redirect("bulk_import")
+
+    return render(request, "evaluations/bulk_import.html", {"cycle": cycle, "cycle_locked": cycle_locked})
+
+
+@login_required
+def download_goals_template(request):
+    if not is_hr(request.user):
+        return render(request, "evaluations/forbidden.html", status=403)
+
+    cycle, fallback = _cycle_or_admin_redirect(request)
+    if fallback:
+        return fallback
+
+    buffer = build_goals_template(cycle)
+    response = HttpResponse(
+        buffer.getvalue(),
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+    response["Content-Disposition"] = f'attachment; filename="metas_{slugify(cycle.name) or cycle.id}.xlsx"'
+    return response
+
+
+@login_required
+def download_ratings_template(request):
+    if not is_hr(request.user):
+        return render(request, "evaluations/forbidden.html", status=403)
+
+    cycle, fallback = _cycle_or_admin_redirect(request)
+    if fallback:
+        return fallback
+
+    buffer = build_ratings_template(cycle)
+    response = HttpResponse(
+        buffer.getvalue(),
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+    response["Content-Disposition"] = f'attachment; filename="valoraciones_{slugify(cycle.name) or cycle.id}.xlsx"'
+    return response
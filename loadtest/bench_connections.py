@@ -0,0 +1,135 @@
+"""
+Benchmark de reutilización de conexiones: peticiones por segundo con DB_CONN_MAX_AGE=0 frente a
+conexiones persistentes, contra un servidor WSGI de un solo hilo (como un worker síncrono de gunicorn).
+
+    python -m loadtest.bench_connections --clients 4 --duration 15
+
+Cada perfil arranca su propio servidor sobre la BD de carga. Los clientes inician sesión como
+managers sintéticos y repiten una página ligera autenticada (team_overview de su equipo).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+from loadtest.harness import BASE_DIR, DEFAULT_DB, Stats, VirtualUser, percentile, prepare_database, start_server
+
+PROFILES = {"sin reutilización": 0, "con reutilización": 60}
+PAGE = "/evaluations/team/"
+
+
+def serve(addr):
+    """Servidor WSGI de un hilo: las conexiones persistentes se reutilizan entre peticiones."""
+    from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "talentmap.settings")
+    sys.path.insert(0, str(BASE_DIR))
+
+    from django.core.wsgi import get_wsgi_application
+
+    class _QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    host, port = addr.rsplit(":", 1)
+    make_server(host, int(port), get_wsgi_application(), handler_class=_QuietHandler).serve_forever()
+
+
+def run_profile(db_path, managers, *, conn_max_age, clients, duration, seed, server_cmd):
+    os.environ["DB_CONN_MAX_AGE"] = str(conn_max_age)
+    proc, base_url = start_server(db_path, server_cmd)
+    stats = Stats()
+    try:
+        users = []
+        for n in range(clients):
+            vu = VirtualUser(base_url, Stats(), random.Random(seed + n))
+            vu.login(managers[n % len(managers)]["username"])
+            vu.stats = stats
+            users.append(vu)
+
+        deadline = time.perf_counter() + duration
+
+        def loop(vu):
+            while time.perf_counter() < deadline:
+                vu.request("page", PAGE)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=loop, args=(vu,)) for vu in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    samples = sorted(s * 1000 for s in stats.samples["page"])
+    return {
+        "conn_max_age": conn_max_age,
+        "requests": len(samples),
+        "errors": stats.errors["page"],
+        "rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(samples, 50), 1),
+        "p95_ms": round(percentile(samples, 95), 1),
+    }
+
+
+def print_report(reports, out=sys.stdout):
+    out.write(f"{'perfil':<20}{'CONN_MAX_AGE':>13}{'peticiones':>12}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'errores':>9}\n")
+    for name, row in reports.items():
+        out.write(
+            f"{name:<20}{row['conn_max_age']:>13}{row['requests']:>12}{row['rps']:>8}"
+            f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['errors']:>9}\n"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_connections", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="BD SQLite de carga (se crea si no existe).")
+    parser.add_argument("--employees", type=int, default=5000, help="Empleados sintéticos al sembrar.")
+    parser.add_argument("--reseed", action="store_true", help="Borra y vuelve a sembrar la BD de carga.")
+    parser.add_argument("--clients", type=int, default=4, help="Clientes concurrentes.")
+    parser.add_argument("--duration", type=float, default=15, help="Segundos por perfil.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--server-cmd",
+        default="{python} -m loadtest.bench_connections --serve {addr}",
+        help="Comando del servidor; admite {python} y {addr} (p. ej. 'gunicorn talentmap.wsgi -w 4 -b {addr}').",
+    )
+    parser.add_argument("--json", action="store_true", help="Imprime el informe en JSON.")
+    parser.add_argument("--serve", metavar="ADDR", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.serve)
+        return 0
+
+    db_path = args.db.resolve()
+    managers, _ = prepare_database(db_path, employees=args.employees, reseed=args.reseed)
+    reports = {}
+    for name, conn_max_age in PROFILES.items():
+        print(f"Perfil {name}: {args.clients} clientes, {args.duration:g}s ...", file=sys.stderr)
+        reports[name] = run_profile(
+            db_path,
+            managers,
+            conn_max_age=conn_max_age,
+            clients=args.clients,
+            duration=args.duration,
+            seed=args.seed,
+            server_cmd=args.server_cmd,
+        )
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print_report(reports)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Benchmark de los índices de filtros calientes: plan de consulta y latencia con y sin cada índice
+sobre una BD sembrada (50k empleados por defecto).
+
+    python -m loadtest.bench_indexes --employees 50000
+
+Cada índice se elimina dentro de un savepoint para medir la consulta sin él y se restaura con
+el rollback; la BD de benchmark no se modifica.
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from loadtest.harness import BASE_DIR, prepare_database
+
+DEFAULT_DB = BASE_DIR / "loadtest" / "bench.sqlite3"
+INVITATIONS = 50000
+
+
+def _compile(qs):
+    return qs.query.get_compiler(qs.db).as_sql()
+
+
+def _plan(cursor, sql, params):
+    cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    return " | ".join(row[-1] for row in cursor.fetchall())
+
+
+def _latency_ms(cursor, sql, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def _cases():
+    from django.db.models import Count
+    from django.db.models.functions import Lower
+    from django.utils import timezone
+
+    from evaluations.models import QualitativeIndicatorAssessment
+    from evaluations.services.scoring import PASS_RATING
+    from evaluations.views import _nine_box_employees
+    from people.models import Employee, Invitation
+
+    sample = Employee.objects.filter(reports__isnull=False).order_by("-id").first()
+    # Empleado con más valoraciones: el caso caro de _achieved_level_for_competency.
+    busiest = (
+        QualitativeIndicatorAssessment.objects.values("employee_id").annotate(n=Count("id")).order_by("-n").first()
+    )
+    assessment = QualitativeIndicatorAssessment.objects.filter(employee_id=busiest["employee_id"]).first()
+    level_indicators = list(assessment.indicator.level.indicators.values_list("id", flat=True))
+
+    return [
+        (
+            "people_emp_active_dept_idx",
+            "9-box: activos por departamento",
+            _nine_box_employees(sample.department_id, None).values("id"),
+        ),
+        (
+            "people_emp_active_role_idx",
+            "9-box: activos por rol",
+            _nine_box_employees(None, sample.role_id).values("id"),
+        ),
+        (
+            "people_inv_email_lower_idx",
+            "Invitación pendiente por email (case-insensitive)",
+            Invitation.objects.annotate(email_lower=Lower("email")).filter(
+                email_lower="bench.invite.25000@demo.local", used_at__isnull=True, expires_at__gt=timezone.now()
+            ).values("id"),
+        ),
+        (
+            "eval_qual_emp_cyc_ind_rt_idx",
+            "Ratings aprobados de un nivel (_achieved_level_for_competency)",
+            QualitativeIndicatorAssessment.objects.filter(
+                employee_id=assessment.employee_id,
+                cycle_id=assessment.cycle_id,
+                indicator__in=level_indicators,
+                rating__gte=PASS_RATING,
+            ).values("id"),
+        ),
+        (
+            "eval_qual_emp_cyc_ind_rt_idx",
+            "Ratings aprobados de un empleado en el ciclo",
+            QualitativeIndicatorAssessment.objects.filter(
+                employee_id=assessment.employee_id,
+                cycle_id=assessment.cycle_id,
+                rating__gte=PASS_RATING,
+            ).values("indicator_id"),
+        ),
+    ]
+
+
+def _seed_invitations():
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+
+    from people.models import Employee, Invitation
+
+    missing = INVITATIONS - Invitation.objects.count()
+    if missing <= 0:
+        return
+    emp = Employee.objects.select_related("role").first()
+    creator = User.objects.filter(is_superuser=True).first() or emp.user
+    now = timezone.now()
+    Invitation.objects.bulk_create(
+        [
+            Invitation(
+                email=f"Bench.Invite.{n}@demo.local",
+                department_id=emp.department_id,
+                role_id=emp.role_id,
+                created_by=creator,
+                expires_at=now + timedelta(days=7 if n % 3 else -1),
+                used_at=now if n % 5 == 0 else None,
+            )
+            for n in range(missing)
+        ],
+        batch_size=2000,
+    )
+
+
+def run(repeat):
+    from django.db import connection, transaction
+
+    rows = []
+    with transaction.atomic():
+        _seed_invitations()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            for index, label, qs in _cases():
+                sql, params = _compile(qs)
+                # Texto distinto por fase: la caché de sentencias de sqlite3 devolvería el plan anterior al DROP.
+                with_sql, without_sql = f"{sql} /* con */", f"{sql} /* sin */"
+                with_plan = _plan(cursor, with_sql, params)
+                with_ms = _latency_ms(cursor, with_sql, params, repeat)
+                with transaction.atomic():
+                    cursor.execute(f'DROP INDEX "{index}"')
+                    without_plan = _plan(cursor, without_sql, params)
+                    without_ms = _latency_ms(cursor, without_sql, params, repeat)
+                    transaction.set_rollback(True)
+                rows.append((index, label, without_plan, without_ms, with_plan, with_ms))
+        transaction.set_rollback(True)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_indexes", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="BD SQLite del benchmark (se siembra si no existe).")
+    parser.add_argument("--employees", type=int, default=50000, help="Empleados sintéticos al sembrar.")
+    parser.add_argument("--reseed", action="store_true", help="Borra y vuelve a sembrar la BD.")
+    parser.add_argument("--repeat", type=int, default=50, help="Ejecuciones por medición (se informa la mediana).")
+    args = parser.parse_args(argv)
+
+    prepare_database(args.db.resolve(), employees=args.employees, reseed=args.reseed, recompute=False)
+    for index, label, without_plan, without_ms, with_plan, with_ms in run(args.repeat):
+        print(f"\n{index} · {label}")
+        print(f"  sin índice  {without_ms:8.3f} ms  {without_plan}")
+        print(f"  con índice  {with_ms:8.3f} ms  {with_plan}")
+        print(f"  mejora      x{without_ms / with_ms:.1f}" if with_ms else "")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Benchmark de render de las filas de `team_overview` y `edit_qualitative` a 1k, 5k y 10k filas.
+
+    python -m loadtest.bench_render --rows 1000 5000 10000
+
+Compara los parciales actuales (filas con `__slots__` ya resueltas) con las plantillas anteriores
+(objetos de modelo + filtro `get` sobre diccionarios + `{% url %}` por fila). Solo mide el render:
+los datos se generan en memoria y no se toca la BD.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from loadtest.harness import BASE_DIR
+
+# Bucles anteriores de team_overview.html y edit_qualitative.html, tal cual.
+LEGACY_TEAM = """{% load eval_extras %}
+{% for e in employees %}
+  {% with s=scores|get:e.id %}
+  <tr>
+    <td class="fw-semibold">{{ e }}</td>
+    <td>{{ e.role.name }}</td>
+    <td>{{ e.department.name }}</td>
+    <td>
+      {% if s %}
+        <span class="badge text-bg-primary">Qlt {{ s.qualitative_score }}</span>
+        <span class="badge text-bg-secondary">Qnt {{ s.quantitative_score }}</span>
+        <span class="badge text-bg-dark">{{ s.box_label }}</span>
+      {% else %}
+        <span class="tm-filter-chip">Sin score</span>
+      {% endif %}
+    </td>
+    <td class="text-end">
+      <div class="d-inline-flex gap-2">
+        <a class="btn btn-sm btn-outline-secondary" href="{% url 'edit_quantitative' employee_id=e.id %}"><i class="bi bi-bullseye me-1"></i> Metas</a>
+        <a class="btn btn-sm btn-outline-secondary" href="{% url 'competency_picker' employee_id=e.id %}"><i class="bi bi-list-check me-1"></i> Competencias</a>
+      </div>
+    </td>
+  </tr>
+  {% endwith %}
+{% endfor %}
+"""
+
+LEGACY_INDICATORS = """{% load eval_extras %}
+<div class="vstack gap-2">
+  {% for ind in indicators %}
+    {% with current=rating_map|get:ind.id|default:1 %}
+    <div class="d-flex flex-column flex-md-row justify-content-between gap-2 py-2 border-bottom">
+      <div class="me-3">{{ ind.text }}</div>
+      {% if not is_self_eval %}
+        <div class="text-muted small">
+          Auto: {% with self_val=self_rating_map|get:ind.id %}{% if self_val %}{{ self_val|rating_label }}{% else %}Sin autoevaluación{% endif %}{% endwith %}
+        </div>
+      {% endif %}
+      <div class="btn-group btn-group-sm" role="group" aria-label="rating">
+        <input class="btn-check js-rating" type="radio" name="ind_{{ ind.id }}"
+               id="ind_{{ ind.id }}_1" value="1" data-ind="{{ ind.id }}" data-level="{{ lvl }}"
+               {% if current == 1 %}checked{% endif %} {% if cycle_locked %}disabled{% endif %}>
+        <label class="btn btn-outline-danger" for="ind_{{ ind.id }}_1">Nunca</label>
+        <input class="btn-check js-rating" type="radio" name="ind_{{ ind.id }}"
+               id="ind_{{ ind.id }}_2" value="2" data-ind="{{ ind.id }}" data-level="{{ lvl }}"
+               {% if current == 2 %}checked{% endif %} {% if cycle_locked %}disabled{% endif %}>
+        <label class="btn btn-outline-warning" for="ind_{{ ind.id }}_2">Casi nunca</label>
+        <input class="btn-check js-rating" type="radio" name="ind_{{ ind.id }}"
+               id="ind_{{ ind.id }}_3" value="3" data-ind="{{ ind.id }}" data-level="{{ lvl }}"
+               {% if current == 3 %}checked{% endif %} {% if cycle_locked %}disabled{% endif %}>
+        <label class="btn btn-outline-info" for="ind_{{ ind.id }}_3">Casi siempre</label>
+        <input class="btn-check js-rating" type="radio" name="ind_{{ ind.id }}"
+               id="ind_{{ ind.id }}_4" value="4" data-ind="{{ ind.id }}" data-level="{{ lvl }}"
+               {% if current == 4 %}checked{% endif %} {% if cycle_locked %}disabled{% endif %}>
+        <label class="btn btn-outline-success" for="ind_{{ ind.id }}_4">Siempre</label>
+      </div>
+    </div>
+    {% endwith %}
+  {% endfor %}
+</div>
+"""
+
+
+def _setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "talentmap.settings")
+    sys.path.insert(0, str(BASE_DIR))
+    import django
+
+    django.setup()
+
+
+def _team_cases(n):
+    from decimal import Decimal
+
+    from django.contrib.auth.models import User
+
+    from evaluations.models import EmployeeCycleScore
+    from evaluations.services.view_models import TeamRow, id_url
+    from people.models import Department, Employee, Role
+
+    dept = Department(id=1, name="Engineering")
+    role = Role(id=1, name="Backend Engineer", department=dept)
+    employees, scores, rows = [], {}, []
+    goals_url, competencies_url = id_url("edit_quantitative"), id_url("competency_picker")
+    for i in range(1, n + 1):
+        user = User(id=i, username=f"user{i}", first_name="Nombre", last_name=f"Apellido {i}")
+        employees.append(Employee(id=i, user=user, department=dept, role=role))
+        scored = i % 4 != 0
+        if scored:
+            scores[i] = EmployeeCycleScore(
+                employee_id=i, qualitative_score=Decimal("61.50"), quantitative_score=Decimal("72.00"), box_label="Estrellas"
+            )
+        rows.append(
+            TeamRow(
+                employee_id=i, name=f"Nombre Apellido {i}", role=role.name, department=dept.name,
+                has_score=scored,
+                qualitative_score=Decimal("61.50") if scored else None,
+                quantitative_score=Decimal("72.00") if scored else None,
+                box_label="Estrellas" if scored else "",
+                goals_url=goals_url.format(i), competencies_url=competencies_url.format(i),
+            )
+        )
+    return {"employees": employees, "scores": scores}, {"rows": rows}
+
+
+def _indicator_cases(n):
+    from types import SimpleNamespace
+
+    from evaluations.services.view_models import indicator_rows
+
+    indicators = [SimpleNamespace(id=i, text=f"Comportamiento observable número {i}") for i in range(1, n + 1)]
+    rating_map = {i: (i % 4) + 1 for i in range(1, n + 1) if i % 3}
+    self_rating_map = {i: ((i + 1) % 4) + 1 for i in range(1, n + 1) if i % 2}
+    common = {"lvl": 1, "is_self_eval": False, "cycle_locked": False}
+    legacy = {**common, "indicators": indicators, "rating_map": rating_map, "self_rating_map": self_rating_map}
+    current = {**common, "indicators": indicator_rows(indicators, rating_map, self_rating_map)}
+    return legacy, current
+
+
+def _render_ms(template, context, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        template.render(context)
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 1)
+
+
+def measure(sizes, repeat):
+    from django.template import engines
+
+    engine = engines["django"]
+    templates = {
+        "team_overview": (
+            engine.from_string(LEGACY_TEAM),
+            engine.get_template("evaluations/partials/team_rows.html"),
+            _team_cases,
+        ),
+        "edit_qualitative": (
+            engine.from_string(LEGACY_INDICATORS),
+            engine.get_template("evaluations/partials/indicator_rows.html"),
+            _indicator_cases,
+        ),
+    }
+    report = {}
+    for name, (legacy_tpl, rows_tpl, cases) in templates.items():
+        for n in sizes:
+            legacy_ctx, rows_ctx = cases(n)
+            legacy_ms = _render_ms(legacy_tpl, legacy_ctx, repeat)
+            rows_ms = _render_ms(rows_tpl, rows_ctx, repeat)
+            report[f"{name}@{n}"] = {"legacy_ms": legacy_ms, "rows_ms": rows_ms, "speedup": round(legacy_ms / rows_ms, 2)}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_render", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 10000], help="Tamaños a medir.")
+    parser.add_argument("--repeat", type=int, default=5, help="Renders por caso (se informa la mediana).")
+    parser.add_argument("--json", action="store_true", help="Imprime el informe en JSON.")
+    args = parser.parse_args(argv)
+
+    _setup()
+    report = measure(args.rows, args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{'caso':<24}{'antes ms':>10}{'filas ms':>10}{'x':>7}")
+    for name, row in report.items():
+        print(f"{name:<24}{row['legacy_ms']:>10}{row['rows_ms']:>10}{row['speedup']:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
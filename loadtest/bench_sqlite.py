@@ -0,0 +1,238 @@
+"""
+Benchmark de concurrencia SQLite: perfil por defecto de Django frente al perfil de producción
+(WAL, synchronous=NORMAL, busy timeout, BEGIN IMMEDIATE) con lectores y escritores simultáneos.
+
+    python -m loadtest.bench_sqlite --employees 50000 --readers 8 --writers 4 --duration 20
+
+Cada perfil trabaja sobre su propia copia de la BD sembrada. Los lectores consultan el 9-box;
+los escritores guardan valoraciones (como edit_qualitative) y bloques del recálculo de scores
+(como recompute_cycle_scores). Se informa throughput, latencias y errores "database is locked".
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from loadtest.harness import BASE_DIR, percentile, prepare_database
+
+DEFAULT_DB = BASE_DIR / "loadtest" / "bench.sqlite3"
+PROFILES = {"default": False, "tuned": True}
+# Proporción de operaciones de escritura que reescriben un bloque de scores en vez de guardar valoraciones.
+SCORE_CHUNK_SHARE = 0.2
+RATINGS_PER_SAVE = 5
+
+
+def _setup_django(db_path):
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "talentmap.settings")
+    sys.path.insert(0, str(BASE_DIR))
+
+    import django
+
+    django.setup()
+
+
+def _ensure_scores():
+    """Rellena el 9-box con terciles aleatorios si la BD no tiene scores (evita un recálculo de minutos)."""
+    from evaluations.models import EmployeeCycleScore, EvaluationCycle
+    from evaluations.services.scoring import BOXES, write_cycle_scores
+    from people.models import Employee
+
+    cycle = EvaluationCycle.objects.order_by("-start_date").first()
+    if EmployeeCycleScore.objects.filter(cycle=cycle).exists():
+        return
+    rng = random.Random(0)
+    rows = []
+    for emp_id in Employee.objects.filter(active=True).values_list("id", flat=True):
+        qual_t, quant_t = rng.randint(1, 3), rng.randint(1, 3)
+        code, label = BOXES[(qual_t, quant_t)]
+        rows.append(
+            EmployeeCycleScore(
+                employee_id=emp_id,
+                cycle=cycle,
+                qualitative_score=rng.randint(0, 100),
+                quantitative_score=rng.randint(0, 120),
+                qual_tercile=qual_t,
+                quant_tercile=quant_t,
+                box_code=code,
+                box_label=label,
+            )
+        )
+    write_cycle_scores(rows)
+
+
+def _copy_database(source, target, journal_mode):
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{target}{suffix}").unlink(missing_ok=True)
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+        dst.execute(f"PRAGMA journal_mode={journal_mode}")
+    src.close()
+    dst.close()
+
+
+def _reader_op(cycle, departments, rng):
+    from django.db.models import Count
+
+    from evaluations.models import EmployeeCycleScore
+
+    qs = EmployeeCycleScore.objects.filter(cycle=cycle, employee__department_id=rng.choice(departments))
+    list(qs.values("box_code").annotate(n=Count("id")))
+    list(qs.values_list("employee_id", "box_code", "qualitative_score", "quantitative_score")[:200])
+
+
+def _rating_save_op(cycle, assessments, assessed_by_id, rng):
+    from django.db import transaction
+    from django.utils import timezone
+
+    from evaluations.models import QualitativeIndicatorAssessment
+
+    employee_id, _ = rng.choice(assessments)
+    indicator_ids = [ind for emp, ind in rng.sample(assessments, RATINGS_PER_SAVE * 4) if emp == employee_id]
+    indicator_ids = indicator_ids[:RATINGS_PER_SAVE] or [rng.choice(assessments)[1]]
+    with transaction.atomic():
+        for indicator_id in indicator_ids:
+            QualitativeIndicatorAssessment.objects.update_or_create(
+                employee_id=employee_id,
+                cycle=cycle,
+                indicator_id=indicator_id,
+                defaults={"rating": rng.randint(1, 4), "assessed_by_id": assessed_by_id, "assessed_at": timezone.now()},
+            )
+
+
+def _score_chunk_op(cycle, employee_ids, rng):
+    from evaluations.models import EmployeeCycleScore
+    from evaluations.services.scoring import SCORE_WRITE_CHUNK, write_cycle_scores
+
+    start = rng.randrange(0, max(1, len(employee_ids) - SCORE_WRITE_CHUNK))
+    rows = list(EmployeeCycleScore.objects.filter(cycle=cycle, employee_id__in=employee_ids[start:start + SCORE_WRITE_CHUNK]))
+    for row in rows:
+        row.qualitative_score = rng.randint(0, 100)
+    write_cycle_scores(rows)
+
+
+def worker(role, db_path, duration, seed):
+    """Proceso hijo: ejecuta operaciones durante `duration` segundos y devuelve las métricas en JSON."""
+    _setup_django(db_path)
+
+    from django.contrib.auth.models import User
+    from django.db import OperationalError, close_old_connections
+
+    from evaluations.models import EmployeeCycleScore, EvaluationCycle, QualitativeIndicatorAssessment
+    from people.models import Department
+
+    rng = random.Random(seed)
+    cycle = EvaluationCycle.objects.order_by("-start_date").first()
+    departments = list(Department.objects.values_list("id", flat=True))
+    assessments = list(QualitativeIndicatorAssessment.objects.filter(cycle=cycle).values_list("employee_id", "indicator_id")[:20000])
+    employee_ids = list(EmployeeCycleScore.objects.filter(cycle=cycle).order_by("employee_id").values_list("employee_id", flat=True))
+    assessed_by_id = User.objects.order_by("id").values_list("id", flat=True).first()
+
+    latencies, locked, other_errors = [], 0, 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == "reader":
+                _reader_op(cycle, departments, rng)
+            elif rng.random() < SCORE_CHUNK_SHARE:
+                _score_chunk_op(cycle, employee_ids, rng)
+            else:
+                _rating_save_op(cycle, assessments, assessed_by_id, rng)
+        except OperationalError as exc:
+            if "locked" in str(exc):
+                locked += 1
+            else:
+                other_errors += 1
+            close_old_connections()
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {"role": role, "latencies": latencies, "locked": locked, "errors": other_errors}
+
+
+def run_profile(name, db_path, *, readers, writers, duration, seed):
+    env = {**os.environ, "SQLITE_TUNING": "True" if PROFILES[name] else "False", "DATABASE_URL": f"sqlite:///{db_path}"}
+    cmd = [sys.executable, "-m", "loadtest.bench_sqlite", "--worker", "--db", str(db_path), "--duration", str(duration)]
+    procs = [
+        subprocess.Popen([*cmd, "--role", role, "--seed", str(seed + n)], cwd=BASE_DIR, env=env, stdout=subprocess.PIPE, text=True)
+        for n, role in enumerate(["reader"] * readers + ["writer"] * writers)
+    ]
+    results = [json.loads(proc.communicate()[0]) for proc in procs]
+
+    report = {}
+    for role in ("reader", "writer"):
+        mine = [r for r in results if r["role"] == role]
+        latencies = sorted(ms for r in mine for ms in r["latencies"])
+        report[role] = {
+            "ops": len(latencies),
+            "ops_per_s": round(len(latencies) / duration, 1),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "max_ms": round(latencies[-1], 1) if latencies else 0.0,
+            "locked": sum(r["locked"] for r in mine),
+            "errors": sum(r["errors"] for r in mine),
+        }
+    return report
+
+
+def print_report(reports, out=sys.stdout):
+    out.write(f"{'perfil':<9}{'rol':<8}{'ops':>7}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'locked':>8}{'otros':>7}\n")
+    for name, report in reports.items():
+        for role, row in report.items():
+            out.write(
+                f"{name:<9}{role:<8}{row['ops']:>7}{row['ops_per_s']:>9}{row['p50_ms']:>9}"
+                f"{row['p95_ms']:>9}{row['max_ms']:>9}{row['locked']:>8}{row['errors']:>7}\n"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_sqlite", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="BD SQLite sembrada (se siembra si no existe).")
+    parser.add_argument("--employees", type=int, default=50000, help="Empleados sintéticos al sembrar.")
+    parser.add_argument("--reseed", action="store_true", help="Borra y vuelve a sembrar la BD.")
+    parser.add_argument("--readers", type=int, default=8, help="Procesos lectores (9-box).")
+    parser.add_argument("--writers", type=int, default=4, help="Procesos escritores (valoraciones y scores).")
+    parser.add_argument("--duration", type=float, default=20, help="Segundos por perfil.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Imprime el informe en JSON.")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--role", choices=["reader", "writer"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(worker(args.role, args.db, args.duration, args.seed)))
+        return 0
+
+    source = args.db.resolve()
+    prepare_database(source, employees=args.employees, reseed=args.reseed, recompute=False)
+    _ensure_scores()
+
+    from django.db import connections
+
+    connections.close_all()
+
+    reports = {}
+    for name, tuned in PROFILES.items():
+        copy = source.with_name(f"{source.stem}.{name}.sqlite3")
+        _copy_database(source, copy, "WAL" if tuned else "DELETE")
+        print(f"Perfil {name}: {args.readers} lectores, {args.writers} escritores, {args.duration:g}s ...", file=sys.stderr)
+        reports[name] = run_profile(
+            name, copy, readers=args.readers, writers=args.writers, duration=args.duration, seed=args.seed
+        )
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{copy}{suffix}").unlink(missing_ok=True)
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print_report(reports)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Benchmark de arranque: tiempo de `django.setup()` más la carga de las URLs (lo que paga cada
+worker de gunicorn y cada comando de gestión antes de atender nada), en procesos nuevos.
+
+    python -m loadtest.bench_startup --runs 15
+
+Informa la mediana y si openpyxl quedó cargado. `--eager-excel` importa openpyxl antes de
+arrancar, para comparar con el comportamiento anterior a la fachada `talentmap.excel`.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from loadtest.harness import BASE_DIR
+
+# Se ejecuta en un intérprete nuevo; mide desde antes del primer import de Django.
+CHILD = """
+import json, os, sys, time
+started = time.perf_counter()
+if {eager}:
+    import openpyxl
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "talentmap.settings")
+import django
+django.setup()
+setup_done = time.perf_counter()
+from django.urls import get_resolver, resolve
+get_resolver().url_patterns
+resolve("/evaluations/")
+done = time.perf_counter()
+print(json.dumps({{
+    "setup_ms": (setup_done - started) * 1000,
+    "total_ms": (done - started) * 1000,
+    "openpyxl": "openpyxl" in sys.modules,
+    "modules": len(sys.modules),
+}}))
+"""
+
+
+def measure(runs, eager_excel):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD.format(eager=eager_excel)],
+            cwd=BASE_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {
+        "runs": runs,
+        "setup_ms": round(statistics.median(s["setup_ms"] for s in samples), 1),
+        "total_ms": round(statistics.median(s["total_ms"] for s in samples), 1),
+        "openpyxl_loaded": samples[-1]["openpyxl"],
+        "modules": samples[-1]["modules"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_startup", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15, help="Procesos nuevos por perfil (se informa la mediana).")
+    parser.add_argument("--json", action="store_true", help="Imprime el informe en JSON.")
+    args = parser.parse_args(argv)
+
+    reports = {
+        "lazy": measure(args.runs, eager_excel=False),
+        "eager_excel": measure(args.runs, eager_excel=True),
+    }
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return 0
+    print(f"{'perfil':<13}{'setup ms':>10}{'+urls ms':>10}{'módulos':>9}  openpyxl")
+    for name, row in reports.items():
+        print(f"{name:<13}{row['setup_ms']:>10}{row['total_ms']:>10}{row['modules']:>9}  {'sí' if row['openpyxl_loaded'] else 'no'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Benchmark de la etapa de terciles de la cohorte (lo que hace el recálculo tras calcular los scores):
+tercil cuantitativo por ranking, tercil cualitativo (campana y reglas del perfil) y box.
+
+    python -m loadtest.bench_terciles --employees 100000
+
+Compara la implementación anterior (tuplas con instancias de modelo, `statistics`, un dict por
+paso) con `evaluations.services.terciles` en cada backend disponible. Los datos se generan en
+memoria y no se toca la BD; comprueba además que todas las variantes asignan los mismos boxes.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+
+class _Employee:
+    """Lo que la versión anterior ordenaba: una instancia (hashable por identidad) con id."""
+
+    __slots__ = ("id",)
+
+    def __init__(self, pk):
+        self.id = pk
+
+
+def _legacy_stage(method, rows, boxes, top_min_above=1, middle_max_below=3):
+    """Etapa anterior de recompute_cycle_scores, tal cual. rows: [(emp, ql, qt, above, below)]."""
+    qt_sorted = sorted(rows, key=lambda r: (float(r[2]), r[0].id))
+    if method == "GAUSSIAN":
+        values = [float(r[1]) for r in rows]
+        sigma = statistics.pstdev(values)
+        mu = statistics.mean(values)
+        low_cut, high_cut = mu + (-0.4307 * sigma), mu + (0.4307 * sigma)
+        qual_map = {}
+        for emp, ql, *_ in rows:
+            val = float(ql)
+            qual_map[emp] = 1 if val <= low_cut else 3 if val >= high_cut else 2
+    else:
+        qual_map = {}
+        for emp, _, _, above, below in rows:
+            delta = above - below
+            if below == 0 and above >= top_min_above:
+                qual_map[emp] = 3
+            elif below > middle_max_below or delta < 0:
+                qual_map[emp] = 1
+            elif delta == 0 or (delta > 0 and below > 0):
+                qual_map[emp] = 2
+            else:
+                qual_map[emp] = 1
+    third = max(1, len(qt_sorted) // 3)
+    quant_map = {r[0]: 1 if i < third else 2 if i < 2 * third else 3 for i, r in enumerate(qt_sorted)}
+    return [boxes[(qual_map[r[0]], quant_map[r[0]])][0] for r in rows]
+
+
+def _array_stage(terciles, box_table, backend, method, ids, qls, qts, aboves, belows):
+    if method == "GAUSSIAN":
+        qual_ts = terciles.gaussian_terciles(qls, backend=backend)
+    else:
+        qual_ts = terciles.profile_terciles(aboves, belows, 1, 3, backend=backend)
+    quant_ts = terciles.rank_terciles(ids, qts, backend=backend)
+    return [box_table[i][0] for i in terciles.box_indexes(qual_ts, quant_ts, backend=backend)]
+
+
+def _best_ms(fn, runs):
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 1), result
+
+
+def measure(employees, runs, seed=1):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "talentmap.settings")
+    import django
+
+    django.setup()
+    from evaluations.services import terciles
+    from evaluations.services.scoring import BOX_TABLE, BOXES
+
+    rng = random.Random(seed)
+    ids = rng.sample(range(1, 10 * employees), employees)
+    # Scores con 2 decimales, como los DecimalField; el cuantitativo con muchos empates.
+    qls = [Decimal(rng.randint(0, 10000)) / 100 for _ in range(employees)]
+    qts = [Decimal(rng.randint(0, 200)) / 2 for _ in range(employees)]
+    aboves = [rng.randint(0, 4) for _ in range(employees)]
+    belows = [rng.randint(0, 4) for _ in range(employees)]
+    rows = [(_Employee(pk), ql, qt, a, b) for pk, ql, qt, a, b in zip(ids, qls, qts, aboves, belows)]
+
+    backends = [b for b in terciles.BACKENDS if b != "numpy" or terciles.HAS_NUMPY]
+    report = {"employees": employees, "runs": runs, "methods": {}}
+    for method in ("THIRDS", "GAUSSIAN"):
+        legacy_ms, expected = _best_ms(lambda: _legacy_stage(method, rows, BOXES), runs)
+        results = {"legacy": {"ms": legacy_ms, "same_boxes": True}}
+        for backend in backends:
+            ms, codes = _best_ms(
+                lambda: _array_stage(terciles, BOX_TABLE, backend, method, ids, qls, qts, aboves, belows), runs
+            )
+            results[backend] = {"ms": ms, "same_boxes": codes == expected}
+        report["methods"][method] = results
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench_terciles", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--employees", type=int, nargs="+", default=[100000], help="Tamaños de cohorte.")
+    parser.add_argument("--runs", type=int, default=5, help="Repeticiones por variante (se informa la mejor).")
+    parser.add_argument("--json", action="store_true", help="Imprime el informe en JSON.")
+    args = parser.parse_args(argv)
+
+    reports = [measure(n, args.runs) for n in args.employees]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return 0
+    print(f"{'empleados':>10}  {'método':<9}{'variante':<9}{'ms':>9}  mismos boxes")
+    for report in reports:
+        for method, results in report["methods"].items():
+            for variant, row in results.items():
+                same = "sí" if row["same_boxes"] else "NO"
+                print(f"{report['employees']:>10}  {method:<9}{variant:<9}{row['ms']:>9}  {same}")
+    return 0 if all(row["same_boxes"] for r in reports for res in r["methods"].values() for row in res.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+"""
+Harness de carga local: siembra una BD SQLite grande, arranca la app y lanza usuarios
+virtuales concurrentes por los recorridos principales. Solo usa la librería estándar.
+
+    python -m loadtest --employees 20000 --users 16 --duration 60
+    python -m loadtest --json out.json --baseline previous.json
+
+Informa por endpoint: peticiones, errores, p50/p90/p95/p99, máximo y throughput.
+"""
+import argparse
+import http.cookiejar
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from html.parser import HTMLParser
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB = BASE_DIR / "loadtest" / "loadtest.sqlite3"
+
+DEMO_PASSWORD = "demo12345"
+HR_USERNAME = "loadtest_hr"
+# Límite de managers/reportes precargados como objetivos de los usuarios virtuales.
+MAX_MANAGERS = 500
+MAX_REPORTS = 20
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+INDICATOR_RE = re.compile(r'name="(ind_\d+)"')
+
+
+# ---------------------------------------------------------------------------
+# Preparación: BD sembrada y servidor
+# ---------------------------------------------------------------------------
+
+
+def prepare_database(db_path, *, employees, reseed, recompute=True):
+    """Migra y siembra la BD de carga (solo la primera vez o con --reseed) y devuelve los objetivos."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "talentmap.settings")
+    sys.path.insert(0, str(BASE_DIR))
+
+    import django
+
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db import connections
+
+    from competencies.models import RoleCompetencyRequirement
+    from evaluations.models import EvaluationCycle
+    from people.models import Employee
+
+    if reseed and db_path.exists():
+        db_path.unlink()
+    fresh = not db_path.exists()
+
+    call_command("migrate", verbosity=0)
+    if fresh:
+        print(f"Sembrando {employees} empleados en {db_path} ...", flush=True)
+        call_command("seed_demo_data", employees=employees, stdout=sys.stderr)
+        for cycle_id in EvaluationCycle.objects.values_list("id", flat=True) if recompute else []:
+            call_command("recompute_scores", cycle_id, stdout=sys.stderr)
+
+    hr, _ = User.objects.get_or_create(username=HR_USERNAME, defaults={"is_staff": True, "is_superuser": True})
+    hr.set_password(DEMO_PASSWORD)
+    hr.save()
+
+    managers = []
+    qs = (
+        Employee.objects.filter(active=True, reports__isnull=False, user__username__startswith="demo_emp")
+        .select_related("user")
+        .distinct()
+        .order_by("id")[:MAX_MANAGERS]
+    )
+    for manager in qs:
+        reports = list(manager.reports.filter(active=True).values_list("id", "role_id")[:MAX_REPORTS])
+        if reports:
+            managers.append({"username": manager.user.username, "reports": reports})
+
+    competencies = defaultdict(list)
+    for role_id, comp_id in RoleCompetencyRequirement.objects.values_list("role_id", "competency_id"):
+        competencies[role_id].append(comp_id)
+
+    connections.close_all()
+    if not managers:
+        raise SystemExit("La BD no tiene managers sintéticos; usa --reseed con --employees > 0.")
+    return managers, dict(competencies)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_path, server_cmd):
+    port = _free_port()
+    addr = f"127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "DEBUG": "False",
+        "IMPORT_JOBS_BACKEND": "inline",
+    }
+    cmd = server_cmd.format(python=sys.executable, addr=addr).split()
+    # El log de peticiones va a fichero: una tubería sin leer acabaría bloqueando al servidor.
+    log_path = db_path.with_suffix(".server.log")
+    with open(log_path, "wb") as log:
+        proc = subprocess.Popen(cmd, cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    base_url = f"http://{addr}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"El servidor terminó al arrancar; ver {log_path}.")
+        try:
+            urllib.request.urlopen(f"{base_url}/accounts/login/", timeout=2).read()
+            return proc, base_url
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("El servidor no respondió en 30s.")
+
+
+# ---------------------------------------------------------------------------
+# Cliente HTTP y usuarios virtuales
+# ---------------------------------------------------------------------------
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # Cada petición se mide sola; las redirecciones tras POST no se siguen.
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class _FormInputs(HTMLParser):
+    """Valores que el navegador enviaría para el formulario con id dado."""
+
+    def __init__(self, form_id):
+        super().__init__()
+        self.form_id = form_id
+        self.inside = False
+        self.fields = []
+        self._textarea = None
+        self._select = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form":
+            self.inside = attrs.get("id") == self.form_id
+            return
+        name = attrs.get("name")
+        if not self.inside or not name or "__prefix__" in name:
+            return
+        if tag == "input":
+            kind = attrs.get("type", "text")
+            if kind in ("checkbox", "radio") and "checked" not in attrs:
+                return
+            if kind not in ("submit", "button", "file"):
+                self.fields.append([name, attrs.get("value") or ""])
+        elif tag == "textarea":
+            self._textarea = [name, ""]
+            self.fields.append(self._textarea)
+        elif tag == "select":
+            self._select = name
+        elif tag == "option" and self._select and "selected" in attrs:
+            self.fields.append([self._select, attrs.get("value") or ""])
+
+    def handle_data(self, data):
+        if self._textarea is not None:
+            self._textarea[1] += data
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self.inside = False
+        elif tag == "textarea":
+            self._textarea = None
+        elif tag == "select":
+            self._select = None
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name, seconds, ok):
+        with self.lock:
+            self.samples[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+
+class VirtualUser:
+    def __init__(self, base_url, stats, rng, timeout=60):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.stats = stats
+        self.rng = rng
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+
+    def request(self, name, path, data=None):
+        body = urllib.parse.urlencode(data, doseq=True).encode() if data is not None else None
+        started = time.perf_counter()
+        try:
+            with self.opener.open(self.base_url + path, data=body, timeout=self.timeout) as resp:
+                text = resp.read().decode("utf-8", errors="replace")
+                status = resp.status
+        except urllib.error.HTTPError as exc:
+            text, status = exc.read().decode("utf-8", errors="replace"), exc.code
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            text, status = "", 0
+        self.stats.record(name, time.perf_counter() - started, 200 <= status < 400)
+        return text
+
+    def post_form(self, name, path, page, fields):
+        match = CSRF_RE.search(page)
+        fields = [*fields, ("csrfmiddlewaretoken", match.group(1) if match else "")]
+        return self.request(name, path, fields)
+
+    def login(self, username):
+        page = self.request("login GET", "/accounts/login/")
+        self.post_form("login POST", "/accounts/login/", page, [("username", username), ("password", DEMO_PASSWORD)])
+
+
+def manager_journey(vu, manager, competencies):
+    employee_id, role_id = vu.rng.choice(manager["reports"])
+    vu.request("team_overview", "/evaluations/team/")
+    vu.request("competency_picker", f"/evaluations/employee/{employee_id}/competencies/")
+
+    comp_ids = competencies.get(role_id)
+    if comp_ids:
+        path = f"/evaluations/employee/{employee_id}/competency/{vu.rng.choice(comp_ids)}/qualitative/"
+        page = vu.request("edit_qualitative GET", path)
+        ratings = [(name, str(vu.rng.choice((2, 3, 3, 4)))) for name in dict.fromkeys(INDICATOR_RE.findall(page))]
+        vu.post_form("edit_qualitative POST", path, page, ratings)
+
+    path = f"/evaluations/employee/{employee_id}/quantitative/"
+    page = vu.request("edit_quantitative GET", path)
+    parser = _FormInputs("quant-form")
+    parser.feed(page)
+    # Solo se modifica el completado de metas existentes (formularios con id), como haría un manager.
+    existing = {name[: -len("-id")] for name, value in parser.fields if name.endswith("-id") and value}
+    fields = []
+    for name, value in parser.fields:
+        if name == "csrfmiddlewaretoken":
+            continue
+        if name.endswith("-completion_percent") and name.rsplit("-", 1)[0] in existing:
+            value = str(vu.rng.randint(0, 100))
+        fields.append((name, value))
+    vu.post_form("edit_quantitative POST", path, page, fields)
+
+
+def hr_journey(vu):
+    vu.request("team_overview", "/evaluations/team/")
+    vu.request("nine_box_dashboard", "/evaluations/nine-box/")
+
+
+def run_load(base_url, managers, competencies, *, users, hr_users, duration, think, seed, timeout=60):
+    stats = Stats()
+    deadline = time.monotonic() + duration
+
+    def worker(index):
+        vu = VirtualUser(base_url, stats, random.Random(seed + index), timeout)
+        is_hr = index < hr_users
+        manager = managers[index % len(managers)]
+        vu.login(HR_USERNAME if is_hr else manager["username"])
+        while time.monotonic() < deadline:
+            if is_hr:
+                hr_journey(vu)
+            else:
+                manager_journey(vu, manager, competencies)
+            if think:
+                time.sleep(vu.rng.uniform(0, 2 * think))
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.monotonic() - started
+
+
+# ---------------------------------------------------------------------------
+# Informe
+# ---------------------------------------------------------------------------
+
+
+def percentile(sorted_values, p):
+    """Percentil por rango más cercano sobre una lista ordenada."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(stats, elapsed):
+    report = {}
+    for name, values in sorted(stats.samples.items()):
+        values = sorted(values)
+        report[name] = {
+            "requests": len(values),
+            "errors": stats.errors[name],
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p90_ms": round(percentile(values, 90) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1),
+            "rps": round(len(values) / elapsed, 2),
+        }
+    return report
+
+
+def print_report(report, elapsed, out=sys.stdout):
+    header = f"{'endpoint':<24}{'reqs':>7}{'err':>6}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}{'req/s':>9}"
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for name, row in report.items():
+        print(
+            f"{name:<24}{row['requests']:>7}{row['errors']:>6}{row['p50_ms']:>9}{row['p90_ms']:>9}"
+            f"{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}{row['rps']:>9}",
+            file=out,
+        )
+    total = sum(r["requests"] for r in report.values())
+    print(f"\n{total} peticiones en {elapsed:.1f}s ({total / elapsed:.1f} req/s). Latencias en ms.", file=out)
+
+
+def compare_with_baseline(report, baseline, tolerance):
+    """Endpoints cuyo p95 sube o cuyo throughput baja más de `tolerance` respecto al baseline."""
+    regressions = []
+    for name, row in report.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and row["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']} -> {row['p95_ms']} ms")
+        if base["rps"] and row["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['rps']} -> {row['rps']} req/s")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="BD SQLite de carga (se crea si no existe).")
+    parser.add_argument("--employees", type=int, default=5000, help="Empleados sintéticos al sembrar.")
+    parser.add_argument("--reseed", action="store_true", help="Borra y vuelve a sembrar la BD de carga.")
+    parser.add_argument("--users", type=int, default=8, help="Usuarios virtuales concurrentes.")
+    parser.add_argument("--hr-users", type=int, default=1, help="Cuántos de ellos son HR (9-box).")
+    parser.add_argument("--duration", type=float, default=30, help="Segundos de carga.")
+    parser.add_argument("--think", type=float, default=0, help="Pausa media entre recorridos (s).")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla de los usuarios virtuales.")
+    parser.add_argument("--timeout", type=float, default=60, help="Timeout por petición (s); cuenta como error.")
+    parser.add_argument(
+        "--server-cmd",
+        default="{python} manage.py runserver {addr} --noreload",
+        help="Comando del servidor; admite {python} y {addr} (p. ej. 'gunicorn talentmap.wsgi -w 4 -b {addr}').",
+    )
+    parser.add_argument("--json", type=Path, help="Guarda el informe en JSON.")
+    parser.add_argument("--baseline", type=Path, help="Informe JSON previo con el que comparar.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Regresión máxima tolerada frente al baseline.")
+    args = parser.parse_args(argv)
+
+    db_path = args.db.resolve()
+    managers, competencies = prepare_database(db_path, employees=args.employees, reseed=args.reseed)
+    proc, base_url = start_server(db_path, args.server_cmd)
+    try:
+        print(f"Carga: {args.users} usuarios virtuales durante {args.duration:.0f}s contra {base_url}", flush=True)
+        stats, elapsed = run_load(
+            base_url,
+            managers,
+            competencies,
+            users=args.users,
+            hr_users=min(args.hr_users, args.users),
+            duration=args.duration,
+            think=args.think,
+            seed=args.seed,
+            timeout=args.timeout,
+        )
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    report = summarize(stats, elapsed)
+    print_report(report, elapsed)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        regressions = compare_with_baseline(report, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESIÓN {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
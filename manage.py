@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'talentmap.settings')
+    # `manage.py test` usa la configuración de tests (DummyCache) salvo que se indique otra.
+    default_settings = 'talentmap.settings.test' if sys.argv[1:2] == ['test'] else 'talentmap.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', default_settings)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
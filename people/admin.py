@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import BrandingSettings, Department, Employee, Invitation, Role
+from .models import BrandingSettings, Department, Employee, ImportJob, Invitation, Role
 
 
 @admin.register(Department)
@@ -29,6 +29,13 @@ class InvitationAdmin(admin.ModelAdmin):
     search_fields = ("email",)
 
 
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "filename", "processed_rows", "total_rows", "created_count", "created_by", "created_at")
+    list_filter = ("kind", "status")
+    exclude = ("payload",)
+
+
 @admin.register(BrandingSettings)
 class BrandingSettingsAdmin(admin.ModelAdmin):
     list_display = ("id", "company_name", "primary_color", "updated_at")
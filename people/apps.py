@@ -3,3 +3,12 @@ from django.apps import AppConfig
 class PeopleConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "people"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from people.models import Employee
+        from people.services.access import invalidate_org
+
+        post_save.connect(invalidate_org, sender=Employee, dispatch_uid="org_cache_employee_save")
+        post_delete.connect(invalidate_org, sender=Employee, dispatch_uid="org_cache_employee_delete")
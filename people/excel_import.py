@@ -1,8 +1,7 @@
 """Excel import/export for users and employees."""
 import io
-from openpyxl import Workbook
-from openpyxl.styles import Font
-from openpyxl.utils import get_column_letter
+
+from talentmap import excel
 
 from .models import Employee, Department, Role
 
@@ -13,14 +12,14 @@ def build_sample_excel():
     - Sheet 1: Template with headers (first_name, last_name, email, department, role, manager_email)
     - Sheet 2: Current users ordered by department, role
     """
-    wb = Workbook()
+    wb = excel.Workbook()
     ws1 = wb.active
     ws1.title = "Plantilla_Importar"
 
     headers = ["nombre", "apellido", "email", "departamento", "rol", "manager_email", "manager_nombre", "manager_apellido"]
     for col, h in enumerate(headers, 1):
         cell = ws1.cell(row=1, column=col, value=h)
-        cell.font = Font(bold=True)
+        cell.font = excel.Font(bold=True)
     ws1.cell(row=2, column=1, value="Ejemplo")
     ws1.cell(row=2, column=2, value="Apellido")
     ws1.cell(row=2, column=3, value="ejemplo@empresa.com")
@@ -30,13 +29,13 @@ def build_sample_excel():
     ws1.cell(row=2, column=7, value="(opcional: si manager está en este Excel)")
     ws1.cell(row=2, column=8, value="")
     for col in range(1, 9):
-        ws1.column_dimensions[get_column_letter(col)].width = 18
+        ws1.column_dimensions[excel.get_column_letter(col)].width = 18
 
     ws2 = wb.create_sheet("Usuarios_Actuales", 1)
     ws2.append(["nombre", "apellido", "email", "departamento", "rol", "manager"])
     for col in range(1, 7):
         cell = ws2.cell(row=1, column=col)
-        cell.font = Font(bold=True)
+        cell.font = excel.Font(bold=True)
 
     emps = (
         Employee.objects.filter(active=True)
@@ -56,19 +55,19 @@ def build_sample_excel():
             manager_str,
         ])
     for col in range(1, 7):
-        ws2.column_dimensions[get_column_letter(col)].width = 20
+        ws2.column_dimensions[excel.get_column_letter(col)].width = 20
 
     ws3 = wb.create_sheet("Departamentos", 2)
     ws3.append(["departamento"])
-    ws3.cell(row=1, column=1).font = Font(bold=True)
+    ws3.cell(row=1, column=1).font = excel.Font(bold=True)
     for d in Department.objects.all().order_by("name"):
         ws3.append([d.name])
     ws3.column_dimensions["A"].width = 25
 
     ws4 = wb.create_sheet("Roles", 3)
     ws4.append(["departamento", "rol"])
-    ws4.cell(row=1, column=1).font = Font(bold=True)
-    ws4.cell(row=1, column=2).font = Font(bold=True)
+    ws4.cell(row=1, column=1).font = excel.Font(bold=True)
+    ws4.cell(row=1, column=2).font = excel.Font(bold=True)
     for r in Role.objects.select_related("department").order_by("department__name", "name"):
         ws4.append([r.department.name, r.name])
     ws4.column_dimensions["A"].width = 25
@@ -85,9 +84,7 @@ def parse_excel_import(file):
     Parses uploaded Excel and returns list of dicts for import.
     Expected columns: nombre, apellido, email, departamento, rol, manager_email
     """
-    from openpyxl import load_workbook
-
-    wb = load_workbook(file, read_only=True, data_only=True)
+    wb = excel.load_workbook(file, read_only=True, data_only=True)
     ws = wb.active
     rows = list(ws.iter_rows(min_row=1, values_only=True))
     if not rows:
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from people.services.import_jobs import process_pending_import_jobs
+
+
+class Command(BaseCommand):
+    help = "Procesa las importaciones Excel en cola (IMPORT_JOBS_BACKEND=worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Sigue esperando nuevos jobs en lugar de salir.")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Segundos entre sondeos con --loop.")
+
+    def handle(self, *args, **opts):
+        # El worker no recibe request_started/finished: cada sondeo hace de "petición" para
+        # respetar CONN_MAX_AGE (DB_WORKER_CONN_MAX_AGE en talentmap.settings.worker) y CONN_HEALTH_CHECKS.
+        while True:
+            close_old_connections()
+            processed = process_pending_import_jobs()
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f"OK: {processed} importaciones procesadas"))
+            if not opts["loop"]:
+                break
+            close_old_connections()
+            time.sleep(opts["sleep"])
@@ -1,13 +1,20 @@
+import random
+import re
+import time
 from datetime import date
+from decimal import Decimal
 
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.db.utils import OperationalError
 
 from competencies.models import Competency, CompetencyLevel, LevelIndicator, RoleCompetencyRequirement
-from evaluations.models import EvaluationCycle
+from evaluations.models import EvaluationCycle, QualitativeIndicatorAssessment, QuantitativeGoal
 from people.models import Department, Employee, Role
+from people.services.access import invalidate_org
+from people.services.onboarding import _taken_usernames
 
 
 COMPETENCY_DATA = {
@@ -202,12 +209,40 @@ COMPETENCY_DATA = {
 
 LEVEL_MAP = {"Básico": 1, "Avanzado": 2, "Experto": 3}
 
+# Población sintética (--employees): prefijo de usernames, lote de inserción y tamaño de equipo.
+SYNTHETIC_USERNAME_PREFIX = "demo_emp"
+SEED_BATCH_SIZE = 2000
+TEAM_SPAN = 8
+SYNTHETIC_ROLES = ("Head", "Lead", "Specialist")
+FIRST_NAMES = ("María", "José", "Lucía", "Carlos", "Ana", "Javier", "Laura", "David", "Marta", "Pablo", "Elena", "Sergio")
+LAST_NAMES = ("García", "Fernández", "González", "Rodríguez", "López", "Martínez", "Sánchez", "Pérez", "Gómez", "Martín")
+GOAL_SPLITS = ((100,), (60, 40), (50, 30, 20), (40, 30, 30))
+
 
 class Command(BaseCommand):
     help = "Carga datos demo: empleados, jerarquía, ciclos y competencias." 
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--employees", type=int, default=0, help="Genera además N empleados sintéticos (pruebas de carga)."
+        )
+        parser.add_argument("--departments", type=int, default=10, help="Departamentos sintéticos (con --employees).")
+        parser.add_argument("--cycles", type=int, default=1, help="Ciclos con metas y valoraciones (con --employees).")
+        parser.add_argument(
+            "--rating-density",
+            type=float,
+            default=0.2,
+            help="Fracción 0..1 de pares empleado/competencia con valoraciones (con --employees).",
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Semilla aleatoria para datos reproducibles.")
+
     @transaction.atomic
     def handle(self, *args, **options):
+        if options["employees"] < 0 or options["departments"] < 1 or options["cycles"] < 1:
+            raise CommandError("--employees debe ser >= 0 y --departments/--cycles >= 1.")
+        if not 0 <= options["rating_density"] <= 1:
+            raise CommandError("--rating-density debe estar entre 0 y 1.")
+
         self.stdout.write(self.style.WARNING("Cargando datos demo..."))
         try:
             departments = {
@@ -305,5 +340,165 @@ class Command(BaseCommand):
                     defaults={"required_level": 2, "weight": 1},
                 )
 
+        if options["employees"]:
+            started = time.monotonic()
+            self._seed_population(
+                employees=options["employees"],
+                departments=options["departments"],
+                cycles=options["cycles"],
+                density=options["rating_density"],
+                rng=random.Random(options["seed"]),
+            )
+            self.stdout.write(f"Población sintética generada en {time.monotonic() - started:.1f}s.")
+            # bulk_create no dispara post_save: invalida a mano las cachés que dependen de empleados.
+            invalidate_org()
+
         self.stdout.write(self.style.SUCCESS("Datos demo cargados correctamente."))
         self.stdout.write("Usuarios demo password: demo12345")
+
+    def _seed_population(self, *, employees, departments, cycles, density, rng):
+        """
+        Empleados sintéticos con jerarquía realista (árbol de TEAM_SPAN reportes por manager dentro
+        de cada departamento), metas y valoraciones; todo con bulk_create por lotes.
+        """
+        # Departamentos y roles sintéticos (se reutilizan si ya existen).
+        dept_names = [f"Demo {i:02d}" for i in range(1, departments + 1)]
+        Department.objects.bulk_create([Department(name=n) for n in dept_names], ignore_conflicts=True)
+        depts = list(Department.objects.filter(name__in=dept_names).order_by("name"))
+        Role.objects.bulk_create(
+            [Role(name=f"{kind} · {d.name}", department=d) for d in depts for kind in SYNTHETIC_ROLES],
+            ignore_conflicts=True,
+        )
+        roles = {(r.department_id, r.name.split(" · ")[0]): r for r in Role.objects.filter(department__in=depts)}
+        competency_ids = list(Competency.objects.values_list("id", flat=True))
+        RoleCompetencyRequirement.objects.bulk_create(
+            [
+                RoleCompetencyRequirement(role=role, competency_id=cid, required_level=2 if kind == "Specialist" else 3)
+                for (_, kind), role in roles.items()
+                for cid in competency_ids
+            ],
+            ignore_conflicts=True,
+        )
+
+        # Usuarios: numeración a continuación de ejecuciones anteriores; un único hash de contraseña.
+        numbers = [
+            int(m.group(1))
+            for m in map(re.compile(rf"^{SYNTHETIC_USERNAME_PREFIX}(\d+)$").match, _taken_usernames([SYNTHETIC_USERNAME_PREFIX]))
+            if m
+        ]
+        start = max(numbers, default=0) + 1
+        password = make_password("demo12345")
+        users = []
+        for n in range(start, start + employees):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            username = f"{SYNTHETIC_USERNAME_PREFIX}{n:06d}"
+            users.append(
+                User(
+                    username=username,
+                    first_name=first,
+                    last_name=last,
+                    email=f"{username}@demo.local",
+                    password=password,
+                    is_active=True,
+                )
+            )
+        User.objects.bulk_create(users, batch_size=SEED_BATCH_SIZE)
+
+        # Reparto por departamento y árbol por nivel: el manager del índice i es (i - 1) // TEAM_SPAN,
+        # así que insertando nivel a nivel los managers ya tienen pk.
+        teams = [[] for _ in depts]
+        for i, user in enumerate(users):
+            teams[i % len(depts)].append(user)
+
+        # Por user_id: (employee_id, role_id, user_id del manager o propio si no tiene).
+        population = {}
+        depth = 0
+        while True:
+            first = (TEAM_SPAN ** depth - 1) // (TEAM_SPAN - 1)
+            last = first + TEAM_SPAN ** depth
+            batch = []
+            for dept, team in zip(depts, teams):
+                role_id = roles[(dept.id, SYNTHETIC_ROLES[min(depth, 2)])].id
+                for i in range(first, min(last, len(team))):
+                    manager_user_id = team[(i - 1) // TEAM_SPAN].pk if i else None
+                    batch.append(
+                        Employee(
+                            user_id=team[i].pk,
+                            department_id=dept.id,
+                            role_id=role_id,
+                            manager_id=population[manager_user_id][0] if manager_user_id else None,
+                        )
+                    )
+                    population[team[i].pk] = (None, role_id, manager_user_id or team[i].pk)
+            if not batch:
+                break
+            for emp in Employee.objects.bulk_create(batch, batch_size=SEED_BATCH_SIZE):
+                population[emp.user_id] = (emp.pk, *population[emp.user_id][1:])
+            depth += 1
+        population = list(population.values())
+
+        # Catálogo precargado: {competency_id: {nivel: [indicator_id, ...]}}
+        levels = {}
+        for cid, level, ind_id in LevelIndicator.objects.order_by("level__competency_id", "level__level", "id").values_list(
+            "level__competency_id", "level__level", "id"
+        ):
+            per_level = levels.setdefault(cid, {})
+            per_level.setdefault(level, []).append(ind_id)
+        required = {
+            (r.role_id, r.competency_id): r.required_level
+            for r in RoleCompetencyRequirement.objects.filter(role__in=roles.values())
+        }
+
+        this_year = date.today().year
+        for offset in range(cycles - 1, -1, -1):
+            year = this_year - offset
+            cycle, _ = EvaluationCycle.objects.get_or_create(
+                start_date=date(year, 1, 1),
+                end_date=date(year, 12, 31),
+                defaults={"name": f"Ciclo {year}"},
+            )
+
+            goals = []
+            for emp_id, _, assessed_by_id in population:
+                for n, weight in enumerate(rng.choice(GOAL_SPLITS), start=1):
+                    goals.append(
+                        QuantitativeGoal(
+                            employee_id=emp_id,
+                            cycle_id=cycle.id,
+                            title=f"Objetivo {n}",
+                            weight_percent=Decimal(weight),
+                            completion_percent=Decimal(rng.randint(0, 100)),
+                            created_by_id=assessed_by_id,
+                        )
+                    )
+            QuantitativeGoal.objects.bulk_create(goals, batch_size=SEED_BATCH_SIZE)
+
+            # Valoraciones respetando el desbloqueo: un nivel solo se valora si el anterior quedó superado.
+            ratings = []
+            for emp_id, role_id, assessed_by_id in population:
+                for cid, per_level in levels.items():
+                    if rng.random() >= density:
+                        continue
+                    for level in sorted(per_level):
+                        if level > required.get((role_id, cid), 1):
+                            break
+                        values = rng.choices((1, 2, 3, 4), weights=(1, 2, 4, 3), k=len(per_level[level]))
+                        ratings.extend(
+                            QualitativeIndicatorAssessment(
+                                employee_id=emp_id,
+                                cycle_id=cycle.id,
+                                indicator_id=ind_id,
+                                rating=value,
+                                assessed_by_id=assessed_by_id,
+                            )
+                            for ind_id, value in zip(per_level[level], values)
+                        )
+                        if min(values) < 3:
+                            break
+            QualitativeIndicatorAssessment.objects.bulk_create(ratings, batch_size=SEED_BATCH_SIZE)
+
+            self.stdout.write(
+                f"{cycle.name}: {len(goals)} metas, {len(ratings)} valoraciones "
+                f"(ejecuta `manage.py recompute_scores {cycle.id}` para el 9-box)."
+            )
+        self.stdout.write(f"{len(population)} empleados sintéticos en {len(depts)} departamentos.")
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("people", "0006_importjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importjob",
+            name="plan",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="importjob",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PREVIEW", "Previsualización"),
+                    ("PENDING", "En cola"),
+                    ("RUNNING", "Procesando"),
+                    ("DONE", "Completado"),
+                    ("FAILED", "Con errores"),
+                ],
+                default="PENDING",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:38
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("people", "0007_importjob_preview_plan"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["active", "department"], name="people_emp_active_dept_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["active", "role"], name="people_emp_active_role_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invitation",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                models.F("used_at"),
+                models.F("expires_at"),
+                name="people_inv_email_lower_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("people", "0009_importjob_heartbeat"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="importjob",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("USERS", "Usuarios (invitaciones)"),
+                    ("ROLE_PROFILE", "Perfil ideal por rol"),
+                    ("RECOMPUTE_SCORES", "Recálculo de scores"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
@@ -1,8 +1,11 @@
 import uuid
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 
+from talentmap import cache as app_cache
+
 
 class Department(models.Model):
     name = models.CharField(max_length=120, unique=True)
@@ -29,6 +32,13 @@ class Employee(models.Model):
 
     active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            # Filtros del 9-box / equipo: activos por departamento o por rol.
+            models.Index(fields=["active", "department"], name="people_emp_active_dept_idx"),
+            models.Index(fields=["active", "role"], name="people_emp_active_role_idx"),
+        ]
+
     def __str__(self):
         return self.user.get_full_name() or self.user.get_username()
 
@@ -59,6 +69,13 @@ class Invitation(models.Model):
         related_name="accepted_invitations",
     )
 
+    class Meta:
+        indexes = [
+            # Búsqueda de invitaciones pendientes por email sin distinguir mayúsculas
+            # (las consultas filtran por Lower("email"), no por email__iexact).
+            models.Index(Lower("email"), "used_at", "expires_at", name="people_inv_email_lower_idx"),
+        ]
+
     def __str__(self):
         return f"Invitation to {self.email} ({self.role.name})"
 
@@ -82,8 +99,94 @@ class BrandingSettings(models.Model):
 
     @classmethod
     def get_solo(cls):
-        obj, _ = cls.objects.get_or_create(pk=1)
-        return obj
+        return app_cache.get_or_build(
+            app_cache.SETTINGS_NAMESPACE, ["branding"], lambda: cls.objects.get_or_create(pk=1)[0]
+        )
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        app_cache.invalidate(app_cache.SETTINGS_NAMESPACE)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        app_cache.invalidate(app_cache.SETTINGS_NAMESPACE)
+        return result
 
     def __str__(self):
         return f"Branding: {self.company_name}"
+
+
+class ImportJobKind(models.TextChoices):
+    USERS = "USERS", "Usuarios (invitaciones)"
+    ROLE_PROFILE = "ROLE_PROFILE", "Perfil ideal por rol"
+    RECOMPUTE_SCORES = "RECOMPUTE_SCORES", "Recálculo de scores"
+
+
+class ImportJobStatus(models.TextChoices):
+    PREVIEW = "PREVIEW", "Previsualización"
+    PENDING = "PENDING", "En cola"
+    RUNNING = "RUNNING", "Procesando"
+    DONE = "DONE", "Completado"
+    FAILED = "FAILED", "Con errores"
+
+
+class ImportJob(models.Model):
+    """
+    Importación Excel procesada fuera de la petición HTTP.
+    Guarda el fichero subido y el progreso por bloques para poder consultarlo por polling.
+    """
+    kind = models.CharField(max_length=20, choices=ImportJobKind.choices)
+    status = models.CharField(max_length=10, choices=ImportJobStatus.choices, default=ImportJobStatus.PENDING)
+
+    filename = models.CharField(max_length=255, blank=True, default="")
+    payload = models.BinaryField(blank=True, default=b"")
+    # Diff calculado en la previsualización; si existe, se aplica sin volver a leer el fichero.
+    plan = models.JSONField(null=True, blank=True)
+
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    warnings = models.JSONField(default=list, blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.PROTECT, related_name="import_jobs"
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Último progreso guardado; sin latido durante IMPORT_JOB_STALE_MINUTES el job se da por perdido.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"ImportJob #{self.pk} {self.kind} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in {ImportJobStatus.DONE, ImportJobStatus.FAILED}
+
+    @property
+    def percent(self):
+        if self.is_finished:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, int(self.processed_rows * 100 / self.total_rows))
+
+    def as_dict(self):
+        return {
+            "id": self.pk,
+            "kind": self.kind,
+            "status": self.status,
+            "status_label": self.get_status_display(),
+            "finished": self.is_finished,
+            "percent": self.percent,
+            "total_rows": self.total_rows,
+            "processed_rows": self.processed_rows,
+            "created_count": self.created_count,
+            "errors": self.errors,
+            "warnings": self.warnings,
+        }
@@ -1,4 +1,5 @@
 from people.models import Employee
+from talentmap import cache as app_cache
 
 def is_hr(user) -> bool:
     return user.is_superuser or user.groups.filter(name="HR_ADMIN").exists()
@@ -12,3 +13,16 @@ def managed_employees_qs(user):
         return Employee.objects.none()
     # versión simple: solo reportes directos
     return Employee.objects.filter(manager=me)
+
+def direct_report_ids(user) -> frozenset:
+    """Ids de los reportes directos del usuario (organigrama cacheado por manager)."""
+    return app_cache.get_or_build(
+        app_cache.ORG_NAMESPACE,
+        ["reports", user.pk],
+        lambda: frozenset(Employee.objects.filter(manager__user=user).values_list("id", flat=True)),
+    )
+
+def invalidate_org(**kwargs):
+    # El organigrama y los filtros del 9-box (activo, departamento, rol) dependen de Employee.
+    app_cache.invalidate(app_cache.ORG_NAMESPACE)
+    app_cache.invalidate(app_cache.NINE_BOX_NAMESPACE)
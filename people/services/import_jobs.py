@@ -0,0 +1,309 @@
+import io
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from people.excel_import import parse_excel_import
+from people.models import ImportJob, ImportJobKind, ImportJobStatus
+from people.services.onboarding import UsersImportPlan, apply_users_import_plan, plan_users_import
+
+logger = logging.getLogger(__name__)
+
+# Filas aplicadas entre cada actualización de progreso.
+IMPORT_CHUNK_SIZE = 200
+
+BACKEND_THREAD = "thread"
+BACKEND_WORKER = "worker"
+BACKEND_INLINE = "inline"
+
+# Tiempo que una previsualización puede confirmarse antes de exigir subir el fichero otra vez.
+IMPORT_PREVIEW_TTL = timedelta(minutes=30)
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def enqueue_import_job(*, kind, upload, created_by) -> ImportJob:
+    """
+    Guarda el fichero subido como ImportJob y lo despacha según settings.IMPORT_JOBS_BACKEND:
+    - "thread": hilo en segundo plano tras el commit (por defecto).
+    - "worker": solo encola; lo procesa `manage.py process_import_jobs`.
+    - "inline": procesa dentro de la petición (tests / depuración).
+    """
+    job = ImportJob.objects.create(
+        kind=kind,
+        filename=getattr(upload, "name", "")[:255],
+        payload=upload.read(),
+        created_by=created_by,
+    )
+    return _dispatch(job)
+
+
+def enqueue_recompute_job(*, cycle_id, created_by) -> ImportJob:
+    """
+    Encola el recálculo de scores de un ciclo (p. ej. tras cambiar el catálogo) con el mismo
+    backend que las importaciones. Si ya hay uno en cola para ese ciclo se reutiliza: el
+    recálculo lee los datos al ejecutarse.
+    """
+    job = ImportJob.objects.filter(
+        kind=ImportJobKind.RECOMPUTE_SCORES, status=ImportJobStatus.PENDING, plan__cycle_id=cycle_id
+    ).first()
+    if job is not None:
+        return job
+    job = ImportJob.objects.create(
+        kind=ImportJobKind.RECOMPUTE_SCORES,
+        plan={"cycle_id": cycle_id},
+        created_by=created_by,
+    )
+    return _dispatch(job)
+
+
+def create_import_preview(*, kind, upload, plan, created_by) -> ImportJob:
+    """Guarda el diff de un dry-run; confirm_import_preview lo aplica sin volver a parsear."""
+    return ImportJob.objects.create(
+        kind=kind,
+        status=ImportJobStatus.PREVIEW,
+        filename=getattr(upload, "name", "")[:255],
+        plan=plan,
+        created_by=created_by,
+    )
+
+
+def get_import_preview(job_id, *, kind=None, user=None):
+    """Previsualización vigente (no confirmada ni caducada) o None."""
+    qs = ImportJob.objects.filter(
+        id=job_id,
+        status=ImportJobStatus.PREVIEW,
+        created_at__gt=timezone.now() - IMPORT_PREVIEW_TTL,
+    )
+    if kind:
+        qs = qs.filter(kind=kind)
+    if user is not None:
+        qs = qs.filter(created_by=user)
+    return qs.first()
+
+
+def confirm_import_preview(job) -> ImportJob:
+    """Pasa una previsualización a la cola. Solo la primera confirmación tiene efecto."""
+    confirmed = ImportJob.objects.filter(pk=job.pk, status=ImportJobStatus.PREVIEW).update(
+        status=ImportJobStatus.PENDING,
+        created_at=timezone.now(),
+    )
+    job.refresh_from_db()
+    if confirmed:
+        _dispatch(job)
+        job.refresh_from_db()
+    return job
+
+
+def _dispatch(job):
+    backend = getattr(settings, "IMPORT_JOBS_BACKEND", BACKEND_THREAD)
+    if backend == BACKEND_INLINE:
+        run_import_job(job.pk)
+        job.refresh_from_db()
+    elif backend == BACKEND_THREAD:
+        transaction.on_commit(lambda: _start_thread(job.pk))
+    return job
+
+
+def _start_thread(job_id):
+    threading.Thread(target=_run_in_thread, args=(job_id,), daemon=True, name=f"import-job-{job_id}").start()
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_import_job(job_id)
+    finally:
+        connections.close_all()
+
+
+def _claim(job_id) -> bool:
+    # Evita que hilo y worker procesen el mismo job.
+    now = timezone.now()
+    return bool(
+        ImportJob.objects.filter(pk=job_id, status=ImportJobStatus.PENDING).update(
+            status=ImportJobStatus.RUNNING,
+            started_at=now,
+            heartbeat_at=now,
+        )
+    )
+
+
+def _save_progress(job):
+    job.heartbeat_at = timezone.now()
+    job.save(update_fields=["total_rows", "processed_rows", "created_count", "errors", "warnings", "heartbeat_at"])
+
+
+def fail_stale_import_jobs(job_ids=None) -> int:
+    """
+    Marca como fallidos los jobs en RUNNING sin progreso desde hace IMPORT_JOB_STALE_MINUTES:
+    el proceso que los ejecutaba se recicló o murió a mitad (los hilos del backend "thread" no
+    sobreviven al worker). No se reencolan: los bloques ya aplicados quedan hechos y repetir el
+    fichero duplicaría filas. Devuelve cuántos se marcaron.
+    """
+    cutoff = timezone.now() - timedelta(minutes=settings.IMPORT_JOB_STALE_MINUTES)
+    stale = ImportJob.objects.filter(status=ImportJobStatus.RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    if job_ids is not None:
+        stale = stale.filter(pk__in=job_ids)
+
+    failed = 0
+    for job in stale.only("id", "errors", "processed_rows", "total_rows"):
+        errors = list(job.errors) + [
+            f"La importación se interrumpió tras {job.processed_rows} de {job.total_rows} filas. "
+            "Revisa lo ya importado antes de volver a subir el archivo."
+        ]
+        # Condicional: si el job dio señales de vida entretanto, no se toca.
+        failed += ImportJob.objects.filter(pk=job.pk, status=ImportJobStatus.RUNNING).filter(
+            Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True)
+        ).update(status=ImportJobStatus.FAILED, finished_at=timezone.now(), payload=b"", errors=errors)
+    if failed:
+        logger.warning("Marked %s stale import job(s) as failed", failed)
+    return failed
+
+
+def _finish(job, status):
+    job.status = status
+    job.finished_at = timezone.now()
+    job.payload = b""
+    job.save()
+
+
+def run_import_job(job_id):
+    """Procesa un job pendiente por bloques. No hace nada si otro proceso ya lo reclamó."""
+    if not _claim(job_id):
+        return None
+
+    job = ImportJob.objects.select_related("created_by").get(pk=job_id)
+    try:
+        if job.kind == ImportJobKind.USERS:
+            _process_users(job)
+        elif job.kind == ImportJobKind.ROLE_PROFILE:
+            _process_role_profile(job)
+        elif job.kind == ImportJobKind.RECOMPUTE_SCORES:
+            _process_recompute(job)
+        else:
+            job.errors = [f"Tipo de importación desconocido: {job.kind}."]
+    except Exception as exc:
+        logger.exception("Import job %s failed", job_id)
+        job.errors = list(job.errors) + [f"Error inesperado: {exc}"]
+        _finish(job, ImportJobStatus.FAILED)
+        return job
+
+    _finish(job, ImportJobStatus.FAILED if job.errors and not job.created_count else ImportJobStatus.DONE)
+    return job
+
+
+def _process_users(job):
+    if job.plan is not None:
+        plan = UsersImportPlan.from_dict(job.plan)
+    else:
+        rows, parse_errors = parse_excel_import(io.BytesIO(bytes(job.payload)))
+        if parse_errors:
+            # Mismo criterio que la importación síncrona: con errores de validación no se aplica nada.
+            job.errors = parse_errors
+            return
+        plan = plan_users_import(rows)
+
+    job.total_rows = len(plan.create)
+    job.warnings = plan.warnings
+    _save_progress(job)
+
+    for chunk in _chunks(plan.create, IMPORT_CHUNK_SIZE):
+        result = apply_users_import_plan(create_rows=chunk, created_by=job.created_by)
+        job.created_count += result.created_count
+        job.warnings = list(job.warnings) + result.warnings
+        job.processed_rows += len(chunk)
+        _save_progress(job)
+
+
+def _process_role_profile(job):
+    from competencies.excel_profiles import apply_role_profile_changes, parse_role_profile_template, plan_role_profile_cells
+
+    if job.plan is not None:
+        plan = job.plan
+        job.errors = list(plan.get("errors", []))
+    else:
+        cells, errors = parse_role_profile_template(io.BytesIO(bytes(job.payload)))
+        plan = plan_role_profile_cells(cells)
+        job.errors = errors
+
+    changes = plan["changes"]
+    job.total_rows = len(changes)
+    _save_progress(job)
+
+    for chunk in _chunks(changes, IMPORT_CHUNK_SIZE):
+        with transaction.atomic():
+            job.created_count += apply_role_profile_changes(chunk)
+        job.processed_rows += len(chunk)
+        _save_progress(job)
+
+
+def _process_recompute(job):
+    from evaluations.models import EvaluationCycle
+    from evaluations.services.scoring import recompute_cycle_scores
+    from people.models import Employee
+
+    cycle = EvaluationCycle.objects.filter(pk=job.plan["cycle_id"]).first()
+    if cycle is None:
+        job.errors = ["El ciclo ya no existe."]
+        return
+
+    employees = Employee.objects.filter(active=True).select_related("role", "department", "user")
+    job.total_rows = employees.count()
+    _save_progress(job)
+
+    def progress(done):
+        # El latido evita que un recálculo largo se dé por perdido (fail_stale_import_jobs).
+        job.processed_rows = done
+        _save_progress(job)
+
+    if recompute_cycle_scores(cycle, employees, progress=progress) is False:
+        job.warnings = [f"{cycle.name} está congelado: sus scores no se recalculan."]
+    job.processed_rows = job.total_rows
+    _save_progress(job)
+
+
+def requested_import_preview(request, kind):
+    """Previsualización indicada en ?preview=<id> para el usuario actual, o None."""
+    try:
+        job_id = int(request.GET.get("preview") or 0)
+    except (TypeError, ValueError):
+        return None
+    if not job_id:
+        return None
+    return get_import_preview(job_id, kind=kind, user=request.user)
+
+
+def requested_import_job(request, kind):
+    """ImportJob indicado en ?job=<id> (panel de progreso tras subir un fichero) o None."""
+    try:
+        job_id = int(request.GET.get("job") or 0)
+    except (TypeError, ValueError):
+        return None
+    if not job_id:
+        return None
+    return ImportJob.objects.filter(id=job_id, kind=kind).first()
+
+
+def process_pending_import_jobs(limit=None):
+    """Procesa los jobs en cola por orden de llegada. Devuelve cuántos se procesaron."""
+    fail_stale_import_jobs()
+    ids = ImportJob.objects.filter(status=ImportJobStatus.PENDING).order_by("created_at", "id").values_list("id", flat=True)
+    if limit:
+        ids = ids[:limit]
+
+    processed = 0
+    for job_id in list(ids):
+        if run_import_job(job_id) is not None:
+            processed += 1
+    return processed
@@ -1,9 +1,14 @@
 from dataclasses import dataclass, field
 
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.utils import timezone
 
-from people.models import Employee, Invitation
+from people.models import Department, Employee, Invitation, Role
+from people.services.access import invalidate_org
 from people.services.invitations import create_invitation, send_invitation_email
 
 
@@ -13,84 +18,214 @@ class ImportUsersResult:
     warnings: list[str] = field(default_factory=list)
 
 
-def create_internal_employee(*, first_name, last_name, department, role, manager=None):
-    """Create an internal employee profile without login credentials."""
-    base = f"{first_name}_{last_name}".replace(" ", "_").lower()[:30]
+@dataclass
+class UsersImportPlan:
+    """
+    Diff de una importación de usuarios calculado en memoria (sin escrituras).
+    Las filas son dicts serializables (ids + nombres) para poder guardarse y aplicarse luego.
+    """
+    create: list[dict] = field(default_factory=list)
+    duplicates: list[dict] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+    def as_dict(self):
+        return {"create": self.create, "duplicates": self.duplicates, "warnings": self.warnings}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            create=list(data.get("create", [])),
+            duplicates=list(data.get("duplicates", [])),
+            warnings=list(data.get("warnings", [])),
+        )
+
+
+# Prefijos por consulta al buscar usernames ocupados (límite de parámetros de SQLite).
+USERNAME_PREFIX_BATCH = 200
+
+
+def _username_base(first_name, last_name):
+    return f"{first_name}_{last_name}".replace(" ", "_").lower()[:30]
+
+
+def _taken_usernames(bases) -> set[str]:
+    """Usernames que empiezan por alguno de los prefijos (una consulta por bloque de prefijos)."""
+    bases = sorted(set(bases))
+    taken = set()
+    for start in range(0, len(bases), USERNAME_PREFIX_BATCH):
+        query = Q()
+        for base in bases[start:start + USERNAME_PREFIX_BATCH]:
+            query |= Q(username__startswith=base)
+        taken.update(User.objects.filter(query).values_list("username", flat=True))
+    return taken
+
+
+def _next_free_username(base, taken):
+    """Primer `base`, `base_1`, `base_2`... libre; lo marca como ocupado en `taken`."""
     username = base
     suffix = 0
-
-    while User.objects.filter(username=username).exists():
+    while username in taken:
         suffix += 1
         username = f"{base}_{suffix}"[:150]
+    taken.add(username)
+    return username
+
 
-    user = User.objects.create(
+def _internal_user(username, first_name, last_name):
+    return User(
         username=username,
         email="",
         first_name=first_name,
         last_name=last_name,
         is_active=True,
+        password=make_password(None),
     )
-    user.set_unusable_password()
+
+
+def create_internal_employee(*, first_name, last_name, department, role, manager=None):
+    """Create an internal employee profile without login credentials."""
+    base = _username_base(first_name, last_name)
+    username = _next_free_username(base, _taken_usernames([base]))
+
+    user = _internal_user(username, first_name, last_name)
     user.save()
 
     return Employee.objects.create(user=user, department=department, role=role, manager=manager)
 
 
+def bulk_create_internal_employees(rows, *, batch_size=500) -> list[Employee]:
+    """
+    Variante masiva de create_internal_employee.
+    rows: dicts con first_name, last_name, department, role y manager (opcional).
+    Usernames resueltos en memoria tras una consulta por prefijos; usuarios y empleados
+    se insertan con bulk_create por lotes en una transacción.
+    """
+    rows = list(rows)
+    taken = _taken_usernames(_username_base(r["first_name"], r["last_name"]) for r in rows)
+    users = [
+        _internal_user(
+            _next_free_username(_username_base(r["first_name"], r["last_name"]), taken),
+            r["first_name"],
+            r["last_name"],
+        )
+        for r in rows
+    ]
+
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+        employees = Employee.objects.bulk_create(
+            [
+                Employee(user=user, department=r["department"], role=r["role"], manager=r.get("manager"))
+                for user, r in zip(users, rows)
+            ],
+            batch_size=batch_size,
+        )
+        invalidate_org()
+    return employees
+
+
 def has_pending_or_existing_user(email: str) -> bool:
-    return User.objects.filter(email__iexact=email).exists() or Invitation.objects.filter(
-        email__iexact=email,
-        used_at__isnull=True,
-        expires_at__gt=timezone.now(),
-    ).exists()
+    return bool(_taken_emails([email]))
+
+
+def _taken_emails(emails) -> set[str]:
+    """Emails (en minúsculas) que ya tienen usuario o invitación pendiente. Dos consultas en total."""
+    emails = {e.lower() for e in emails if e}
+    if not emails:
+        return set()
+    taken = set(
+        User.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=emails)
+        .values_list("email_lower", flat=True)
+    )
+    taken.update(
+        Invitation.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=emails, used_at__isnull=True, expires_at__gt=timezone.now())
+        .values_list("email_lower", flat=True)
+    )
+    return taken
 
 
-def import_users_as_invitations(*, rows, created_by) -> ImportUsersResult:
-    """Create invitation rows imported from Excel preserving current flow semantics."""
-    result = ImportUsersResult()
-    batch_managers_by_email = {}
-
-    def resolve_manager(row):
-        if row.get("manager"):
-            return row["manager"]
-
-        manager_email_pending = (row.get("manager_email_pending") or "").strip().lower()
-        if manager_email_pending:
-            return batch_managers_by_email.get(manager_email_pending)
-
-        first_name = row.get("manager_nombre", "").strip()
-        last_name = row.get("manager_apellido", "").strip()
-        if first_name and last_name:
-            matches = [
-                manager
-                for manager in batch_managers_by_email.values()
-                if manager.user.first_name == first_name and manager.user.last_name == last_name
-            ]
-            if len(matches) == 1:
-                return matches[0]
-        return None
+def plan_users_import(rows) -> UsersImportPlan:
+    """
+    Dry-run de la importación: clasifica filas de parse_excel_import en nuevas invitaciones
+    y duplicados, y resuelve managers, contra el estado actual precargado.
+    """
+    plan = UsersImportPlan()
+    taken = _taken_emails(row["email"] for row in rows)
 
     for row in rows:
         email = row["email"]
-        manager = resolve_manager(row) or row.get("manager")
-
-        if has_pending_or_existing_user(email):
-            result.warnings.append(f"Fila {row['row']}: {email} ya existe o tiene invitación pendiente.")
+        manager = row.get("manager")
+        item = {
+            "row": row["row"],
+            "email": email,
+            "first_name": row.get("first_name", ""),
+            "last_name": row.get("last_name", ""),
+            "department_id": row["department"].id,
+            "department": row["department"].name,
+            "role_id": row["role"].id,
+            "role": row["role"].name,
+            "manager_id": manager.id if manager else None,
+            "manager": str(manager) if manager else "",
+            "manager_email_pending": row.get("manager_email_pending") or "",
+        }
+
+        if email.lower() in taken:
+            plan.duplicates.append(item)
+            plan.warnings.append(f"Fila {row['row']}: {email} ya existe o tiene invitación pendiente.")
             continue
 
-        if row.get("manager_email_pending") and not manager:
-            result.warnings.append(
-                f"Fila {row['row']}: el manager '{row['manager_email_pending']}' también viene en el Excel y todavía no existe como empleado activo."
+        if item["manager_email_pending"] and not manager:
+            plan.warnings.append(
+                f"Fila {row['row']}: el manager '{item['manager_email_pending']}' también viene en el Excel y todavía no existe como empleado activo."
                 " Se envía la invitación sin manager; podrás asignarlo luego en el perfil del colaborador."
             )
+        plan.create.append(item)
+
+    return plan
+
+
+def apply_users_import_plan(*, create_rows, created_by) -> ImportUsersResult:
+    """Crea las invitaciones de un plan ya calculado, sin volver a leer el Excel."""
+    result = ImportUsersResult()
+    if not create_rows:
+        return result
+
+    departments = Department.objects.in_bulk({r["department_id"] for r in create_rows})
+    roles = Role.objects.in_bulk({r["role_id"] for r in create_rows})
+    managers = Employee.objects.in_bulk({r["manager_id"] for r in create_rows if r["manager_id"]})
+    # El plan puede haberse calculado minutos antes: revalidamos duplicados en bloque.
+    taken = _taken_emails(r["email"] for r in create_rows)
+
+    for item in create_rows:
+        email = item["email"]
+        if email.lower() in taken:
+            result.warnings.append(f"Fila {item['row']}: {email} ya existe o tiene invitación pendiente.")
+            continue
 
         invitation = create_invitation(
             email=email,
-            department=row["department"],
-            role=row["role"],
-            manager=manager,
+            department=departments[item["department_id"]],
+            role=roles[item["role_id"]],
+            manager=managers.get(item["manager_id"]),
             created_by=created_by,
         )
         send_invitation_email(invitation=invitation)
+        taken.add(email.lower())
         result.created_count += 1
 
     return result
+
+
+def import_users_as_invitations(*, rows, created_by, dry_run=False):
+    """
+    Create invitation rows imported from Excel preserving current flow semantics.
+    With dry_run=True nothing is written and the UsersImportPlan is returned instead.
+    """
+    plan = plan_users_import(rows)
+    if dry_run:
+        return plan
+    result = apply_users_import_plan(create_rows=plan.create, created_by=created_by)
+    result.warnings = plan.warnings + result.warnings
+    return result
@@ -1,16 +1,20 @@
 import io
 from datetime import timedelta
+from unittest.mock import patch
 
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from openpyxl import Workbook
 
 from people.excel_import import parse_excel_import
 from people.forms import InviteForm
-from people.models import BrandingSettings, Department, Invitation, Role, Employee
+from people.models import BrandingSettings, Department, ImportJob, ImportJobStatus, Invitation, Role, Employee
+from people.services.onboarding import _next_free_username, _taken_usernames, bulk_create_internal_employees
 
 
 def build_excel(rows):
@@ -25,6 +29,7 @@ def build_excel(rows):
     return buffer
 
 
+@override_settings(IMPORT_JOBS_BACKEND="inline")
 class InviteAndExcelImportTests(TestCase):
     def setUp(self):
         self.dept = Department.objects.create(name="IT")
@@ -131,7 +136,216 @@ class InviteAndExcelImportTests(TestCase):
         emp = Employee.objects.get(user__first_name="Interno")
         self.assertFalse(emp.user.has_usable_password())
 
+    def test_internal_username_uses_first_free_suffix_with_one_query(self):
+        for username in ["maria_garcia", "maria_garcia_1", "maria_garcia_3"]:
+            User.objects.create(username=username)
+
+        with self.assertNumQueries(1):
+            taken = _taken_usernames(["maria_garcia"])
+        self.assertEqual(_next_free_username("maria_garcia", taken), "maria_garcia_2")
+        self.assertEqual(_next_free_username("maria_garcia", taken), "maria_garcia_4")
+
+    def test_bulk_create_internal_employees(self):
+        User.objects.create(username="maria_garcia")
+        rows = [
+            {"first_name": "Maria", "last_name": "Garcia", "department": self.dept, "role": self.role}
+            for _ in range(3)
+        ]
+
+        employees = bulk_create_internal_employees(rows)
+
+        self.assertEqual(
+            sorted(e.user.username for e in employees), ["maria_garcia_1", "maria_garcia_2", "maria_garcia_3"]
+        )
+        emp = Employee.objects.select_related("user").get(user__username="maria_garcia_2")
+        self.assertFalse(emp.user.has_usable_password())
+
     def test_branding_settings_singleton_helper(self):
         s1 = BrandingSettings.get_solo()
         s2 = BrandingSettings.get_solo()
         self.assertEqual(s1.id, s2.id)
+
+
+class ImportJobTests(TestCase):
+    def setUp(self):
+        self.dept = Department.objects.create(name="IT")
+        self.role = Role.objects.create(name="Developer", department=self.dept)
+        self.hr = User.objects.create_superuser("hr", "hr@example.com", "pass")
+
+    def _upload(self, rows):
+        return SimpleUploadedFile(
+            "users.xlsx",
+            build_excel(rows).read(),
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+    @override_settings(IMPORT_JOBS_BACKEND="worker")
+    def test_worker_backend_queues_job_and_command_processes_it(self):
+        self.client.force_login(self.hr)
+        response = self.client.post(
+            reverse("import_users_excel"),
+            {"excel_file": self._upload([["Ana", "Pérez", "ana@example.com", "IT", "Developer", ""]])},
+        )
+
+        job = ImportJob.objects.get()
+        self.assertRedirects(response, f"{reverse('invite_user')}?job={job.id}")
+        self.assertEqual(job.status, ImportJobStatus.PENDING)
+        self.assertEqual(Invitation.objects.count(), 0)
+
+        call_command("process_import_jobs", stdout=io.StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJobStatus.DONE)
+        self.assertEqual((job.processed_rows, job.total_rows, job.created_count), (1, 1, 1))
+        self.assertEqual(job.payload, b"")
+        self.assertTrue(Invitation.objects.filter(email="ana@example.com").exists())
+
+    def test_worker_command_recycles_connections_on_every_poll(self):
+        with patch("people.management.commands.process_import_jobs.close_old_connections") as close:
+            call_command("process_import_jobs", stdout=io.StringIO())
+
+        close.assert_called_once_with()
+
+    @override_settings(IMPORT_JOBS_BACKEND="inline")
+    def test_status_endpoint_reports_progress_and_row_errors(self):
+        self.client.force_login(self.hr)
+        self.client.post(
+            reverse("import_users_excel"),
+            {"excel_file": self._upload([["Ana", "Pérez", "ana@example.com", "IT", "Nope", ""]])},
+        )
+        job = ImportJob.objects.get()
+
+        data = self.client.get(reverse("api_import_job_status", args=[job.id])).json()["job"]
+
+        self.assertEqual(data["status"], ImportJobStatus.FAILED)
+        self.assertTrue(data["finished"])
+        self.assertEqual(data["percent"], 100)
+        self.assertIn("Fila 2", data["errors"][0])
+        self.assertEqual(Invitation.objects.count(), 0)
+
+        page = self.client.get(f"{reverse('invite_user')}?job={job.id}")
+        self.assertContains(page, 'id="import-job-panel"')
+
+    @override_settings(IMPORT_JOB_STALE_MINUTES=15)
+    def test_running_job_without_progress_is_failed_as_stale(self):
+        now = timezone.now()
+        stale = ImportJob.objects.create(
+            kind="USERS", status=ImportJobStatus.RUNNING, created_by=self.hr,
+            started_at=now - timedelta(hours=1), heartbeat_at=now - timedelta(minutes=20),
+            total_rows=400, processed_rows=200,
+        )
+        alive = ImportJob.objects.create(
+            kind="USERS", status=ImportJobStatus.RUNNING, created_by=self.hr,
+            started_at=now - timedelta(hours=1), heartbeat_at=now - timedelta(minutes=1),
+        )
+
+        self.client.force_login(self.hr)
+        data = self.client.get(reverse("api_import_job_status", args=[stale.id])).json()["job"]
+        self.assertEqual(data["status"], ImportJobStatus.FAILED)
+        self.assertIn("200 de 400", data["errors"][-1])
+
+        call_command("process_import_jobs", stdout=io.StringIO())
+        alive.refresh_from_db()
+        self.assertEqual(alive.status, ImportJobStatus.RUNNING)
+
+    def test_status_endpoint_is_hr_only(self):
+        job = ImportJob.objects.create(kind="USERS", created_by=self.hr)
+        User.objects.create_user("plain", password="pass")
+        self.client.login(username="plain", password="pass")
+        response = self.client.get(reverse("api_import_job_status", args=[job.id]))
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(IMPORT_JOBS_BACKEND="inline")
+class ImportPreviewTests(TestCase):
+    def setUp(self):
+        self.dept = Department.objects.create(name="IT")
+        self.role = Role.objects.create(name="Developer", department=self.dept)
+        self.hr = User.objects.create_superuser("hr", "hr@example.com", "pass")
+        Invitation.objects.create(
+            email="pending@example.com",
+            department=self.dept,
+            role=self.role,
+            created_by=self.hr,
+            expires_at=timezone.now() + timedelta(days=7),
+        )
+
+    def _preview(self):
+        excel = build_excel([
+            ["Ana", "Pérez", "ana@example.com", "IT", "Developer", ""],
+            ["Pen", "Ding", "Pending@example.com", "IT", "Developer", ""],
+            ["Dev", "Junior", "dev@example.com", "IT", "Developer", "ana@example.com"],
+        ])
+        return self.client.post(
+            reverse("import_users_excel"),
+            {
+                "dry_run": "1",
+                "excel_file": SimpleUploadedFile("users.xlsx", excel.read(), content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+            },
+        )
+
+    def test_dry_run_shows_diff_without_writing(self):
+        self.client.force_login(self.hr)
+        response = self._preview()
+
+        preview = ImportJob.objects.get(status=ImportJobStatus.PREVIEW)
+        self.assertRedirects(response, f"{reverse('invite_user')}?preview={preview.id}")
+        self.assertEqual(Invitation.objects.count(), 1)
+        self.assertEqual([r["email"] for r in preview.plan["create"]], ["ana@example.com", "dev@example.com"])
+        self.assertEqual([r["email"] for r in preview.plan["duplicates"]], ["pending@example.com"])
+        self.assertEqual(preview.plan["create"][1]["manager_email_pending"], "ana@example.com")
+
+        page = self.client.get(response.url)
+        self.assertContains(page, "2 invitaciones nuevas")
+        self.assertContains(page, "Duplicado")
+
+    def test_confirm_applies_stored_plan_once(self):
+        self.client.force_login(self.hr)
+        self._preview()
+        preview = ImportJob.objects.get(status=ImportJobStatus.PREVIEW)
+
+        with patch("people.services.import_jobs.parse_excel_import", side_effect=AssertionError("re-parsed")):
+            response = self.client.post(reverse("confirm_import", args=[preview.id]))
+
+        preview.refresh_from_db()
+        self.assertRedirects(response, f"{reverse('invite_user')}?job={preview.id}", fetch_redirect_response=False)
+        self.assertEqual(preview.status, ImportJobStatus.DONE)
+        self.assertEqual(preview.created_count, 2)
+        self.assertTrue(Invitation.objects.filter(email="dev@example.com").exists())
+
+        # Una segunda confirmación no vuelve a aplicar el plan.
+        self.client.post(reverse("confirm_import", args=[preview.id]))
+        self.assertEqual(Invitation.objects.count(), 3)
+
+    def test_expired_confirm_only_redirects_to_local_next(self):
+        self.client.force_login(self.hr)
+        url = reverse("confirm_import", args=[999])
+
+        response = self.client.post(url, {"next": "https://evil.example.com/"})
+        self.assertRedirects(response, reverse("invite_user"), fetch_redirect_response=False)
+
+        response = self.client.post(url, {"next": reverse("role_profile_config")})
+        self.assertRedirects(response, reverse("role_profile_config"), fetch_redirect_response=False)
+
+
+class SeedDemoDataTests(TestCase):
+    def test_synthetic_population_with_hierarchy_goals_and_ratings(self):
+        from evaluations.models import EvaluationCycle, QualitativeIndicatorAssessment, QuantitativeGoal
+
+        call_command(
+            "seed_demo_data", employees=30, departments=3, cycles=2, rating_density=1, stdout=io.StringIO()
+        )
+
+        synthetic = Employee.objects.filter(user__username__startswith="demo_emp")
+        self.assertEqual(synthetic.count(), 30)
+        # Una raíz por departamento; el resto reporta a alguien de su mismo departamento.
+        self.assertEqual(synthetic.filter(manager__isnull=True).count(), 3)
+        self.assertFalse(synthetic.filter(manager__isnull=False).exclude(manager__department=F("department")).exists())
+        self.assertEqual(EvaluationCycle.objects.count(), 2)
+        for cycle in EvaluationCycle.objects.all():
+            self.assertEqual(QuantitativeGoal.objects.filter(cycle=cycle).values("employee").distinct().count(), 30)
+        self.assertTrue(QualitativeIndicatorAssessment.objects.filter(employee__in=synthetic).exists())
+
+        # Una segunda ejecución continúa la numeración en lugar de chocar con los usernames existentes.
+        call_command("seed_demo_data", employees=5, departments=3, stdout=io.StringIO())
+        self.assertEqual(Employee.objects.filter(user__username__startswith="demo_emp").count(), 35)
@@ -3,8 +3,9 @@ from django.contrib.auth import logout, login
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
 
-from .models import Invitation, Employee, Department, Role
+from .models import Invitation, Employee, Department, Role, ImportJob, ImportJobKind, ImportJobStatus
 from .forms import InviteForm, RegisterForm, DepartmentForm, RoleForm
 from .services.access import is_hr
 from .services.invitations import (
@@ -12,15 +13,25 @@ from .services.invitations import (
     resend_invitation_email,
     send_invitation_email,
 )
+from .services.import_jobs import (
+    confirm_import_preview,
+    create_import_preview,
+    enqueue_import_job,
+    fail_stale_import_jobs,
+    get_import_preview,
+    requested_import_job,
+    requested_import_preview,
+)
 from .services.onboarding import (
     create_internal_employee,
     has_pending_or_existing_user,
-    import_users_as_invitations,
+    plan_users_import,
 )
 from .excel_import import build_sample_excel, parse_excel_import
 from django.views.decorators.http import require_POST
 from django.conf import settings
 from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
 from django.contrib.auth.models import User
 
 
@@ -86,24 +97,65 @@ def download_sample_excel(request):
 
 @login_required
 def import_users_excel(request):
-    """Import users from Excel upload."""
+    """Queue an Excel user import; progress is polled from the invite page."""
     if not is_hr(request.user):
         return render(request, "evaluations/forbidden.html", status=403)
     if request.method != "POST" or "excel_file" not in request.FILES:
         messages.error(request, "Selecciona un archivo Excel.")
         return redirect("invite_user")
 
-    rows, parse_errors = parse_excel_import(request.FILES["excel_file"])
-    if parse_errors:
-        for e in parse_errors:
-            messages.error(request, e)
-        return redirect("invite_user")
+    upload = request.FILES["excel_file"]
+    if request.POST.get("dry_run"):
+        rows, parse_errors = parse_excel_import(upload)
+        if parse_errors:
+            for e in parse_errors:
+                messages.error(request, e)
+            return redirect("invite_user")
+        plan = plan_users_import(rows)
+        preview = create_import_preview(
+            kind=ImportJobKind.USERS, upload=upload, plan=plan.as_dict(), created_by=request.user
+        )
+        return redirect(f"{reverse('invite_user')}?preview={preview.id}")
 
-    result = import_users_as_invitations(rows=rows, created_by=request.user)
-    for warning in result.warnings:
-        messages.warning(request, warning)
-    messages.success(request, f"Importados {result.created_count} usuarios.")
-    return redirect("invite_user")
+    job = enqueue_import_job(kind=ImportJobKind.USERS, upload=upload, created_by=request.user)
+    return redirect(f"{reverse('invite_user')}?job={job.id}")
+
+
+IMPORT_RESULT_PAGES = {
+    ImportJobKind.USERS: "invite_user",
+    ImportJobKind.ROLE_PROFILE: "role_profile_config",
+}
+
+
+@require_POST
+@login_required
+def confirm_import(request, job_id):
+    """Apply a previewed import plan (no re-parsing of the uploaded file)."""
+    if not is_hr(request.user):
+        return render(request, "evaluations/forbidden.html", status=403)
+    preview = get_import_preview(job_id, user=request.user)
+    if not preview:
+        messages.error(request, "La previsualización ha caducado o ya fue confirmada. Vuelve a subir el archivo.")
+        next_url = request.POST.get("next")
+        if not url_has_allowed_host_and_scheme(
+            next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure()
+        ):
+            next_url = "invite_user"
+        return redirect(next_url)
+
+    job = confirm_import_preview(preview)
+    return redirect(f"{reverse(IMPORT_RESULT_PAGES[job.kind])}?job={job.id}")
+
+
+@login_required
+def api_import_job_status(request, job_id):
+    """JSON: progress of an ImportJob (polled by the progress bar)."""
+    if not is_hr(request.user):
+        return JsonResponse({"ok": False, "error": "Forbidden"}, status=403)
+    job = get_object_or_404(ImportJob, id=job_id)
+    if job.status == ImportJobStatus.RUNNING and fail_stale_import_jobs([job.id]):
+        job.refresh_from_db()
+    return JsonResponse({"ok": True, "job": job.as_dict()})
 
 
 @login_required
@@ -166,6 +218,8 @@ def invite_user(request):
     return render(request, "people/invite.html", {
     "form": form,
     "pending_invites": pending_invites,
+    "import_job": requested_import_job(request, ImportJobKind.USERS),
+    "import_preview": requested_import_preview(request, ImportJobKind.USERS),
     "SITE_URL": getattr(settings, "SITE_URL", "http://127.0.0.1:8000"),
     })
 
@@ -0,0 +1,104 @@
+"""
+Caché de la aplicación sobre django.core.cache (backend según CACHE_URL: locmem, fichero o Redis).
+
+- Claves con espacio de nombres y versión: ``tm:<namespace>:v<version>:<partes>``.
+  Invalidar un namespace incrementa su versión; las entradas anteriores dejan de leerse y caducan solas.
+- Protección ante estampidas: cuando falta una entrada, solo quien consigue el lock (``cache.add``)
+  la reconstruye; el resto espera a que aparezca y, si se agota la espera, la calcula por su cuenta.
+"""
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+KEY_PREFIX = "tm"
+CACHE_ALIAS = "default"
+DEFAULT_TIMEOUT = 300
+
+# Duración máxima del lock de reconstrucción y espera de los demás procesos (segundos).
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 5.0
+LOCK_POLL = 0.05
+
+# Namespaces compartidos entre apps.
+SETTINGS_NAMESPACE = "settings"
+CATALOG_NAMESPACE = "catalog"
+ORG_NAMESPACE = "org"
+NINE_BOX_NAMESPACE = "nine_box"
+RATINGS_NAMESPACE = "ratings"
+SCORES_NAMESPACE = "scores"
+MOVEMENT_NAMESPACE = "movement"
+SNAPSHOTS_NAMESPACE = "snapshots"
+
+_MISSING = object()
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(namespace):
+    return f"{KEY_PREFIX}:{namespace}:version"
+
+
+def namespace_version(namespace) -> int:
+    cache = _cache()
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        # Arranca en un valor basado en el reloj: si la clave de versión se expulsa de la caché,
+        # no vuelve a una versión antigua cuyas entradas podrían seguir guardadas.
+        cache.add(_version_key(namespace), time.time_ns() // 1000, timeout=None)
+        version = cache.get(_version_key(namespace), 0)
+    return version
+
+
+def make_key(namespace, *parts) -> str:
+    suffix = ":".join(str(p) for p in parts)
+    return f"{KEY_PREFIX}:{namespace}:v{namespace_version(namespace)}:{suffix}"
+
+
+def _bump(namespace):
+    cache = _cache()
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.add(_version_key(namespace), time.time_ns() // 1000, timeout=None)
+
+
+def invalidate(namespace):
+    """
+    Invalida el namespace ya y otra vez tras el commit: lo que otro proceso reconstruya con
+    datos aún sin confirmar queda descartado cuando la transacción termina.
+    """
+    _bump(namespace)
+    transaction.on_commit(lambda: _bump(namespace))
+
+
+def get_or_build(namespace, parts, builder, timeout=DEFAULT_TIMEOUT, cache_none=True):
+    """
+    Devuelve la entrada ``namespace``/``parts`` o la construye con ``builder()`` (con lock anti-estampida).
+    Con cache_none=False un resultado None no se guarda: se vuelve a construir en la siguiente llamada.
+    """
+    cache = _cache()
+    key = make_key(namespace, *parts)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, timeout=LOCK_TIMEOUT):
+        try:
+            value = builder()
+            if value is not None or cache_none:
+                cache.set(key, value, timeout=timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+    return builder()
@@ -0,0 +1,34 @@
+"""
+Fachada perezosa de openpyxl: importarla no carga openpyxl; se carga al usar el primer atributo.
+
+    from talentmap import excel
+
+    wb = excel.Workbook(write_only=True)
+    cell.font = excel.Font(bold=True)
+
+Las vistas y servicios Excel solo se usan en endpoints de HR; así ni los workers web ni los
+comandos de gestión pagan el import de openpyxl al arrancar (ver loadtest/bench_startup.py).
+No uses `from talentmap.excel import Workbook`: resolvería el atributo (y openpyxl) al importar.
+"""
+import importlib
+
+_EXPORTS = {
+    "Workbook": "openpyxl",
+    "load_workbook": "openpyxl",
+    "WriteOnlyCell": "openpyxl.cell",
+    "Alignment": "openpyxl.styles",
+    "Font": "openpyxl.styles",
+    "PatternFill": "openpyxl.styles",
+    "get_column_letter": "openpyxl.utils",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
@@ -2,6 +2,7 @@ from pathlib import Path
 from importlib.util import find_spec
 
 import environ
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 
@@ -70,6 +71,53 @@ DATABASES = {
     )
 }
 
+# Reutilización de conexiones (segundos): 0 = una conexión por petición.
+# Con health checks, una conexión reutilizada se comprueba antes de la primera consulta de cada petición.
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("DB_CONN_MAX_AGE", default=0)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = env.bool("DB_CONN_HEALTH_CHECKS", default=True)
+
+# Perfil SQLite para producción pequeña: WAL (lectores no bloquean al escritor),
+# espera de lock en vez de fallar con "database is locked" y BEGIN IMMEDIATE en los
+# bloques atomic para que el lock de escritura se pida al empezar y no a mitad.
+# transaction_mode e init_command necesitan Django 5.1 (requirements.txt).
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3" and env.bool("SQLITE_TUNING", default=True):
+    DATABASES["default"].setdefault("OPTIONS", {}).update(
+        {
+            "timeout": env.int("SQLITE_BUSY_TIMEOUT", default=20),
+            "transaction_mode": "IMMEDIATE",
+            "init_command": ";".join(
+                [
+                    "PRAGMA journal_mode=WAL",
+                    "PRAGMA synchronous=NORMAL",
+                    f"PRAGMA mmap_size={env.int('SQLITE_MMAP_SIZE', default=128 * 1024 * 1024)}",
+                    f"PRAGMA cache_size=-{env.int('SQLITE_CACHE_SIZE_KB', default=20000)}",
+                    "PRAGMA temp_store=MEMORY",
+                ]
+            ),
+        }
+    )
+
+# locmemcache:// (desarrollo, por proceso; prod lo rechaza), filecache:///ruta (un solo host) o
+# redis://host:6379/0 (cualquier servidor compatible con Redis; varios workers/hosts).
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+if CACHES["default"]["BACKEND"].endswith("RedisCache") and find_spec("redis") is None:
+    raise ImproperlyConfigured("CACHE_URL=redis://... requires the 'redis' package (pip install redis).")
+# Caché compartida por todos los workers: prod la exige y sin ella no se cachean fragmentos de
+# plantilla (sus claves llevan versiones que cada proceso solo invalidaría en su copia).
+CACHE_IS_SHARED = not CACHES["default"]["BACKEND"].endswith(("LocMemCache", "DummyCache"))
+
+# Sesiones: db (por defecto) | cached_db (lecturas desde la caché; necesita una caché
+# compartida entre procesos) | signed_cookies (sin BD; la sesión viaja firmada en la cookie).
+SESSION_BACKENDS = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_BACKEND = env("SESSION_BACKEND", default="db")
+if SESSION_BACKEND not in SESSION_BACKENDS:
+    raise ImproperlyConfigured(f"SESSION_BACKEND must be one of: {', '.join(SESSION_BACKENDS)}.")
+SESSION_ENGINE = SESSION_BACKENDS[SESSION_BACKEND]
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -85,8 +133,12 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [BASE_DIR / "static"]
-if HAS_WHITENOISE:
-    STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Django >= 5.1 ignora STATICFILES_STORAGE: el backend va en STORAGES. Con el manifest (prod), los
+# ficheros llevan hash en el nombre y whitenoise los sirve con caché inmutable y variantes .gz/.br.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -101,6 +153,11 @@ SERVER_EMAIL = env("SERVER_EMAIL", default=DEFAULT_FROM_EMAIL)
 
 SITE_URL = env("SITE_URL", default="http://127.0.0.1:8000")
 
+# Importaciones Excel: "thread" (hilo en segundo plano), "worker" (manage.py process_import_jobs) o "inline".
+IMPORT_JOBS_BACKEND = env("IMPORT_JOBS_BACKEND", default="thread")
+# Minutos sin progreso tras los que un job en curso se da por perdido (proceso reciclado o muerto).
+IMPORT_JOB_STALE_MINUTES = env.int("IMPORT_JOB_STALE_MINUTES", default=15)
+
 LOGIN_URL = "/accounts/login/"
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/accounts/login/"
@@ -7,6 +7,14 @@ if SECRET_KEY == "django-insecure-dev-only-change-me":
     raise ImproperlyConfigured("Set a strong SECRET_KEY for production.")
 if not ALLOWED_HOSTS:
     raise ImproperlyConfigured("Set ALLOWED_HOSTS for production.")
+if not CACHE_IS_SHARED:
+    # Con una caché por proceso cada worker invalidaría solo la suya: permisos, configuración,
+    # catálogo y sesiones cached_db quedarían obsoletos en los demás.
+    raise ImproperlyConfigured("Production needs a shared CACHE_URL (redis://, memcache://, filecache://).")
+
+if HAS_WHITENOISE:
+    # Manifest con hash + .gz (y .br con el paquete Brotli) generados en collectstatic.
+    STORAGES["staticfiles"]["BACKEND"] = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 SESSION_COOKIE_SECURE = True
@@ -19,4 +27,6 @@ SECURE_HSTS_SECONDS = env.int("SECURE_HSTS_SECONDS", default=3600)
 SECURE_HSTS_INCLUDE_SUBDOMAINS = True
 SECURE_HSTS_PRELOAD = True
 
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("DB_CONN_MAX_AGE", default=60)
+
 CSRF_TRUSTED_ORIGINS = env.list("CSRF_TRUSTED_ORIGINS", default=[])
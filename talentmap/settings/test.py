@@ -0,0 +1,6 @@
+from .dev import *  # noqa
+
+# Los tests revierten la BD entre casos pero no la caché: DummyCache salvo override explícito
+# (tests/test_app_cache.py usa una caché local compartida).
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+CACHE_IS_SHARED = False
@@ -0,0 +1,5 @@
+from .prod import *  # noqa
+
+# Procesos de larga duración (process_import_jobs --loop): cada sondeo hace de "petición",
+# así que la conexión se reutiliza entre sondeos hasta DB_WORKER_CONN_MAX_AGE segundos.
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("DB_WORKER_CONN_MAX_AGE", default=600)
@@ -2,12 +2,13 @@ from django.contrib import admin
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
 from evaluations.views import home
-from competencies.views import role_profile_config, download_role_profile_template
+from competencies.views import role_profile_config, download_role_profile_template, export_competency_catalog
 from people.views import (
     logout_confirm, invite_user, register_with_token, config,
     resend_invitation, cancel_invitation,
     download_sample_excel, import_users_excel,
     api_roles_by_department, delete_employee, api_add_role,
+    api_import_job_status, confirm_import,
 )
 
 
@@ -18,9 +19,11 @@ urlpatterns = [
     path("accounts/invite/", invite_user, name="invite_user"),
     path("accounts/invite/sample-excel/", download_sample_excel, name="download_sample_excel"),
     path("accounts/invite/import-excel/", import_users_excel, name="import_users_excel"),
+    path("imports/<int:job_id>/confirm/", confirm_import, name="confirm_import"),
     path("config/", config, name="config"),
     path("config/role-profile/", role_profile_config, name="role_profile_config"),
     path("config/role-profile/template/", download_role_profile_template, name="download_role_profile_template"),
+    path("config/catalog/export/", export_competency_catalog, name="export_competency_catalog"),
     path("accounts/register/", register_with_token, name="register"),
     path("", home, name="home"),
     path("evaluations/", include("evaluations.urls")),
@@ -29,4 +32,5 @@ urlpatterns = [
     path("api/roles/<int:department_id>/", api_roles_by_department, name="api_roles_by_department"),
     path("accounts/employee/<int:employee_id>/delete/", delete_employee, name="delete_employee"),
     path("api/add-role/", api_add_role, name="api_add_role"),
+    path("api/import-jobs/<int:job_id>/", api_import_job_status, name="api_import_job_status"),
 ]
@@ -0,0 +1,268 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import caches
+
+from talentmap import cache as app_cache
+
+# invalidate() registra on_commit: todos los tests necesitan la BD.
+pytestmark = pytest.mark.django_db
+
+SHARED_STORE = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "app-cache-tests"}
+
+
+@pytest.fixture
+def locmem(settings):
+    # "default" y "worker2" comparten almacén: hacen de servidor Redis local visto desde dos workers.
+    settings.CACHES = {"default": SHARED_STORE, "worker2": SHARED_STORE}
+    settings.CACHE_IS_SHARED = True
+    caches["default"].clear()
+    yield caches["default"]
+    caches["default"].clear()
+
+
+def test_get_or_build_caches_until_namespace_is_invalidated(locmem):
+    calls = []
+
+    def build():
+        calls.append(1)
+        return len(calls)
+
+    assert app_cache.get_or_build("ns", ["a", 1], build) == 1
+    assert app_cache.get_or_build("ns", ["a", 1], build) == 1
+    assert app_cache.get_or_build("other", ["a", 1], build) == 2
+
+    app_cache.invalidate("ns")
+
+    assert app_cache.get_or_build("ns", ["a", 1], build) == 3
+    assert app_cache.get_or_build("other", ["a", 1], build) == 2
+
+
+def test_missing_snapshot_is_not_cached(locmem, cycle):
+    from evaluations.models import CycleSnapshot
+    from evaluations.services.snapshots import SNAPSHOT_FORMAT, _encode, load_snapshot
+
+    assert load_snapshot(cycle) is None
+    # Snapshot escrito sin invalidar (p. ej. por otro worker con otra caché): se ve igual.
+    CycleSnapshot.objects.create(cycle=cycle, format_version=SNAPSHOT_FORMAT, data=_encode([]), employee_count=0)
+    assert load_snapshot(cycle) is not None
+
+
+def test_invalidation_is_seen_by_other_workers_sharing_the_server(locmem, monkeypatch):
+    assert app_cache.get_or_build("ns", ["k"], lambda: "old") == "old"
+
+    monkeypatch.setattr(app_cache, "CACHE_ALIAS", "worker2")
+    assert app_cache.get_or_build("ns", ["k"], lambda: "unused") == "old"
+    app_cache.invalidate("ns")
+    monkeypatch.setattr(app_cache, "CACHE_ALIAS", "default")
+
+    assert app_cache.get_or_build("ns", ["k"], lambda: "new") == "new"
+
+
+def test_concurrent_misses_build_the_entry_once(locmem):
+    calls = []
+    results = []
+
+    def slow_build():
+        calls.append(1)
+        time.sleep(0.3)
+        return "value"
+
+    threads = [
+        threading.Thread(target=lambda: results.append(app_cache.get_or_build("ns", ["hot"], slow_build)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["value"] * 8
+
+
+def test_evicted_version_key_does_not_revive_old_entries(locmem):
+    assert app_cache.get_or_build("ns", ["k"], lambda: "old") == "old"
+    app_cache.invalidate("ns")
+    locmem.delete(f"{app_cache.KEY_PREFIX}:ns:version")
+
+    assert app_cache.get_or_build("ns", ["k"], lambda: "new") == "new"
+
+
+def test_settings_singleton_is_cached_and_refreshed_on_save(locmem, django_assert_num_queries):
+    from evaluations.models import QualitativeAxisMethod, TalentMapSettings
+
+    TalentMapSettings.objects.create(pk=1)
+    TalentMapSettings.get_solo()
+    with django_assert_num_queries(0):
+        cfg = TalentMapSettings.get_solo()
+
+    cfg.qualitative_axis_method = QualitativeAxisMethod.GAUSSIAN
+    cfg.save()
+
+    assert TalentMapSettings.get_solo().qualitative_axis_method == QualitativeAxisMethod.GAUSSIAN
+
+
+def test_catalog_is_refreshed_on_edits_and_bulk_imports(locmem, competency_setup):
+    from competencies.catalog import competency_levels
+    from competencies.models import Competency, LevelIndicator
+    from competencies.signals import catalog_changed
+
+    comp = competency_setup["competency"]
+    assert [len(lvl.indicators.all()) for lvl in competency_levels(comp.id)] == [2, 1]
+    assert [lvl.level for lvl in competency_levels(comp.id, max_level=1)] == [1]
+
+    LevelIndicator.objects.create(level=competency_setup["l2"], text="Mentoring")
+    assert [len(lvl.indicators.all()) for lvl in competency_levels(comp.id)] == [2, 2]
+
+    # bulk_create no dispara post_save: las importaciones avisan con catalog_changed.
+    LevelIndicator.objects.bulk_create([LevelIndicator(level=competency_setup["l2"], text="Coaching")])
+    assert [len(lvl.indicators.all()) for lvl in competency_levels(comp.id)] == [2, 2]
+    catalog_changed.send(sender=Competency)
+    assert [len(lvl.indicators.all()) for lvl in competency_levels(comp.id)] == [2, 3]
+
+
+def test_org_tree_follows_employee_changes(locmem, manager_user, report_employee, other_employee):
+    from people.services.access import direct_report_ids
+
+    assert direct_report_ids(manager_user) == {report_employee.id}
+
+    other_employee.manager = report_employee.manager
+    other_employee.save()
+
+    assert direct_report_ids(manager_user) == {report_employee.id, other_employee.id}
+
+
+def test_nine_box_counts_refresh_after_score_writes(locmem, cycle, report_employee, other_employee):
+    from evaluations.models import EmployeeCycleScore
+    from evaluations.services.scoring import nine_box_counts, write_cycle_scores
+
+    assert nine_box_counts(cycle) == {}
+
+    write_cycle_scores(
+        [
+            EmployeeCycleScore(employee=report_employee, cycle=cycle, box_code="STAR", box_label="Estrellas"),
+            EmployeeCycleScore(employee=other_employee, cycle=cycle, box_code="RISK", box_label="En riesgo"),
+        ]
+    )
+
+    assert nine_box_counts(cycle) == {"STAR": 1, "RISK": 1}
+    assert nine_box_counts(cycle, dept_id=report_employee.department_id, role_id=report_employee.role_id) == {
+        "STAR": 1,
+        "RISK": 1,
+    }
+
+
+def test_rating_save_only_invalidates_that_employees_fragments(locmem, cycle, report_employee, other_employee, competency_setup, manager_user):
+    from evaluations.models import QualitativeIndicatorAssessment
+    from evaluations.services.fragments import invalidate_ratings, ratings_version
+
+    report_v = ratings_version(cycle.pk, report_employee.pk)
+    other_v = ratings_version(cycle.pk, other_employee.pk)
+
+    QualitativeIndicatorAssessment.objects.create(
+        employee=report_employee, cycle=cycle, indicator=competency_setup["i1"], rating=4, assessed_by=manager_user
+    )
+    assert ratings_version(cycle.pk, report_employee.pk) != report_v
+    assert ratings_version(cycle.pk, other_employee.pk) == other_v
+
+    # Importaciones masivas: una invalidación para todo el ciclo.
+    invalidate_ratings(cycle.pk)
+    assert ratings_version(cycle.pk, other_employee.pk) != other_v
+
+
+def test_competency_picker_fragment_is_reused_until_a_rating_changes(
+    locmem, client, cycle, report_employee, competency_setup, manager_user
+):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    from evaluations.models import QualitativeIndicatorAssessment
+
+    client.force_login(manager_user)
+    url = reverse("competency_picker", args=[report_employee.id])
+    with CaptureQueriesContext(connection) as first:
+        response = client.get(url)
+    assert "Actual: nivel 0" in response.content.decode()
+
+    with CaptureQueriesContext(connection) as cached:
+        response = client.get(url)
+    assert "Actual: nivel 0" in response.content.decode()
+    assert not any("evaluations_qualitativeindicatorassessment" in q["sql"] for q in cached.captured_queries)
+    assert len(cached) < len(first)
+
+    for indicator in (competency_setup["i1"], competency_setup["i2"]):
+        QualitativeIndicatorAssessment.objects.create(
+            employee=report_employee, cycle=cycle, indicator=indicator, rating=4, assessed_by=manager_user
+        )
+    assert "Actual: nivel 1" in client.get(url).content.decode()
+
+
+def test_nine_box_cells_follow_score_writes(locmem, client, hr_user, cycle, report_employee):
+    from django.urls import reverse
+
+    from evaluations.models import EmployeeCycleScore
+    from evaluations.services.scoring import write_cycle_scores
+
+    client.force_login(hr_user)
+    assert "Sin empleados en este sector" in client.get(reverse("nine_box")).content.decode()
+
+    write_cycle_scores(
+        [EmployeeCycleScore(employee=report_employee, cycle=cycle, qual_tercile=3, quant_tercile=3, box_code="STAR", box_label="Estrellas")]
+    )
+
+    assert f'data-emp-id="{report_employee.id}"' in client.get(reverse("nine_box")).content.decode()
+
+
+def test_movement_matrix_is_cached_per_pair_of_cycle_score_versions(locmem, cycle, report_employee):
+    from datetime import date
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from evaluations.models import EmployeeCycleScore, EvaluationCycle
+    from evaluations.services.movement import movement_matrix
+    from evaluations.services.scoring import write_cycle_scores
+
+    previous = EvaluationCycle.objects.create(name="FY2025", start_date=date(2025, 1, 1), end_date=date(2025, 12, 31))
+    unrelated = EvaluationCycle.objects.create(name="FY2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+    EmployeeCycleScore.objects.create(employee=report_employee, cycle=previous, qual_tercile=1, quant_tercile=1)
+    EmployeeCycleScore.objects.create(employee=report_employee, cycle=cycle, qual_tercile=1, quant_tercile=1)
+
+    assert movement_matrix(previous, cycle)["stayed"] == 1
+    # Scores de otro ciclo: la matriz previous -> cycle sigue en caché.
+    write_cycle_scores([EmployeeCycleScore(employee=report_employee, cycle=unrelated)])
+    with CaptureQueriesContext(connection) as cached:
+        assert movement_matrix(previous, cycle)["stayed"] == 1
+    assert len(cached) == 0
+
+    write_cycle_scores(
+        [EmployeeCycleScore(employee=report_employee, cycle=cycle, qual_tercile=3, quant_tercile=3, box_code="STAR")]
+    )
+    matrix = movement_matrix(previous, cycle)
+    assert (matrix["stayed"], matrix["improved"]) == (0, 1)
+
+
+def test_fragments_are_not_cached_without_a_shared_cache(
+    locmem, settings, client, cycle, report_employee, competency_setup, manager_user
+):
+    from django.urls import reverse
+
+    from evaluations.models import QualitativeIndicatorAssessment
+
+    # Caché por proceso: otro worker no vería la invalidación, así que no se reutiliza el fragmento.
+    settings.CACHE_IS_SHARED = False
+    client.force_login(manager_user)
+    url = reverse("competency_picker", args=[report_employee.id])
+    assert "Actual: nivel 0" in client.get(url).content.decode()
+
+    # bulk_create no dispara post_save: como una escritura cuya invalidación no llega a este worker.
+    QualitativeIndicatorAssessment.objects.bulk_create(
+        QualitativeIndicatorAssessment(
+            employee=report_employee, cycle=cycle, indicator=indicator, rating=4, assessed_by=manager_user
+        )
+        for indicator in (competency_setup["i1"], competency_setup["i2"])
+    )
+    assert "Actual: nivel 1" in client.get(url).content.decode()
@@ -0,0 +1,107 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from evaluations.models import (
+    CycleSnapshot,
+    EmployeeCycleScore,
+    EvaluationCycle,
+    QualitativeIndicatorAssessment,
+    SnapshotCompetencyLevel,
+)
+from evaluations.services.scoring import recompute_cycle_scores
+from evaluations.services.snapshots import finalize_cycle, load_snapshot
+from people.models import Employee
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def closed_cycle():
+    return EvaluationCycle.objects.create(name="FY2025", start_date=date(2025, 1, 1), end_date=date(2025, 12, 31))
+
+
+@pytest.fixture
+def frozen(closed_cycle, report_employee, other_employee, competency_setup, manager_user):
+    EmployeeCycleScore.objects.create(
+        employee=report_employee,
+        cycle=closed_cycle,
+        qualitative_score=Decimal("50.00"),
+        quantitative_score=Decimal("80.00"),
+        qual_tercile=2,
+        quant_tercile=3,
+        box_code="EXECUTE",
+        box_label="Alto rendimiento",
+    )
+    for indicator in (competency_setup["i1"], competency_setup["i2"]):
+        QualitativeIndicatorAssessment.objects.create(
+            employee=report_employee, cycle=closed_cycle, indicator=indicator, rating=4, assessed_by=manager_user
+        )
+    return finalize_cycle(closed_cycle)
+
+
+def _select(client, user, cycle):
+    client.force_login(user)
+    client.post(reverse("set_cycle"), {"cycle_id": cycle.id})
+
+
+def test_finalize_freezes_scores_and_competency_levels(frozen, closed_cycle, report_employee, other_employee):
+    assert frozen.employee_count == Employee.objects.filter(active=True).count()
+    assert finalize_cycle(closed_cycle) is None
+
+    snapshot = load_snapshot(closed_cycle)
+    assert snapshot.box_counts() == {"EXECUTE": 1}
+    [card] = snapshot.nine_box_cards()[(2, 3)]
+    assert (card.employee_id, card.qualitative_score) == (report_employee.id, Decimal("50.00"))
+    rows = {row.employee_id: row for row in snapshot.team_rows()}
+    assert rows[report_employee.id].has_score and not rows[other_employee.id].has_score
+
+    level = SnapshotCompetencyLevel.objects.get(cycle=closed_cycle, employee=report_employee)
+    assert (level.achieved_level, level.required_level) == (1, 2)
+
+
+def test_finalize_rejects_open_cycles(cycle):
+    with pytest.raises(ValueError):
+        finalize_cycle(cycle)
+    assert not CycleSnapshot.objects.exists()
+
+
+def test_closed_cycle_pages_are_served_from_snapshot(client, hr_user, frozen, closed_cycle, report_employee):
+    _select(client, hr_user, closed_cycle)
+    # Cambios posteriores en las tablas vivas no se ven: el ciclo está congelado.
+    EmployeeCycleScore.objects.filter(cycle=closed_cycle).update(box_label="Cambiado")
+
+    for name in ("nine_box", "team_overview"):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse(name))
+        assert response.status_code == 200
+        assert not any("evaluations_employeecyclescore" in q["sql"] for q in ctx.captured_queries), name
+        assert "Cambiado" not in response.content.decode()
+    assert "Alto rendimiento" in client.get(reverse("nine_box")).content.decode()
+
+    response = client.get(reverse("competency_picker", args=[report_employee.id]))
+    assert "Actual: nivel 1 · Requerido: nivel 2" in response.content.decode()
+
+
+def test_frozen_cycles_are_not_recomputed(client, hr_user, frozen, closed_cycle, report_employee):
+    assert recompute_cycle_scores(closed_cycle, Employee.objects.all()) is False
+    assert EmployeeCycleScore.objects.get(cycle=closed_cycle).box_label == "Alto rendimiento"
+
+    _select(client, hr_user, closed_cycle)
+    client.post(reverse("nine_box"), {"qualitative_axis_method": "GAUSSIAN", "top_min_above": 1, "middle_max_below": 3})
+    assert EmployeeCycleScore.objects.filter(cycle=closed_cycle).count() == 1
+
+
+def test_closed_cycle_is_recomputed_until_frozen(closed_cycle, report_employee):
+    assert load_snapshot(closed_cycle) is None
+    assert recompute_cycle_scores(closed_cycle, Employee.objects.filter(id=report_employee.id)) is not False
+    assert EmployeeCycleScore.objects.filter(cycle=closed_cycle, employee=report_employee).exists()
+
+    finalize_cycle(closed_cycle)
+    # El None anterior no quedó cacheado: el snapshot se ve sin esperar a otra invalidación.
+    assert load_snapshot(closed_cycle) is not None
+    assert recompute_cycle_scores(closed_cycle, Employee.objects.all()) is False
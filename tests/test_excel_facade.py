@@ -0,0 +1,31 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from talentmap import excel
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_startup_and_url_loading_do_not_import_openpyxl():
+    code = (
+        "import os, sys\n"
+        "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'talentmap.settings')\n"
+        "import django\n"
+        "django.setup()\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+        "print('openpyxl' in sys.modules)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, check=True, capture_output=True, text=True)
+    assert out.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_facade_resolves_openpyxl_names_on_first_use():
+    from openpyxl.styles import Font
+
+    assert excel.Font is Font
+    with pytest.raises(AttributeError):
+        excel.Chart
@@ -8,6 +8,7 @@ from django.utils import timezone
 
 from people.models import Employee, Invitation
 from people.services.invitations import create_invitation
+from people.services.onboarding import has_pending_or_existing_user
 
 
 @pytest.mark.django_db
@@ -84,3 +85,10 @@ class TestInvitationLifecycle:
         assert Invitation.objects.count() == 0
         user = User.objects.get(first_name="No", last_name="Login")
         assert not user.has_usable_password()
+
+    def test_pending_invitation_lookup_is_case_insensitive(self, invitation):
+        assert has_pending_or_existing_user("INVITEE@example.com")
+
+        invitation.expires_at = timezone.now() - timedelta(minutes=1)
+        invitation.save(update_fields=["expires_at"])
+        assert not has_pending_or_existing_user("invitee@example.com")
@@ -0,0 +1,38 @@
+from loadtest.harness import Stats, _FormInputs, compare_with_baseline, percentile, summarize
+
+
+def test_percentile_nearest_rank():
+    values = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+    assert percentile(values, 50) == 0.5
+    assert percentile(values, 95) == 1.0
+    assert percentile([], 95) == 0.0
+
+
+def test_summary_and_baseline_regressions():
+    stats = Stats()
+    for seconds in (0.1, 0.2, 0.3):
+        stats.record("team_overview", seconds, ok=True)
+    stats.record("nine_box_dashboard", 1.0, ok=False)
+
+    report = summarize(stats, elapsed=2.0)
+
+    assert report["team_overview"] == {
+        "requests": 3, "errors": 0, "p50_ms": 200.0, "p90_ms": 300.0, "p95_ms": 300.0,
+        "p99_ms": 300.0, "max_ms": 300.0, "rps": 1.5,
+    }
+    assert report["nine_box_dashboard"]["errors"] == 1
+
+    baseline = {"team_overview": {**report["team_overview"], "p95_ms": 200.0, "rps": 1.5}}
+    assert compare_with_baseline(report, baseline, tolerance=0.2) == ["team_overview: p95 200.0 -> 300.0 ms"]
+    assert compare_with_baseline(report, baseline, tolerance=0.6) == []
+
+
+def test_form_inputs_only_collects_target_form():
+    parser = _FormInputs("quant-form")
+    parser.feed(
+        '<form id="other"><input name="x" value="1"></form>'
+        '<form id="quant-form"><input type="hidden" name="form-0-id" value="7">'
+        '<input type="checkbox" name="form-0-DELETE"><textarea name="form-0-description">Hola</textarea>'
+        '<input name="form-__prefix__-title" value=""></form>'
+    )
+    assert parser.fields == [["form-0-id", "7"], ["form-0-description", "Hola"]]
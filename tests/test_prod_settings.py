@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def _load_prod_settings(cache_url, module="talentmap.settings.prod", expr="settings.CACHES['default']['BACKEND']"):
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": module,
+        "SECRET_KEY": "x" * 50,
+        "ALLOWED_HOSTS": "talentmap.example.com",
+        "CACHE_URL": cache_url,
+    }
+    code = f"from django.conf import settings\nprint({expr})\n"
+    return subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, env=env, capture_output=True, text=True)
+
+
+@pytest.mark.parametrize("cache_url", ["locmemcache://", "dummycache://"])
+def test_prod_rejects_per_process_caches(cache_url):
+    out = _load_prod_settings(cache_url)
+    assert out.returncode != 0
+    assert "Production needs a shared CACHE_URL" in out.stderr
+
+
+def test_prod_accepts_a_shared_cache(tmp_path):
+    out = _load_prod_settings(f"filecache://{tmp_path}")
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().endswith("FileBasedCache")
+
+
+def test_worker_settings_keep_connections_longer(tmp_path):
+    expr = "settings.DATABASES['default']['CONN_MAX_AGE']"
+    web = _load_prod_settings(f"filecache://{tmp_path}", expr=expr)
+    worker = _load_prod_settings(f"filecache://{tmp_path}", module="talentmap.settings.worker", expr=expr)
+    assert (web.stdout.strip(), worker.stdout.strip()) == ("60", "600"), web.stderr + worker.stderr
@@ -1,10 +1,24 @@
+import json
+from datetime import date
 from decimal import Decimal
 
 import pytest
 
-from evaluations.models import BehaviorRating, EmployeeCycleScore, QualitativeIndicatorAssessment, QuantitativeGoal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from evaluations.models import (
+    BehaviorRating,
+    EmployeeCycleScore,
+    EvaluationCycle,
+    QualitativeIndicatorAssessment,
+    QuantitativeGoal,
+    TalentMapSettings,
+)
+from evaluations.services.movement import movement_matrix
 from evaluations.services.scoring import compute_qualitative_score, compute_quantitative_score, recompute_cycle_scores
-from people.models import Employee
+from people.models import Department, Employee
 
 
 @pytest.mark.django_db
@@ -71,3 +85,98 @@ class TestScoringAndNineBox:
         assert score.box_label
         assert 1 <= score.qual_tercile <= 3
         assert 1 <= score.quant_tercile <= 3
+
+    def test_movement_matrix_counts_transitions_between_cycles(
+        self, client, hr_user, manager_employee, report_employee, other_employee, cycle
+    ):
+        previous = EvaluationCycle.objects.create(name="FY2025", start_date=date(2025, 1, 1), end_date=date(2025, 12, 31))
+        boxes = {
+            # empleado: (box en FY2025, box en FY2026)
+            report_employee: ((2, 2), (3, 3)),
+            other_employee: ((2, 2), (3, 3)),
+            manager_employee: ((3, 3), (1, 1)),
+        }
+        for emp, (before, after) in boxes.items():
+            for c, (qual_t, quant_t) in ((previous, before), (cycle, after)):
+                EmployeeCycleScore.objects.create(employee=emp, cycle=c, qual_tercile=qual_t, quant_tercile=quant_t)
+        # Sin score en el ciclo anterior: no cuenta.
+        EmployeeCycleScore.objects.filter(employee=manager_employee, cycle=previous).delete()
+
+        matrix = movement_matrix(previous, cycle)
+        counts = {(row["code"], c["code"]): c["n"] for row in matrix["rows"] for c in row["cells"] if c["n"]}
+        assert counts == {("SOLID", "STAR"): 2}
+        assert (matrix["total"], matrix["improved"], matrix["declined"]) == (2, 2, 0)
+
+        client.force_login(hr_user)
+        response = client.get(
+            reverse("talent_movement"), {"from": previous.id, "to": cycle.id, "from_box": "SOLID", "to_box": "STAR"}
+        )
+        assert response.status_code == 200
+        # Sin nombre y apellidos se ordena por username: "other" antes que "report".
+        assert [m.employee_id for m in response.context["drill"]["rows"]] == [other_employee.id, report_employee.id]
+
+    def test_nine_box_simulation_reports_moves_without_writing(
+        self, client, hr_user, manager_user, manager_employee, report_employee, other_employee, cycle
+    ):
+        # Por tercios con la configuración por defecto: report arriba, other en medio, manager abajo;
+        # en el cuantitativo, manager < report < other.
+        profiles = {
+            report_employee: (1, 0, 3, Decimal("50"), 2),
+            other_employee: (1, 1, 2, Decimal("90"), 3),
+            manager_employee: (0, 2, 1, Decimal("10"), 1),
+        }
+        for emp, (above, below, qual_t, qt, quant_t) in profiles.items():
+            EmployeeCycleScore.objects.create(
+                employee=emp,
+                cycle=cycle,
+                qualitative_score=Decimal("50"),
+                quantitative_score=qt,
+                qual_tercile=qual_t,
+                quant_tercile=quant_t,
+                competencies_above=above,
+                competencies_below=below,
+            )
+        other_employee.department = Department.objects.create(name="Ops")
+        other_employee.save()
+        TalentMapSettings.get_solo()
+
+        client.force_login(hr_user)
+        url = reverse("api_nine_box_simulate")
+        body = {"configs": [{"top_min_above": 2}, {"middle_max_below": 0}, {"tercile_cohort": "DEPARTMENT"}]}
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post(url, json.dumps(body), content_type="application/json")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["employees"] == 3
+        assert data["current"]["counts"]["GROW_FAST"] == 1
+        stricter_top, stricter_middle, by_department = data["results"]
+        assert stricter_top["config"]["top_min_above"] == 2
+        assert [(m["employee_id"], m["from"], m["to"]) for m in stricter_top["moves"]] == [
+            (report_employee.id, "GROW_FAST", "NEEDS_SUPPORT")
+        ]
+        assert stricter_middle["moved"] == 1 and stricter_middle["moves"][0]["employee_id"] == other_employee.id
+        assert stricter_middle["counts"]["RAW_TALENT"] == 1
+        # Solo en su departamento, other pasa a ser el último del ranking cuantitativo.
+        assert [(m["employee_id"], m["from"], m["to"]) for m in by_department["moves"]] == [
+            (other_employee.id, "EXECUTE", "INCONSISTENT")
+        ]
+
+        # Solo lee los scores guardados: ni valoraciones, ni metas, ni escrituras.
+        sql = [q["sql"] for q in ctx.captured_queries]
+        assert not any("qualitativeindicatorassessment" in q or "quantitativegoal" in q for q in sql)
+        assert not any(q.startswith(("INSERT", "UPDATE", "DELETE")) for q in sql if "django_session" not in q)
+        assert list(
+            EmployeeCycleScore.objects.order_by("employee_id").values_list("employee_id", "qual_tercile")
+        ) == sorted((emp.id, profile[2]) for emp, profile in profiles.items())
+
+        # Con filtro de departamento los tercios se calculan igual; solo cambia lo que se informa.
+        body["department"] = report_employee.department_id
+        data = client.post(url, json.dumps(body), content_type="application/json").json()
+        assert data["employees"] == 2
+        assert [r["moved"] for r in data["results"]] == [1, 0, 0]
+
+        bad = client.post(url, json.dumps({"configs": [{"qualitative_axis_method": "X"}]}), content_type="application/json")
+        assert bad.status_code == 400 and not bad.json()["ok"]
+
+        client.force_login(manager_user)
+        assert client.post(url, json.dumps(body), content_type="application/json").status_code == 403
@@ -0,0 +1,15 @@
+from django.core.management import call_command
+
+
+def test_production_storage_fingerprints_and_precompresses(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+    }
+    call_command("collectstatic", interactive=False, verbosity=0)
+
+    hashed = [p for p in (tmp_path / "css").iterdir() if p.name.startswith("styles.") and p.suffix == ".css" and p.name != "styles.css"]
+    assert len(hashed) == 1
+    assert (tmp_path / "css" / f"{hashed[0].name}.gz").exists()
+    assert (tmp_path / "staticfiles.json").exists()
@@ -0,0 +1,87 @@
+import random
+from decimal import Decimal
+from statistics import mean, pstdev
+
+import pytest
+
+from evaluations.services import terciles
+
+
+def _cohort(n, seed=7):
+    rng = random.Random(seed)
+    ids = rng.sample(range(1, 10 * n), n)
+    # Pocos valores distintos: muchos empates que se resuelven por id.
+    quant = [Decimal(rng.randint(0, 20) * 5) for _ in range(n)]
+    qual = [Decimal(rng.randint(0, 10000)) / 100 for _ in range(n)]
+    above = [rng.randint(0, 3) for _ in range(n)]
+    below = [rng.randint(0, 4) for _ in range(n)]
+    return ids, quant, qual, above, below
+
+
+def _reference_rank(ids, values):
+    ordered = sorted(zip(ids, values), key=lambda r: (float(r[1]), r[0]))
+    third = max(1, len(ordered) // 3)
+    by_id = {key: 1 if i < third else 2 if i < 2 * third else 3 for i, (key, _) in enumerate(ordered)}
+    return [by_id[key] for key in ids]
+
+
+def _reference_gaussian(values):
+    floats = [float(v) for v in values]
+    sigma = pstdev(floats)
+    low_cut, high_cut = mean(floats) - 0.4307 * sigma, mean(floats) + 0.4307 * sigma
+    return [1 if v <= low_cut else 3 if v >= high_cut else 2 for v in floats]
+
+
+@pytest.mark.parametrize("n", [1, 2, 5, 1000])
+def test_rank_terciles_break_ties_by_key(n):
+    ids, quant, *_ = _cohort(n)
+    assert terciles.rank_terciles(ids, quant, backend="python") == _reference_rank(ids, quant)
+
+
+def test_gaussian_terciles_match_mean_and_pstdev_cuts():
+    *_, qual, _, _ = _cohort(1000)
+    assert terciles.gaussian_terciles(qual, backend="python") == _reference_gaussian(qual)
+    assert terciles.gaussian_terciles([Decimal("50")] * 3, backend="python") == [2, 2, 2]
+    assert terciles.gaussian_terciles([Decimal("50")], backend="python") == [2]
+
+
+def test_grouped_terciles_match_one_pass_per_cohort():
+    ids, quant, qual, above, _ = _cohort(3000)
+    groups = [a % 3 for a in above]
+    rank = terciles.rank_terciles(ids, quant, groups, backend="python")
+    gaussian = terciles.gaussian_terciles(qual, groups, backend="python")
+    for group in (0, 1, 2):
+        members = [i for i, g in enumerate(groups) if g == group]
+        assert [rank[i] for i in members] == _reference_rank([ids[i] for i in members], [quant[i] for i in members])
+        assert [gaussian[i] for i in members] == _reference_gaussian([qual[i] for i in members])
+
+
+def test_profile_terciles_and_box_indexes():
+    # (por encima, por debajo) con top_min_above=1, middle_max_below=3.
+    cases = {(1, 0): 3, (0, 0): 2, (2, 1): 2, (1, 1): 2, (0, 1): 1, (5, 4): 1, (2, 0): 3}
+    above, below = zip(*cases)
+    assert terciles.profile_terciles(above, below, 1, 3, backend="python") == list(cases.values())
+    assert terciles.profile_terciles([1], [0], 2, 3, backend="python") == [1]
+
+    assert terciles.box_indexes([1, 2, 3], [3, 2, 1], backend="python") == [2, 4, 6]
+
+
+def test_numpy_backend_matches_python_backend():
+    pytest.importorskip("numpy")
+    ids, quant, qual, above, below = _cohort(5000)
+    qual_ts, quant_ts = [1 + a % 3 for a in above], [1 + b % 3 for b in below]
+    groups = [b % 5 for b in below]
+    for fn, args in (
+        (terciles.rank_terciles, (ids, quant)),
+        (terciles.rank_terciles, (ids, quant, groups)),
+        (terciles.gaussian_terciles, (qual,)),
+        (terciles.gaussian_terciles, (qual, groups)),
+        (terciles.profile_terciles, (above, below, 2, 1)),
+        (terciles.box_indexes, (qual_ts, quant_ts)),
+    ):
+        assert fn(*args, backend="numpy") == fn(*args, backend="python"), fn.__name__
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        terciles.rank_terciles([1], [Decimal("1")], backend="fortran")